@@ -0,0 +1,221 @@
+import os
+import enum
+import gzip
+import logging
+
+from typing import NamedTuple
+from Common.utils import LoggingUtil, EdgeNormUtils
+from pathlib import Path
+
+
+# the data header columns are:
+class DATACOLS(enum.IntEnum):
+    DB = 0
+    DB_Object_ID = 1
+    DB_Object_Symbol = 2
+    Qualifier = 3
+    GO_ID = 4
+    DB_Reference = 5
+    Evidence_Code = 6
+    With_From = 7
+    Aspect = 8
+    DB_Object_Name = 9
+    DB_Object_Synonym = 10
+    DB_Object_Type = 11
+    Taxon_Interacting_taxon = 12
+    Date = 13
+    Assigned_By = 14
+    Annotation_Extension = 15
+    Gene_Product_Form_ID = 16
+
+
+class GAFRecord(NamedTuple):
+    """
+    The parts of a GAF annotation line that become graph nodes and edges.
+
+    ex. UniProtKB:O73942, apeI, NCBITaxon:272557, GO:0004518, F
+    """
+    gene_id: str
+    symbol: str
+    taxon_id: str
+    go_id: str
+    aspect: str
+
+
+class GAFReader:
+    """
+    Class that reads the annotation records out of GAF (gene association format) files.
+
+    lines are split as bytes and only the columns that make up a record are decoded.
+    """
+
+    def __init__(self, log_level=logging.INFO):
+        """
+        constructor
+        :param log_level - overrides default log level
+        """
+        # create a logger
+        self.logger = LoggingUtil.init_logging("Data_services.Common.GAFReader", level=log_level, line_format='medium', log_file_path=os.path.join(Path(__file__).parents[1], 'logs'))
+
+    @staticmethod
+    def open(file_path: str):
+        """
+        opens a GAF file for reading in binary mode
+
+        :param file_path: the path to the GAF file, gzipped if it ends with .gz
+        :return: the open file pointer
+        """
+        # gzipped files get decompressed on the fly
+        if file_path.endswith('.gz'):
+            return gzip.open(file_path, 'rb')
+
+        return open(file_path, 'rb')
+
+    def read(self, fp, swiss_prots=None, taxa=None) -> iter:
+        """
+        gets the annotation records from the binary file handle passed
+
+        :param fp: open binary file pointer
+        :param swiss_prots: optional set of uniprot ids. only records for these ids are returned
+        :param taxa: optional set of taxon ids (without the NCBITaxon: prefix). only records for these taxa are returned
+        :return: iterator of GAFRecord
+        """
+        # for the lines in the file
+        for line in fp:
+            # skip over blank lines and the header comments
+            if line[:1] == b'!' or not line.strip():
+                continue
+
+            # split the line into columns
+            cols: list = line.rstrip(b'\r\n').split(b'\t')
+
+            try:
+                # get the gene accession
+                db_object_id: str = cols[DATACOLS.DB_Object_ID.value].decode('utf-8')
+
+                # is this a swiss-prot curated entry
+                if swiss_prots is not None and db_object_id not in swiss_prots:
+                    continue
+
+                # get the taxon id
+                taxon_id: str = cols[DATACOLS.Taxon_Interacting_taxon.value].decode('utf-8')
+
+                # if the taxon if starts with taxon remove it
+                if taxon_id.startswith('taxon:'):
+                    taxon_id = taxon_id[len('taxon:'):]
+
+                # is this a target taxon
+                if taxa is not None and taxon_id not in taxa:
+                    continue
+
+                # an example record looks like this
+                """ UniProtKB       O73942  apeI            GO:0004518      GO_REF:0000043  IEA     UniProtKB-KW:KW-0540    F
+                    Homing endonuclease I-ApeI      apeI|APE_1929.1 protein 272557  20200229        UniProt """
+                yield GAFRecord(f'{cols[DATACOLS.DB.value].decode("utf-8")}:{db_object_id}',
+                                cols[DATACOLS.DB_Object_Symbol.value].decode('utf-8'),
+                                f'NCBITaxon:{taxon_id}',
+                                cols[DATACOLS.GO_ID.value].decode('utf-8'),
+                                cols[DATACOLS.Aspect.value].decode('utf-8'))
+            except Exception as e:
+                self.logger.error(f'Error: Exception: {e}')
+
+
+class GOTermEdgeBuilder:
+    """
+    Class that creates the edges between genes and normalized GO terms.
+
+    An edge between the gene and the go term. If the go term is a molecular_activity,
+    then the edge should be (go term)-[enabled_by]->(gene). If the go term is a biological
+    process then it should be (gene)-[actively_involved_in]->(go term). If it is a cellular
+    component then it should be (go term)-[has_part]->(gene)
+
+    the GO term type comes from the GAF Aspect column (F, P or C) when it is known so the edge does not
+    depend on the normalized category. otherwise the edge type of each distinct GO term category is
+    found once and reused for every edge.
+    """
+
+    # the edges between a gene and a GO term for each GO term type (GO term type, predicate, relation, edge label, gene is the subject)
+    GO_TERM_EDGES: tuple = (('molecular_activity', 'biolink:enabled_by', 'RO:0002333', 'enabled_by', False),
+                            ('biological_process', 'biolink:actively_involved_in', 'RO:0002331', 'actively_involved_in', True),
+                            ('cellular_component', 'biolink:has_part', 'RO:0000051', 'has_part', False))
+
+    # the GO term type of each GAF aspect
+    ASPECT_GO_TYPES: dict = {'F': 'molecular_activity', 'P': 'biological_process', 'C': 'cellular_component'}
+
+    def __init__(self, log_level=logging.INFO):
+        """
+        constructor
+        :param log_level - overrides default log level
+        """
+        # save the log level for the edge normalizer
+        self.log_level = log_level
+
+        # the edge details for each GO term type
+        self.edge_types: dict = {go_type: {'predicate': predicate, 'relation': relation, 'edge_label': edge_label, 'gene_is_subject': gene_is_subject}
+                                 for go_type, predicate, relation, edge_label, gene_is_subject in self.GO_TERM_EDGES}
+
+        # the edge details found for each GO term category
+        self.category_edge_types: dict = {}
+
+    def normalize(self, cached_edge_norms: dict = None) -> list:
+        """
+        calls the EdgeNormalization web service to get the normalized predicate and label of each edge type
+
+        :param cached_edge_norms: dict of previously captured normalizations
+        :return: the relations that failed to normalize
+        """
+        # normalize the edge types. this updates them in place
+        return EdgeNormUtils(self.log_level).normalize_edge_data(list(self.edge_types.values()), cached_edge_norms)
+
+    def get_edge_type(self, go_category: str):
+        """
+        gets the edge details for a GO term category
+
+        :param go_category: the normalized GO term category (ex. biological_process|named_thing)
+        :return: the edge details or None if the category is not a recognized GO term type
+        """
+        # have we seen this category before
+        if go_category not in self.category_edge_types:
+            # find the GO term type in the category
+            self.category_edge_types[go_category] = next((edge_type for go_type, edge_type in self.edge_types.items() if go_category.find(go_type) > -1), None)
+
+        # return to the caller
+        return self.category_edge_types[go_category]
+
+    def get_edge(self, gene_id: str, go_node: dict, aspect: str = ''):
+        """
+        gets the edge between a gene and a normalized GO term node
+
+        :param gene_id: the gene node id
+        :param go_node: the normalized GO term node
+        :param aspect: the GAF aspect of the annotation (F, P or C)
+        :return: the edge or None if the GO term type is not recognized
+        """
+        # get the edge details for the GO term from the aspect if we can, otherwise from the category
+        if aspect in self.ASPECT_GO_TYPES:
+            edge_type = self.edge_types[self.ASPECT_GO_TYPES[aspect]]
+        else:
+            edge_type = self.get_edge_type(go_node['category'])
+
+        # not a recognized type
+        if edge_type is None:
+            return None
+
+        # get the direction of the edge
+        if edge_type['gene_is_subject']:
+            subject_id, object_id = gene_id, go_node['id']
+        else:
+            subject_id, object_id = go_node['id'], gene_id
+
+        # return the edge to the caller
+        return {'predicate': edge_type['predicate'], 'subject': subject_id, 'relation': edge_type['relation'], 'object': object_id, 'edge_label': edge_type['edge_label']}
+
+    def get_edges(self, gene_go_pairs: list) -> list:
+        """
+        gets the edges for a list of genes and normalized GO term nodes
+
+        :param gene_go_pairs: list of (gene id, normalized GO term node, GAF aspect)
+        :return: the list of edges for the recognized GO term types
+        """
+        # get the edges and drop the unrecognized ones
+        return [edge for edge in (self.get_edge(gene_id, go_node, aspect) for gene_id, go_node, aspect in gene_go_pairs) if edge is not None]
@@ -1,10 +1,19 @@
 import os
 import shutil
 import json
+import gzip
+import time
+import tarfile
+import io
+import threading
+import hashlib
 import pytest
+import pandas as pd
 
 from rdflib import Graph
-from Common.utils import GetData, EdgeNormUtils, NodeNormUtils
+from Common.utils import GetData, EdgeNormUtils, NodeNormUtils, FTPDownloadManager, AccessionIndex, TaxonomyIndex, TaxonIdSet, SpillDedupWriter, GroupEdgeBuilder
+from Common.gaf_reader import GAFReader, GAFRecord, GOTermEdgeBuilder
+from Common.triple_reader import TripleReader
 
 
 def test_get_uniprot_virus_date_stamp():
@@ -33,6 +42,127 @@ def test_pull_via_http():
     os.remove(os.path.join(data_file_path, 'mission-and-vision'))
 
 
+def test_pull_via_http_resume():
+    # a local http site stands in for the real one
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    data_file_path: str = os.path.dirname(os.path.abspath(__file__))
+
+    site: dict = {'data': b'gaf line\n' * 300000, 'etag': '"v1"', 'statuses': []}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            data: bytes = site['data']
+
+            # the file is unchanged
+            if self.headers.get('If-None-Match') == site['etag']:
+                site['statuses'].append(304)
+                self.send_response(304)
+                self.end_headers()
+                return
+
+            # send the rest of the file if the range is still valid
+            if self.headers.get('Range') and self.headers.get('If-Range') == site['etag']:
+                start: int = int(self.headers['Range'][len('bytes='):-1])
+
+                # the range starts past the end of the file
+                if start >= len(data):
+                    site['statuses'].append(416)
+                    self.send_response(416)
+                    self.send_header('Content-Range', f'bytes */{len(data)}')
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                site['statuses'].append(206)
+                self.send_response(206)
+                self.send_header('Content-Range', f'bytes {start}-{len(data) - 1}/{len(data)}')
+                data = data[start:]
+            else:
+                site['statuses'].append(200)
+                self.send_response(200)
+
+            self.send_header('ETag', site['etag'])
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    url: str = f'http://127.0.0.1:{server.server_address[1]}/test.gaf'
+    download_dir: str = os.path.join(data_file_path, 'http_download')
+    file_path: str = os.path.join(download_dir, 'test.gaf')
+
+    gd = GetData()
+
+    try:
+        # get the whole file and check it
+        byte_count: int = gd.pull_via_http(url, download_dir, checksum=hashlib.md5(site['data']).hexdigest())
+
+        assert(byte_count == len(site['data']) and site['statuses'] == [200])
+        assert(not os.path.exists(f'{file_path}.part'))
+
+        # the file is unchanged so nothing is transferred
+        byte_count = gd.pull_via_http(url, download_dir)
+
+        assert(byte_count == len(site['data']) and site['statuses'][-1] == 304)
+
+        # the site changes and the transfer is cut short
+        site['data'] += b'new line\n'
+        site['etag'] = '"v2"'
+
+        with open(f'{file_path}.part', 'wb') as fp:
+            fp.write(site['data'][:1000000])
+
+        with open(f'{file_path}.meta', 'w') as fp:
+            json.dump({'etag': '"v1"', 'partial': {'etag': '"v2"'}}, fp)
+
+        # only the rest of the file is transferred
+        gd.pull_via_http(url, download_dir)
+
+        assert(site['statuses'][-1] == 206)
+
+        with open(file_path, 'rb') as fp:
+            assert(fp.read() == site['data'])
+
+        # the transfer finished but the file was not moved in place
+        with open(f'{file_path}.part', 'wb') as fp:
+            fp.write(site['data'])
+
+        with open(f'{file_path}.meta', 'w') as fp:
+            json.dump({'etag': '"v1"', 'partial': {'etag': '"v2"', 'length': len(site['data'])}}, fp)
+
+        # the complete partial download is used
+        assert(gd.pull_via_http(url, download_dir) == len(site['data']) and site['statuses'][-1] == 416)
+        assert(not os.path.exists(f'{file_path}.part'))
+
+        # a partial download that is too big for the file is thrown out
+        with open(f'{file_path}.part', 'wb') as fp:
+            fp.write(site['data'] + b'extra line\n')
+
+        with open(f'{file_path}.meta', 'w') as fp:
+            json.dump({'etag': '"v1"', 'partial': {'etag': '"v2"'}}, fp)
+
+        assert(gd.pull_via_http(url, download_dir) == len(site['data']) and site['statuses'][-2:] == [416, 200])
+
+        with open(file_path, 'rb') as fp:
+            assert(fp.read() == site['data'])
+
+        # a bad checksum does not replace the file
+        site['etag'] = '"v3"'
+
+        assert(gd.pull_via_http(url, download_dir, checksum='0' * 32) == 0)
+        assert(os.path.getsize(file_path) == len(site['data']) and not os.path.exists(f'{file_path}.part'))
+    finally:
+        # shut down the http site and remove the test data
+        server.shutdown()
+        shutil.rmtree(download_dir, ignore_errors=True)
+
+
 def test_get_taxon_id_list():
     gd = GetData()
 
@@ -88,6 +218,218 @@ def test_get_goa_files_chain():
     shutil.rmtree(data_file_path)
 
 
+def test_swiss_prot_accession_index():
+    data_file_path: str = os.path.dirname(os.path.abspath(__file__))
+
+    # create a small swiss-prot data file, the second entry has its accessions on 2 lines
+    with gzip.open(os.path.join(data_file_path, 'sprot_test.dat.gz'), 'wb') as fp:
+        fp.write(b'ID   001R_FRG3G              Reviewed;         256 AA.\nAC   Q6GZX4;\nDE   RecName: Full=Putative transcription factor 001R;\n//\n'
+                 b'ID   1433B_HUMAN             Reviewed;         246 AA.\nAC   P31946; A8K9K2; E1P616;\nAC   A0A024RBG1;\nDE   RecName: Full=14-3-3 protein beta/alpha;\n//\n')
+
+    # read the file in small blocks to exercise the block boundaries
+    accessions: set = GetData.get_swiss_prot_accessions(os.path.join(data_file_path, 'sprot_test.dat.gz'), block_size=16)
+
+    assert(accessions == {b'Q6GZX4', b'P31946', b'A8K9K2', b'E1P616', b'A0A024RBG1'})
+
+    # save and reopen the accessions as an index
+    assert(AccessionIndex.create(os.path.join(data_file_path, 'sprot_test.acc'), accessions) == 5)
+
+    index: AccessionIndex = AccessionIndex(os.path.join(data_file_path, 'sprot_test.acc'))
+
+    assert(len(index) == 5)
+    assert('A0A024RBG1' in index and 'Q6GZX4' in index and 'P31946' in index)
+    assert('Q6GZX5' not in index and 'A0A024RBG' not in index and 'A0A024RBG1X' not in index)
+
+    # remove the test data
+    index.close()
+    os.remove(os.path.join(data_file_path, 'sprot_test.dat.gz'))
+    os.remove(os.path.join(data_file_path, 'sprot_test.acc'))
+
+
+def test_taxonomy_index():
+    data_file_path: str = os.path.dirname(os.path.abspath(__file__))
+
+    # create a small taxdump archive
+    nodes: bytes = b'1\t|\t1\t|\tno rank\t|\t\t|\t8\t|\t0\t|\n' \
+                   b'10239\t|\t1\t|\tsuperkingdom\t|\t\t|\t9\t|\t0\t|\n' \
+                   b'654924\t|\t10493\t|\tno rank\t|\t\t|\t9\t|\t1\t|\n' \
+                   b'10493\t|\t10486\t|\tspecies\t|\t\t|\t9\t|\t1\t|\n' \
+                   b'9606\t|\t9605\t|\tspecies\t|\tHS\t|\t5\t|\t1\t|\n'
+
+    with tarfile.open(os.path.join(data_file_path, 'taxdump_test.tar.gz'), 'w:gz') as tar_file:
+        tar_info = tarfile.TarInfo('nodes.dmp')
+        tar_info.size = len(nodes)
+        tar_file.addfile(tar_info, io.BytesIO(nodes))
+
+    # get the taxa of each division
+    division_ids: dict = TaxonomyIndex.parse_taxdump(os.path.join(data_file_path, 'taxdump_test.tar.gz'))
+
+    assert(sorted(division_ids) == ['5', '8', '9'])
+
+    # save and reload the virus division
+    TaxonomyIndex.write_index(os.path.join(data_file_path, 'taxon_test.bin'), division_ids['9'])
+
+    taxa: TaxonIdSet = TaxonIdSet(TaxonomyIndex.read_index(os.path.join(data_file_path, 'taxon_test.bin')))
+
+    assert(len(taxa) == 3 and set(taxa) == {'10239', '10493', '654924'})
+    assert('10493' in taxa and 654924 in taxa)
+    assert('9606' not in taxa and '1' not in taxa and 'taxon:10493' not in taxa)
+
+    # remove the test data
+    os.remove(os.path.join(data_file_path, 'taxdump_test.tar.gz'))
+    os.remove(os.path.join(data_file_path, 'taxon_test.bin'))
+
+
+def test_gaf_reader():
+    # a GAF file with a header, a blank line and 3 annotations
+    gaf_data = io.BytesIO(b'!gaf-version: 2.1\n!generated-by: UniProt\n\n'
+                          b'UniProtKB\tO73942\tapeI\t\tGO:0004518\tGO_REF:0000043\tIEA\tUniProtKB-KW:KW-0540\tF\tHoming endonuclease I-ApeI\tapeI|APE_1929.1\tprotein\ttaxon:272557\t20200229\tUniProt\t\t\n'
+                          b'UniProtKB\tQ6GZX4\t001R\t\tGO:0006355\tGO_REF:0000043\tIEA\tUniProtKB-KW:KW-0805\tP\tPutative transcription factor 001R\t001R\tprotein\ttaxon:654924\t20200229\tUniProt\t\t\n'
+                          b'UniProtKB\tP31946\tYWHAB\t\tGO:0005737\tGO_REF:0000052\tIDA\t\tC\t14-3-3 protein beta/alpha\tYWHAB\tprotein\ttaxon:9606\t20200229\tHPA\t\t\n')
+
+    reader: GAFReader = GAFReader()
+
+    # get all the records
+    records: list = list(reader.read(gaf_data))
+
+    assert(len(records) == 3)
+    assert(records[0] == GAFRecord('UniProtKB:O73942', 'apeI', 'NCBITaxon:272557', 'GO:0004518', 'F'))
+
+    # filter the records by swiss-prot id and taxon
+    gaf_data.seek(0)
+    assert([record.gene_id for record in reader.read(gaf_data, swiss_prots={'Q6GZX4', 'P31946'})] == ['UniProtKB:Q6GZX4', 'UniProtKB:P31946'])
+
+    gaf_data.seek(0)
+    assert([record.gene_id for record in reader.read(gaf_data, swiss_prots={'Q6GZX4', 'P31946'}, taxa={'9606'})] == ['UniProtKB:P31946'])
+
+    # create the edges for normalized GO terms
+    edge_builder: GOTermEdgeBuilder = GOTermEdgeBuilder()
+
+    edges: list = edge_builder.get_edges([('UniProtKB:O73942', {'id': 'GO:0004518', 'category': 'molecular_activity|named_thing'}, ''),
+                                          ('UniProtKB:Q6GZX4', {'id': 'GO:0006355', 'category': 'biological_process|named_thing'}, ''),
+                                          ('UniProtKB:P31946', {'id': 'GO:0005737', 'category': 'named_thing'}, '')])
+
+    assert(len(edges) == 2)
+    assert(edges[0]['subject'] == 'GO:0004518' and edges[0]['object'] == 'UniProtKB:O73942' and edges[0]['relation'] == 'RO:0002333')
+    assert(edges[1]['subject'] == 'UniProtKB:Q6GZX4' and edges[1]['object'] == 'GO:0006355' and edges[1]['relation'] == 'RO:0002331')
+
+    # the aspect decides the edge type when it is there
+    edges = edge_builder.get_edges([(record.gene_id, {'id': record.go_id, 'category': 'named_thing'}, record.aspect) for record in records])
+
+    assert([edge['relation'] for edge in edges] == ['RO:0002333', 'RO:0002331', 'RO:0000051'])
+    assert(edges[2]['subject'] == 'GO:0005737' and edges[2]['object'] == 'UniProtKB:P31946')
+
+
+def test_ftp_download_manager():
+    # a local ftp site stands in for the real one
+    pytest.importorskip('pyftpdlib')
+
+    from pyftpdlib.authorizers import DummyAuthorizer
+    from pyftpdlib.handlers import FTPHandler
+    from pyftpdlib.servers import FTPServer
+
+    data_file_path: str = os.path.dirname(os.path.abspath(__file__))
+
+    # create the ftp site files
+    site_dir: str = os.path.join(data_file_path, 'ftp_site')
+    os.makedirs(site_dir, exist_ok=True)
+
+    file_list: list = [f'file_{idx}.gaf' for idx in range(6)]
+
+    for idx, file_name in enumerate(file_list):
+        with open(os.path.join(site_dir, file_name), 'w') as fp:
+            fp.write('line\n' * (idx + 1) * 1000)
+
+    # start the ftp site on a free port
+    authorizer = DummyAuthorizer()
+    authorizer.add_anonymous(site_dir)
+
+    handler = FTPHandler
+    handler.authorizer = authorizer
+
+    server = FTPServer(('127.0.0.1', 0), handler)
+    port: int = server.socket.getsockname()[1]
+
+    server_thread = threading.Thread(target=server.serve_forever, kwargs={'timeout': 0.1, 'handle_exit': False}, daemon=True)
+    server_thread.start()
+
+    download_dir: str = os.path.join(data_file_path, 'ftp_download')
+
+    try:
+        ftp_manager: FTPDownloadManager = FTPDownloadManager('127.0.0.1', '/', connections=3, retries=2, retry_wait=0, port=port)
+
+        # nothing is recorded if nothing is retrieved
+        assert(ftp_manager.download(['missing.gaf'], download_dir) == 0)
+        assert(not os.path.exists(os.path.join(download_dir, FTPDownloadManager.MANIFEST_FILE_NAME)))
+
+        # get all the files plus one that is not there
+        file_count: int = ftp_manager.download(file_list + ['missing.gaf'], download_dir)
+
+        assert(file_count == len(file_list))
+        assert(ftp_manager.progress['retrieved'] == len(file_list) and ftp_manager.failed_files == ['missing.gaf'])
+
+        for file_name in file_list:
+            assert(os.path.getsize(os.path.join(download_dir, file_name)) == os.path.getsize(os.path.join(site_dir, file_name)))
+
+        # the files are complete so nothing is retrieved the second time and the manifest is left alone
+        manifest_mtime: int = os.stat(os.path.join(download_dir, FTPDownloadManager.MANIFEST_FILE_NAME)).st_mtime_ns
+
+        file_count = ftp_manager.download(file_list, download_dir)
+
+        assert(file_count == len(file_list) and ftp_manager.progress['skipped'] == len(file_list))
+        assert(os.stat(os.path.join(download_dir, FTPDownloadManager.MANIFEST_FILE_NAME)).st_mtime_ns == manifest_mtime)
+
+        # change a file on the site
+        time.sleep(1)
+
+        with open(os.path.join(site_dir, file_list[0]), 'a') as fp:
+            fp.write('new line\n')
+
+        # only the changed file is retrieved
+        file_count = ftp_manager.download(file_list, download_dir)
+
+        assert(file_count == len(file_list) and ftp_manager.progress['retrieved'] == 1)
+        assert(os.path.getsize(os.path.join(download_dir, file_list[0])) == os.path.getsize(os.path.join(site_dir, file_list[0])))
+
+        # a changed file of the same size is found by its manifest entry even if the local copy is newer
+        with open(os.path.join(site_dir, file_list[1]), 'r+') as fp:
+            fp.write('LINE\n')
+
+        os.utime(os.path.join(download_dir, file_list[1]), (time.time() + 3600, time.time() + 3600))
+
+        file_count = ftp_manager.download(file_list, download_dir)
+
+        assert(file_count == len(file_list) and ftp_manager.progress['retrieved'] == 1)
+
+        # an interrupted transfer leaves a partial temp file
+        remote_size: int = os.path.getsize(os.path.join(site_dir, file_list[5]))
+
+        with open(os.path.join(site_dir, file_list[5]), 'a') as fp:
+            fp.write('new line\n')
+
+        ftp_manager.manifest = ftp_manager.read_manifest(download_dir)
+        ftp_manager.update_manifest(download_dir, file_list[5], 'partial', remote_size + 9, FTPDownloadManager.get_remote_stats(ftp_manager.get_connection(), file_list[5])[1])
+        ftp_manager.close_all_connections()
+
+        with open(os.path.join(site_dir, file_list[5]), 'rb') as site_fp, open(os.path.join(download_dir, file_list[5] + '.part'), 'wb') as fp:
+            fp.write(site_fp.read(1000))
+
+        # only the rest of the file is transferred
+        file_count = ftp_manager.download(file_list, download_dir)
+
+        assert(file_count == len(file_list) and ftp_manager.progress['retrieved'] == 1 and ftp_manager.progress['bytes'] == remote_size + 9 - 1000)
+
+        with open(os.path.join(site_dir, file_list[5]), 'rb') as site_fp, open(os.path.join(download_dir, file_list[5]), 'rb') as fp:
+            assert(fp.read() == site_fp.read())
+
+        assert(not os.path.exists(os.path.join(download_dir, file_list[5] + '.part')))
+    finally:
+        # shut down the ftp site and remove the test data
+        server.close_all()
+        shutil.rmtree(site_dir)
+        shutil.rmtree(download_dir, ignore_errors=True)
+
+
 def test_edge_norm():
     # get the edge norm object
     en = EdgeNormUtils()
@@ -115,4 +457,118 @@ def test_get_node_synonym():
     ret_val = nn.get_node_synonyms('MONDO:0018800')
 
     # check the count
-    assert(len(ret_val) == 7)
\ No newline at end of file
+    assert(len(ret_val) == 7)
+
+def test_triple_reader():
+    # create some lines in the UberGraph style, plus the other kinds of terms
+    lines: list = ['<http://purl.obolibrary.org/obo/UBERON_0011150> <http://purl.obolibrary.org/obo/uberon/core#site_of> <http://purl.obolibrary.org/obo/GO_0055065> .\n',
+                   '<http://purl.obolibrary.org/obo/MONDO_0011245> <http://purl.obolibrary.org/obo/RO_0004023> <http://identifiers.org/hgnc/4284> .\n',
+                   '\n',
+                   '# a comment\n',
+                   '@prefix obo: <http://purl.obolibrary.org/obo/> .\n',
+                   'obo:CL_0000000 <http://www.w3.org/2000/01/rdf-schema#label> "cell \\"type\\"\\u00e9"@en .\n',
+                   '_:b0 <http://www.w3.org/2002/07/owl#someValuesFrom> <http://www.ebi.ac.uk/efo/EFO_0003858> .\n']
+
+    triples: list = list(TripleReader().read(io.StringIO(''.join(lines))))
+
+    assert(triples == [('UBERON:0011150', 'site_of', 'GO:0055065'),
+                       ('MONDO:0011245', 'RO:0004023', '4284'),
+                       ('CL:0000000', 'label', 'cell "type"é'),
+                       ('_:b0', 'someValuesFrom', 'EFO:0003858')])
+
+    # the IRIs get the same CURIEs the rdflib qnames gave them
+    g = Graph()
+
+    for iri in ['http://purl.obolibrary.org/obo/NCBITaxon_9606', 'http://purl.obolibrary.org/obo/BFO_0000050', 'http://www.w3.org/2002/07/owl#Thing', 'http://purl.obolibrary.org/obo/go#part_of']:
+        qname: str = g.compute_qname(iri)[2]
+
+        assert(TripleReader().get_curie(iri) == (qname if qname.islower() else qname.replace('_', ':')))
+
+
+def test_spill_dedup_writer():
+    data_file_path: str = os.path.dirname(os.path.abspath(__file__))
+
+    # create a writer with a few partitions
+    writer: SpillDedupWriter = SpillDedupWriter(data_file_path, partitions=4)
+
+    try:
+        # add records with lots of duplicates
+        for idx in range(1000):
+            writer.add(f'record_{idx % 100}')
+
+        out_f = io.StringIO()
+
+        # write them out as json
+        record_count: int = writer.write(out_f, 'json')
+
+        # each record is written once
+        assert(record_count == 100 and writer.added == 1000)
+        assert(sorted(out_f.getvalue().split(',\n')) == sorted(f'record_{idx}' for idx in range(100)))
+    finally:
+        writer.close()
+
+    # the temp files are gone
+    assert(not os.path.exists(writer.partition_dir))
+
+
+def test_group_edge_builder():
+    # create two groups of nodes, the second one has no subject node
+    df = pd.DataFrame([{'grp': 'a', 'node_num': 1, 'id': 'NCBITaxon:1', 'unit': ''},
+                       {'grp': 'a', 'node_num': 2, 'id': 'CHEBI:1', 'unit': 'mg/100g'},
+                       {'grp': 'b', 'node_num': 2, 'id': 'CHEBI:2', 'unit': 'mg/100g'},
+                       {'grp': 'a', 'node_num': 3, 'id': 'FDB000001', 'unit': 'g/100g'}])
+
+    # join the groups
+    edges = GroupEdgeBuilder.get_group_edges(df, edge_columns=['unit'])
+
+    # only the nodes of the group with a subject get an edge
+    assert(edges.to_dict('records') == [{'subject': 'NCBITaxon:1', 'object': 'CHEBI:1', 'unit': 'mg/100g'}, {'subject': 'NCBITaxon:1', 'object': 'FDB000001', 'unit': 'g/100g'}])
+
+    # the ids are the md5 of the edge parts
+    edges['relation'] = 'RO:0001019'
+    edges['edge_label'] = 'related_to'
+
+    assert(GroupEdgeBuilder.get_edge_ids(edges)[0] == hashlib.md5('NCBITaxon:1RO:0001019related_toCHEBI:1'.encode('utf-8')).hexdigest())
+
+
+def test_get_dataframe_from_csv():
+    gd = GetData()
+
+    # get the path to the sample FooDB contents file
+    data_file: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'resources', 'contents.csv')
+
+    columns: dict = {'food_id': 'category', 'source_id': 'category', 'source_type': 'category', 'orig_unit': 'category', 'orig_max': 'category'}
+
+    # save the file times so they can be put back
+    file_stat = os.stat(data_file)
+
+    try:
+        # load the columns, this creates the cache
+        df = gd.get_dataframe_from_csv(data_file, columns)
+
+        # only the requested columns come back with the values as they are in the file
+        assert(list(df.columns) == list(columns) and len(df) == 4)
+        assert(str(df['source_type'].dtype) == 'category' and df['orig_max'].iloc[0] == 'NULL')
+
+        # the second load comes from the cache
+        cache_files: list = [file_name for file_name in os.listdir(os.path.dirname(data_file)) if file_name.startswith('contents.csv.')]
+
+        assert(len(cache_files) == 1 and cache_files[0].endswith('.feather'))
+        assert(gd.get_dataframe_from_csv(data_file, columns).equals(df))
+
+        # a new version of the file replaces the old cache
+        os.utime(data_file, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns + 1000000000))
+
+        assert(gd.get_dataframe_from_csv(data_file, columns).equals(df))
+
+        new_cache_files: list = [file_name for file_name in os.listdir(os.path.dirname(data_file)) if file_name.startswith('contents.csv.')]
+
+        assert(len(new_cache_files) == 1 and new_cache_files != cache_files)
+    finally:
+        # put the file time back
+        os.utime(data_file, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns))
+
+        # remove the cache
+        for file_name in os.listdir(os.path.dirname(data_file)):
+            if file_name.startswith('contents.csv.'):
+                os.remove(os.path.join(os.path.dirname(data_file), file_name))
@@ -0,0 +1,306 @@
+import os
+import re
+import logging
+import threading
+
+from functools import lru_cache
+
+from Common.utils import LoggingUtil
+from pathlib import Path
+
+
+class PrefixTrie:
+    """
+    Class that finds the longest known prefix of a string.
+
+    the trie is a tree of dicts keyed by character. the value of a prefix is saved under the
+    END key of the node where the prefix ends.
+    """
+
+    # the key of the value of a prefix, it can not be a single character
+    END: str = '<end>'
+
+    def __init__(self, prefixes: dict = None):
+        """
+        constructor
+
+        :param prefixes: optional dict of prefix to value to add to the trie
+        """
+        # init the root of the trie
+        self.root: dict = {}
+
+        # add the prefixes passed
+        for prefix, value in (prefixes or {}).items():
+            self.add(prefix, value)
+
+    def add(self, prefix: str, value):
+        """
+        adds a prefix to the trie
+
+        :param prefix: the prefix
+        :param value: the value returned when the prefix is matched
+        :return: nothing
+        """
+        # start at the top
+        node: dict = self.root
+
+        # walk down the trie, adding nodes as needed
+        for char in prefix:
+            node = node.setdefault(char, {})
+
+        # save the value at the end of the prefix
+        node[self.END] = value
+
+    def longest_match(self, text: str) -> tuple:
+        """
+        finds the longest prefix in the trie that text starts with
+
+        :param text: the string to match
+        :return: the length of the prefix and its value, or (0, None) if no prefix matched
+        """
+        # init the return values
+        match_len: int = 0
+        match_value = None
+
+        # start at the top
+        node: dict = self.root
+
+        # walk down the trie as far as the text goes
+        for idx, char in enumerate(text):
+            node = node.get(char)
+
+            # no more prefixes along this path
+            if node is None:
+                break
+
+            # save the longest prefix found so far
+            if self.END in node:
+                match_len, match_value = idx + 1, node[self.END]
+
+        # return to the caller
+        return match_len, match_value
+
+
+class CurieConverter:
+    """
+    Class that converts IRIs to CURIEs.
+
+    the longest known IRI prefix is found with a prefix trie, for example
+    http://purl.obolibrary.org/obo/UBERON_0011150 becomes UBERON:0011150. IRIs that do not start with
+    a known prefix get the qname treatment the rdflib graph gave them: the local name after the last
+    '/' or '#', with '_' replaced by ':' if the name is not all lower case.
+
+    the same IRIs come up over and over in RDF data so the conversions are kept in a LRU cache.
+    """
+
+    # the OBO ontology prefixes, their IRIs look like http://purl.obolibrary.org/obo/{prefix}_{id}
+    OBO_PREFIXES: tuple = ('BFO', 'BSPO', 'CARO', 'CHEBI', 'CHMO', 'CL', 'CLO', 'DOID', 'ECO', 'EMAPA', 'ENVO', 'FAO', 'FBbt', 'FBdv', 'FMA', 'FOODON',
+                           'GO', 'HP', 'HsapDv', 'IAO', 'MA', 'MAXO', 'MF', 'MFOMD', 'MI', 'MONDO', 'MP', 'MPATH', 'NBO', 'NCBITaxon', 'NCIT', 'OBA',
+                           'OBI', 'OGMS', 'OMIT', 'PATO', 'PCO', 'PO', 'PR', 'RO', 'SO', 'STATO', 'TO', 'UBERON', 'UO', 'UPHENO', 'VT', 'WBbt',
+                           'WBls', 'XAO', 'ZFA', 'ZFS')
+
+    # the IRI prefixes of the ids found in UberGraph and the CURIE prefix each one becomes
+    DEFAULT_PREFIXES: dict = {**{f'http://purl.obolibrary.org/obo/{prefix}_': f'{prefix}:' for prefix in OBO_PREFIXES},
+                              'http://www.ebi.ac.uk/efo/EFO_': 'EFO:'}
+
+    # the converters shared by all readers, by prefix set
+    shared_converters: dict = {}
+    shared_lock: threading.Lock = threading.Lock()
+
+    def __init__(self, prefixes: dict = None, cache_size: int = 1048576):
+        """
+        constructor
+
+        :param prefixes: optional dict of IRI prefix to CURIE prefix, defaults to the OBO prefixes
+        :param cache_size: the number of conversions kept
+        """
+        # create the trie of known IRI prefixes
+        self.prefix_trie: PrefixTrie = PrefixTrie(self.DEFAULT_PREFIXES if prefixes is None else prefixes)
+
+        # cache the conversions made by this converter
+        self.get_curie = lru_cache(maxsize=cache_size)(self.convert)
+
+    @classmethod
+    def get_shared(cls, prefixes: dict = None):
+        """
+        gets the converter shared by everything using the same prefixes so the cached conversions are reused
+
+        :param prefixes: optional dict of IRI prefix to CURIE prefix, defaults to the OBO prefixes
+        :return: the shared CurieConverter
+        """
+        # get the key of the prefix set
+        key: frozenset = frozenset((cls.DEFAULT_PREFIXES if prefixes is None else prefixes).items())
+
+        # only one thread creates a converter
+        with cls.shared_lock:
+            # create the converter on first use
+            if key not in cls.shared_converters:
+                cls.shared_converters[key] = cls(prefixes)
+
+        # return to the caller
+        return cls.shared_converters[key]
+
+    def convert(self, iri: str) -> str:
+        """
+        converts an IRI to a CURIE without using the cache
+
+        :param iri: the IRI
+        :return: the CURIE
+        """
+        # look for a known prefix
+        prefix_len, curie_prefix = self.prefix_trie.longest_match(iri)
+
+        # swap the prefix if one was found
+        if curie_prefix is not None:
+            return curie_prefix + iri[prefix_len:]
+
+        # otherwise get the local name
+        local_name: str = iri[max(iri.rfind('/'), iri.rfind('#')) + 1:]
+
+        # if string is all lower it is not a curie, otherwise replace the underscores to create one
+        if not local_name.islower():
+            local_name = local_name.replace('_', ':')
+
+        # return to the caller
+        return local_name
+
+
+class TripleReader:
+    """
+    Class that streams (subject, predicate, object) tuples out of N-Triples style files.
+
+    each line of the file is parsed on its own so no graph is built in memory. IRIs are converted
+    to CURIEs with a shared CurieConverter.
+    """
+
+    # a term is an IRI, a blank node, a literal with an optional language or data type or a prefixed name
+    TERM: str = r'(<[^>]*>|_:\S+|"(?:[^"\\]|\\.)*"(?:@[\w-]+|\^\^<[^>]*>)?|[A-Za-z][\w.-]*?:\S*|:\S*)'
+
+    # a triple is three terms followed by a period
+    TRIPLE_RE = re.compile(rf'\s*{TERM}\s+{TERM}\s+{TERM}\s*\.\s*$')
+
+    # a turtle or sparql style prefix declaration
+    PREFIX_RE = re.compile(r'\s*(?:@prefix|PREFIX)\s+([\w.-]*):\s*<([^>]*)>\s*\.?\s*$', re.IGNORECASE)
+
+    # the escape sequences in a literal
+    ESCAPE_RE = re.compile(r'\\(u[0-9A-Fa-f]{4}|U[0-9A-Fa-f]{8}|.)')
+    ESCAPES: dict = {'t': '\t', 'b': '\b', 'n': '\n', 'r': '\r', 'f': '\f', '"': '"', "'": "'", '\\': '\\'}
+
+    def __init__(self, prefixes: dict = None, log_level=logging.INFO):
+        """
+        constructor
+
+        :param prefixes: optional dict of IRI prefix to CURIE prefix, defaults to the OBO prefixes
+        :param log_level - overrides default log level
+        """
+        # create a logger
+        self.logger = LoggingUtil.init_logging("Data_services.Common.TripleReader", level=log_level, line_format='medium', log_file_path=os.path.join(Path(__file__).parents[1], 'logs'))
+
+        # get the IRI to CURIE converter shared with the other readers
+        self.curie_converter: CurieConverter = CurieConverter.get_shared(prefixes)
+
+        # use its cached conversions
+        self.get_curie = self.curie_converter.get_curie
+
+        # the namespaces declared in the file for prefixed names
+        self.namespaces: dict = {}
+
+    def read(self, fp) -> iter:
+        """
+        gets the triples from the text file handle passed
+
+        :param fp: open text file pointer
+        :return: iterator of (subject, predicate, object) tuples
+        """
+        # for the lines in the file
+        for line in fp:
+            # parse the line
+            triple: tuple = self.parse_line(line)
+
+            # return the triple if there was one
+            if triple is not None:
+                yield triple
+
+    def parse_line(self, line: str):
+        """
+        parses a line of the file
+
+        :param line: the line of text
+        :return: the (subject, predicate, object) tuple or None if the line has no triple
+        """
+        # split out the terms
+        match = self.TRIPLE_RE.match(line)
+
+        # did we get a triple
+        if match is not None:
+            # convert the terms
+            return self.get_value(match.group(1)), self.get_value(match.group(2)), self.get_value(match.group(3))
+
+        # get the line text
+        text: str = line.strip()
+
+        # skip over blank lines and comments
+        if not text or text.startswith('#'):
+            return None
+
+        # save namespace declarations for the prefixed names that follow
+        prefix_match = self.PREFIX_RE.match(text)
+
+        if prefix_match is not None:
+            self.namespaces[prefix_match.group(1)] = prefix_match.group(2)
+        else:
+            self.logger.warning(f'Unparsable triple line skipped: {text[:200]}')
+
+        # return to the caller
+        return None
+
+    def get_value(self, term: str) -> str:
+        """
+        gets the value of a parsed term
+
+        :param term: the term text, ex. <http://purl.obolibrary.org/obo/GO_0055065>
+        :return: the CURIE of an IRI, the label of a blank node or the text of a literal
+        """
+        # an IRI
+        if term[0] == '<':
+            return self.get_curie(term[1:-1])
+
+        # a literal, drop the language or data type
+        if term[0] == '"':
+            text: str = term[1:term.rindex('"')]
+
+            # convert any escape sequences
+            if '\\' in text:
+                text = self.ESCAPE_RE.sub(self.unescape, text)
+
+            return text
+
+        # a blank node
+        if term.startswith('_:'):
+            return term
+
+        # a prefixed name, expand it with the declared namespace
+        prefix, local_name = term.split(':', 1)
+
+        if prefix in self.namespaces:
+            return self.get_curie(self.namespaces[prefix] + local_name)
+
+        # return it as is to the caller
+        return term
+
+    def unescape(self, match) -> str:
+        """
+        converts an escape sequence found in a literal
+
+        :param match: the regex match of the escape sequence
+        :return: the character
+        """
+        # get the escaped text
+        escape: str = match.group(1)
+
+        # unicode escapes
+        if escape[0] in 'uU' and len(escape) > 1:
+            return chr(int(escape[1:], 16))
+
+        # return to the caller
+        return self.ESCAPES.get(escape, escape)
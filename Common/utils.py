@@ -1,16 +1,31 @@
 import os
+import re
+import mmap
 import logging
 import tarfile
 import csv
 import gzip
+import time
+import json
+import hashlib
+import bisect
+import zlib
+import shutil
+import tempfile
+import threading
 import requests
 import pandas as pd
 
 from rdflib import Graph
-from urllib.request import urlopen
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from email.utils import formatdate
+from array import array
 from csv import reader, DictReader
-from ftplib import FTP
-from datetime import datetime
+from ftplib import FTP, error_perm
+from queue import Queue, Empty
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
@@ -185,11 +200,8 @@ class NodeNormUtils:
                     # convert json to dict
                     rvs: dict = resp.json()
 
-                    # merge this list with what we have gotten so far
-                    merged = {**cached_node_norms, **rvs}
-
-                    # save the merged list
-                    cached_node_norms = merged
+                    # merge this list with what we have gotten so far. this updates the callers cache
+                    cached_node_norms.update(rvs)
                 else:
                     # the error that is trapped here means that the entire list of nodes didnt get normalized.
                     self.logger.error(f'Node norm response code: {resp.status_code}')
@@ -381,11 +393,8 @@ class EdgeNormUtils:
                     # convert json to dict
                     rvs: dict = resp.json()
 
-                    # merge this list with what we have gotten so far
-                    merged = {**cached_edge_norms, **rvs}
-
-                    # save the merged list
-                    cached_edge_norms = merged
+                    # merge this list with what we have gotten so far. this updates the callers cache
+                    cached_edge_norms.update(rvs)
                 else:
                     # the error that is trapped here means that the entire list of nodes didnt get normalized.
                     self.logger.debug(f'Edge norm response code: {resp.status_code}')
@@ -435,446 +444,1141 @@ class EdgeNormUtils:
         return failed_to_normalize
 
 
-class GetData:
+class FTPDownloadManager:
     """
-    Class that contains methods that can be used to get various data sets.
+    Class that downloads a list of files from a FTP directory over a pool of logged in connections.
+
+    each file is retried on its own when a transfer fails. the remote size (SIZE) and modification time (MDTM)
+    of every file retrieved are kept in a manifest in the destination directory. files whose manifest entry
+    still matches the remote values are not downloaded again. files are transferred to a temp name and renamed
+    when complete, and a temp file left by an interrupted transfer of the same remote file is resumed (REST).
     """
 
-    def __init__(self, log_level=logging.INFO):
-        """
-        constructor
-        :param log_level - overrides default log level
-        """
-        # create a logger
-        self.logger = LoggingUtil.init_logging("Data_services.Common.GetData", level=log_level, line_format='short', log_file_path=os.path.join(Path(__file__).parents[1], 'logs'))
+    # the name of the manifest file in the destination directory
+    MANIFEST_FILE_NAME: str = '.ftp_manifest'
 
-    def pull_via_ftp(self, ftp_site: str, ftp_dir: str, ftp_files: list, data_file_path: str) -> int:
+    def __init__(self, ftp_site: str, ftp_dir: str, connections: int = 4, retries: int = 5, retry_wait: float = 2, port: int = 21, timeout: int = 120, log_level=logging.INFO):
         """
-        gets the requested files from UniProtKB ftp directory
+        constructor
 
         :param ftp_site: url of the ftp site
         :param ftp_dir: the directory in the site
-        :param ftp_files: the name of the file to capture
-        :param data_file_path: the destination of the captured file
-        :return: boolean pass/fail
+        :param connections: the number of simultaneous connections to the site
+        :param retries: the number of attempts to make for each file
+        :param retry_wait: the number of seconds to wait before retrying a file, multiplied by the attempt number
+        :param port: the ftp port of the site
+        :param timeout: the connection timeout in seconds
+        :param log_level - overrides default log level
         """
+        # create a logger
+        self.logger = LoggingUtil.init_logging("Data_services.Common.FTPDownloadManager", level=log_level, line_format='short', log_file_path=os.path.join(Path(__file__).parents[1], 'logs'))
 
-        # init a retrieved file counter for the return
-        file_counter: int = 0
+        # save the site details
+        self.ftp_site: str = ftp_site
+        self.ftp_dir: str = ftp_dir
+        self.port: int = port
+        self.timeout: int = timeout
 
-        try:
-            # open the FTP connection and go to the directory
-            ftp: FTP = FTP(ftp_site)
-            ftp.login()
-            ftp.cwd(ftp_dir)
+        # save the transfer settings
+        self.connections: int = max(connections, 1)
+        self.retries: int = max(retries, 1)
+        self.retry_wait: float = retry_wait
 
-            # if the target directory doesnt exist, create it
-            if not os.path.exists(data_file_path):
-                os.makedirs(data_file_path)
+        # storage for the idle logged in connections
+        self.connection_pool: Queue = Queue()
 
-            # for each file requested
-            for f in ftp_files:
-                self.logger.debug(f'Retrieving {ftp_site}{ftp_dir}{f} -> {data_file_path}')
+        # progress metrics for the current download, guarded by the lock
+        self.progress_lock: threading.Lock = threading.Lock()
+        self.progress: dict = {}
+        self.failed_files: list = []
 
-                # does the file exist and has data in it
-                try:
-                    size: int = os.path.getsize(os.path.join(data_file_path, f))
-                except FileNotFoundError:
-                    size: int = 0
+        # the manifest entries of the destination directory, guarded by the lock
+        self.manifest_lock: threading.Lock = threading.Lock()
+        self.manifest: dict = {}
+        self.manifest_changed: bool = False
 
-                # if we have a size we done need to get the file
-                if size == 0:
-                    # open the file
-                    with open(os.path.join(data_file_path, f), 'wb') as fp:
-                        # get the file data into a file
-                        ftp.retrbinary(f'RETR {f}', fp.write)
+    def download(self, ftp_files: list, data_file_path: str) -> int:
+        """
+        gets the requested files from the ftp directory
 
-                # inform user of progress
-                file_counter += 1
+        :param ftp_files: the names of the files to capture
+        :param data_file_path: the destination of the captured files
+        :return: the number of files that are in the destination, retrieved or already complete
+        """
+        # if the target directory doesnt exist, create it
+        if not os.path.exists(data_file_path):
+            os.makedirs(data_file_path)
 
-                if file_counter % 50 == 0:
-                    self.logger.debug(f'{file_counter} files retrieved, {len(ftp_files) - file_counter} to go.')
+        # reset the progress metrics
+        self.progress = {'requested': len(ftp_files), 'retrieved': 0, 'skipped': 0, 'failed': 0, 'bytes': 0, 'start_time': time.time()}
+        self.failed_files = []
 
-            self.logger.debug(f'{file_counter} file(s) retrieved of {len(ftp_files)} requested.')
+        # load what is known about the files already in the destination
+        self.manifest = self.read_manifest(data_file_path)
+        self.manifest_changed = False
 
-            # close the ftp object
-            ftp.quit()
-        except Exception as e:
-            self.logger.error(f'Error: pull_via_ftp() failed. Exception: {e}')
+        self.logger.debug(f'Retrieving {len(ftp_files)} file(s) from {self.ftp_site}{self.ftp_dir} -> {data_file_path} over {self.connections} connection(s).')
 
-        # return pass/fail to the caller
-        return file_counter
+        try:
+            # get the files, each worker holds at most one connection at a time
+            with ThreadPoolExecutor(max_workers=self.connections) as executor:
+                list(executor.map(lambda ftp_file: self.fetch_file(ftp_file, data_file_path), ftp_files))
+        finally:
+            # log out of all the connections
+            self.close_all_connections()
 
-    def pull_via_http(self, url: str, data_dir: str) -> int:
-        """
-        gets the file from an http stream.
+            # rewrite the manifest with one entry per file if anything was recorded
+            if self.manifest_changed:
+                self.write_manifest(data_file_path)
 
-        :param url:
-        :param data_dir:
-        :return: the number of bytes read
-        """
+        # get the elapsed time
+        elapsed: float = max(time.time() - self.progress['start_time'], 0.001)
 
-        # get the filename
-        data_file: str = url.split('/')[-1]
+        self.logger.debug(f"{self.progress['retrieved']} file(s) retrieved, {self.progress['skipped']} already complete, {self.progress['failed']} failed of {len(ftp_files)} requested. "
+                          f"{self.progress['bytes']} bytes in {elapsed:.1f} seconds ({self.progress['bytes'] / elapsed / 1048576:.2f} MB/s).")
 
-        # init the byte counter
-        byte_counter: int = 0
+        # report any failures
+        if self.failed_files:
+            self.logger.error(f'Error: Failed to retrieve {len(self.failed_files)} file(s): {", ".join(self.failed_files)}')
 
-        # get the file if its not there
-        if not os.path.exists(os.path.join(data_dir, data_file)):
-            self.logger.debug(f'Retrieving {url} -> {data_dir}')
+        # return the number of files that are in place to the caller
+        return self.progress['retrieved'] + self.progress['skipped']
 
-            # get the file
-            file_data = urlopen(url)
+    def fetch_file(self, ftp_file: str, data_file_path: str):
+        """
+        gets a single file, retrying the transfer on a fresh connection if it fails
 
-            # open a file for the data
-            with open(os.path.join(data_dir, data_file), 'wb') as fp:
-                # init the retrieve bytes by block size
-                block = 8192
+        :param ftp_file: the name of the file to capture
+        :param data_file_path: the destination of the captured file
+        :return:
+        """
+        # init the outcome of the transfer
+        outcome: str = 'failed'
+        byte_count: int = 0
 
-                # until all bytes read
-                while True:
-                    # get some bytes
-                    buffer = file_data.read(block)
+        # for each attempt
+        for attempt in range(1, self.retries + 1):
+            # init the connection
+            ftp = None
 
-                    # did we run out of data
-                    if not buffer:
-                        break
+            try:
+                # get a logged in connection
+                ftp = self.get_connection()
 
-                    # keep track of the number of bytes transferred
-                    byte_counter += len(buffer)
+                # get the file
+                byte_count = self.get_file(ftp, ftp_file, data_file_path)
 
-                    # output the data to the file
-                    fp.write(buffer)
-        else:
-            byte_counter = 1
+                # was the file already there
+                outcome = 'retrieved' if byte_count >= 0 else 'skipped'
 
-        # return the number of bytes read
-        return byte_counter
+                # put the connection back for the next file
+                self.connection_pool.put(ftp)
 
-    def get_swiss_prot_id_set(self, data_dir: str, debug_mode=False) -> set:
-        """
-        gets/parses the swiss-prot listing file and returns a set of uniprot kb ids from
-        ftp://ftp.uniprot.org/pub/databases/uniprot/current_release/knowledgebase/complete/uniprot_sprot.dat.gz.
+                break
+            # a permanent error (no such file, no permission) will not go away by trying again
+            except error_perm as e:
+                self.logger.error(f'Error: {ftp_file} could not be retrieved. Exception: {e}')
 
-        :param data_dir: the directory to place the file temporarily
-        :param debug_mode: flag it indicate debug mode
-        :return: a set of uniprot kb ids
-        """
+                # the connection is still good
+                if ftp is not None:
+                    self.connection_pool.put(ftp)
 
-        self.logger.debug('Start of swiss-prot curated uniprot id retrieval')
+                break
+            # anything else gets another try on a new connection
+            except Exception as e:
+                self.logger.warning(f'Retrieval of {ftp_file} failed, attempt {attempt} of {self.retries}. Exception: {e}')
 
-        # init the return value
-        ret_val: set = set()
+                # drop the connection, it may be what went wrong
+                self.close_connection(ftp)
 
-        # the name of the tar file that has the target data file
-        data_file_name = 'uniprot_sprot.dat.gz'
+                # wait a bit before trying again
+                if attempt < self.retries:
+                    time.sleep(self.retry_wait * attempt)
 
-        # get the tar file that has the taxon id data
-        self.pull_via_ftp('ftp.uniprot.org', '/pub/databases/uniprot/current_release/knowledgebase/complete/', [data_file_name], data_dir)
+        # update the progress metrics
+        with self.progress_lock:
+            self.progress[outcome] += 1
+            self.progress['bytes'] += max(byte_count, 0)
 
-        # open the tar file
-        with gzip.open(os.path.join(data_dir, data_file_name), 'r') as zf:
-            # for each line in the file
-            for line in zf:
-                # turn the read value into a string
-                line = line.decode("utf-8")
+            # save the failure
+            if outcome == 'failed':
+                self.failed_files.append(ftp_file)
 
-                # is this one we are looking for
-                if line.startswith('AC'):
-                    # split the line to separate out the uniprot ids
-                    ids = line.split('   ')[1].split('; ')
+            # get the number of files done
+            done: int = self.progress['retrieved'] + self.progress['skipped'] + self.progress['failed']
 
-                    # save each protein item listed
-                    for item in ids:
-                        # save it
-                        ret_val.add(item.strip(';\n'))
+            # inform user of progress
+            if done % 50 == 0:
+                self.logger.debug(f"{done} files processed ({self.progress['retrieved']} retrieved, {self.progress['skipped']} already complete, {self.progress['failed']} failed), {self.progress['requested'] - done} to go.")
 
-        # do not remove the file if in debug mode
-        if self.logger.level != logging.DEBUG and not debug_mode:
-            # remove the target file
-            os.remove(os.path.join(data_dir, data_file_name))
+    def get_file(self, ftp: FTP, ftp_file: str, data_file_path: str) -> int:
+        """
+        gets a file if the local copy is missing or out of date. the file is written
+        to a temp file and moved into place once it is complete.
 
-        self.logger.debug(f'End of swiss-prot uniprot id retrieval. {len(ret_val)} retrieved.')
+        :param ftp: the logged in connection
+        :param ftp_file: the name of the file to capture
+        :param data_file_path: the destination of the captured file
+        :return: the number of bytes retrieved or -1 if the local file is already complete
+        """
+        # get the local file name
+        local_file: str = os.path.join(data_file_path, ftp_file)
 
-        # return the list
-        return ret_val
+        # get the remote file details
+        remote_size, remote_mtime = self.get_remote_stats(ftp, ftp_file)
 
-    def get_ncbi_taxon_id_set(self, taxon_data_dir, organism_type: str) -> set:
-        """
-        gets the files associated with viruses (and/or maybe bacteria)
-        the nodes.dmp file can be found in the archive: ftp://ftp.ncbi.nih.gov/pub/taxonomy/taxdump.tar.gz
+        # get what is known about the local copy
+        entry: dict = self.manifest.get(ftp_file)
 
-        :param: the organism type
-        :return: a list of file indexes
-        """
+        # no need to get the file if we already have it
+        if self.is_current(local_file, entry, remote_size, remote_mtime):
+            return -1
 
-        self.logger.debug(f'Start of NCBI taxon retrieval.')
+        # get the file into a temp file
+        temp_file: str = local_file + '.part'
 
-        # init the return value
-        ret_val: set = set()
+        # init the resume point
+        offset: int = 0
 
-        # the name of the tar file that has the target data file
-        data_file_name = 'taxdump.tar.gz'
+        # a temp file from an interrupted transfer of the same remote file can be resumed
+        if entry is not None and entry['state'] == 'partial' and os.path.exists(temp_file) and self.is_same_remote(entry, remote_size, remote_mtime):
+            offset = os.path.getsize(temp_file)
 
-        # get the tar file that has the taxon id data
-        self.pull_via_ftp('ftp.ncbi.nih.gov', '/pub/taxonomy', [data_file_name], taxon_data_dir)
+            # a temp file larger than the remote file is no good
+            if remote_size is not None and offset > remote_size:
+                offset = 0
+        # else record the remote file the temp file is for, if it can be identified
+        elif remote_size is not None or remote_mtime is not None:
+            self.update_manifest(data_file_path, ftp_file, 'partial', remote_size, remote_mtime)
 
-        # open the tar file
-        tar_file = tarfile.open(os.path.join(taxon_data_dir, data_file_name), 'r:gz')
+        try:
+            # get the rest of the file, or all of it
+            with open(temp_file, 'ab' if offset > 0 else 'wb') as fp:
+                ftp.retrbinary(f'RETR {ftp_file}', fp.write, blocksize=1048576, rest=offset if offset > 0 else None)
+        except error_perm as e:
+            # a site that refuses the restart gets asked for the whole file
+            if offset == 0 or not str(e).startswith(('500', '501', '502', '504')):
+                raise
 
-        # get a reference to the file
-        fp = tar_file.extractfile('nodes.dmp')
+            self.logger.debug(f'Resume of {ftp_file} refused, retrieving the whole file. Exception: {e}')
 
-        # read in the file lines
-        lines = fp.readlines()
+            offset = 0
 
-        # for each line in the file
-        for line in lines:
-            # remove the trailing \t and split by the line delimiter
-            new_line = line.decode('utf-8').strip().split('\t|\t')
+            with open(temp_file, 'wb') as fp:
+                ftp.retrbinary(f'RETR {ftp_file}', fp.write, blocksize=1048576)
 
-            # get all the elements in the line without \t
-            parts = [x.strip() for x in new_line]
+        # get the size of the completed file
+        file_size: int = os.path.getsize(temp_file)
 
-            # is this one we are looking for
-            if parts[4] == organism_type:
-                # save it
-                ret_val.add(parts[0])
+        # make sure we got all of it
+        if remote_size is not None and file_size != remote_size:
+            raise IOError(f'{ftp_file} incomplete. {file_size} of {remote_size} bytes retrieved.')
 
-        # close the files
-        fp.close()
-        tar_file.close()
+        # put the file in place
+        os.replace(temp_file, local_file)
 
-        # do not remove the file if in debug mode
-        if self.logger.level != logging.DEBUG:
-            # remove the target file
-            os.remove(os.path.join(taxon_data_dir, data_file_name))
+        # stamp the file with the remote modification time
+        if remote_mtime is not None:
+            os.utime(local_file, (remote_mtime, remote_mtime))
 
-        self.logger.debug(f'Start of NCBI taxon retrieval. {len(ret_val)} retrieved.')
+        # record the remote file the local file is a copy of
+        self.update_manifest(data_file_path, ftp_file, 'complete', remote_size, remote_mtime)
 
-        # return the list
-        return ret_val
+        # return the number of bytes retrieved to the caller
+        return file_size - offset
 
-    def get_uniprot_virus_date_stamp(self, data_dir):
+    @staticmethod
+    def get_remote_stats(ftp: FTP, ftp_file: str) -> tuple:
         """
-        retrieves and reads the only line in the uniprokb file "datestamp" that indicates the date
-        the data in the directory was created.
+        gets the size and modification time of a remote file
 
-        :return: the date stamp string
+        :param ftp: the logged in connection
+        :param ftp_file: the name of the file
+        :return: the size in bytes and the modification time as a timestamp, None for anything the site does not report
         """
+        # init the returns
+        remote_size = None
+        remote_mtime = None
 
-        # get the date stamp file
-        self.pull_via_ftp('ftp.ebi.ac.uk', '/pub/databases/GO/goa/proteomes', ['datestamp'], data_dir)
+        # sizes are reported for binary transfers
+        ftp.voidcmd('TYPE I')
 
-        # open the file and read the first line
-        with open(os.path.join(data_dir, 'datestamp'), 'r') as fp:
-            # get the line of text that is the date stamp
-            ret_val: str = fp.readline().strip('\n')
+        try:
+            # get the file size
+            remote_size = ftp.size(ftp_file)
+        except error_perm:
+            pass
 
-        os.remove(os.path.join(data_dir, 'datestamp'))
+        try:
+            # get the modification time, the response is like "213 20201019123456"
+            response: str = ftp.sendcmd(f'MDTM {ftp_file}')
+
+            remote_mtime = datetime.strptime(response[4:18], '%Y%m%d%H%M%S').replace(tzinfo=timezone.utc).timestamp()
+        except (error_perm, ValueError):
+            pass
 
         # return to the caller
-        return ret_val
+        return remote_size, remote_mtime
 
-    def get_uniprot_virus_file_list(self, proteome_data_dir: str, taxa_id_set: set) -> list:
+    def is_current(self, local_file: str, entry: dict, remote_size, remote_mtime) -> bool:
         """
-        gets the list of virus proteome file names that will be downloaded
-        the proteome2taxid file can be found in the ftp directory at: ftp://ftp.ebi.ac.uk/pub/databases/GO/goa/proteomes/
+        checks if a local file is a complete copy of the current remote file using its manifest entry
 
-        :param proteome_data_dir: the location of the proteome to taxon id conversion file
-        :param taxa_id_set: the set of taxa ids
-        :return: the set of file names to get
+        :param local_file: the path to the local file
+        :param entry: the manifest entry of the file or None if there is none
+        :param remote_size: the remote file size or None if unknown
+        :param remote_mtime: the remote modification timestamp or None if unknown
+        :return: True if the file does not need to be retrieved
         """
-        self.logger.debug(f'Start of uniprot virus file list retrieval.')
+        # files from before there was a manifest are checked against the local file details
+        if entry is None:
+            # record the file if it is good so the manifest is used next time
+            if self.is_complete(local_file, remote_size, remote_mtime):
+                self.update_manifest(os.path.dirname(local_file), os.path.basename(local_file), 'complete', remote_size, remote_mtime)
 
-        # init the return value
-        ret_val: list = []
+                return True
 
-        # storage for the final file list
-        files: list = []
+            return False
 
-        # set the data file name
-        data_file_name = 'proteome2taxid'
+        # the last transfer did not finish
+        if entry['state'] != 'complete':
+            return False
 
-        # get the proteome to taxon id file
-        file_count: int = self.pull_via_ftp('ftp.ebi.ac.uk', '/pub/databases/GO/goa/proteomes', [data_file_name], proteome_data_dir)
+        try:
+            # the local file must be there and the size it was when it was retrieved
+            if os.path.getsize(local_file) != entry['size'] and entry['size'] is not None:
+                return False
+        except FileNotFoundError:
+            return False
 
-        # did we get the file
-        if file_count == 1:
-            # open the file
-            with open(os.path.join(proteome_data_dir, data_file_name), 'r') as fp:
-                # create a csv reader for it
-                csv_reader: reader = csv.reader(fp, delimiter='\t')
+        # the remote file must not have changed since then
+        return self.is_same_remote(entry, remote_size, remote_mtime)
 
-                # spin through the list and get the file name
-                for line in csv_reader:
-                    # is this file in the list of target taxa
-                    if line[1] in taxa_id_set:
-                        # save the file in the list
-                        files.append(line[2])
+    @staticmethod
+    def is_same_remote(entry: dict, remote_size, remote_mtime) -> bool:
+        """
+        checks if a manifest entry was recorded for the current remote file
 
-            # add the sars cov-2 file manually
-            files.append('uniprot_sars-cov-2.gaf')
+        :param entry: the manifest entry of the file
+        :param remote_size: the remote file size or None if unknown
+        :param remote_mtime: the remote modification timestamp or None if unknown
+        :return: True if the size and modification time match
+        """
+        # without either value the remote file cannot be identified
+        if remote_size is None and remote_mtime is None:
+            return False
 
-            # sort the file list
-            ret_val = sorted(files)
+        # both values must match
+        return entry['size'] == remote_size and entry['mtime'] == remote_mtime
 
-            # close the file
-            fp.close()
+    @staticmethod
+    def is_complete(local_file: str, remote_size, remote_mtime) -> bool:
+        """
+        checks if a local file is a complete, current copy of the remote file
 
-            # do not remove the file if in debug mode
-            if self.logger.level != logging.DEBUG:
-                # remove the data file
-                os.remove(os.path.join(proteome_data_dir, data_file_name))
+        :param local_file: the path to the local file
+        :param remote_size: the remote file size or None if unknown
+        :param remote_mtime: the remote modification timestamp or None if unknown
+        :return: True if the file does not need to be retrieved
+        """
+        try:
+            # get the local file details
+            local_stats = os.stat(local_file)
+        except FileNotFoundError:
+            return False
 
-            self.logger.debug(f'End of uniprot virus file list retrieval. {len(ret_val)} retrieved.')
-        else:
-            self.logger.error(f'Error: {data_file_name} as not retrieved.')
+        # without a remote size all we can go on is that the file has data in it
+        if remote_size is None:
+            return local_stats.st_size > 0
 
-        # return the list to the caller
-        return ret_val
+        # the file must be the same size and not older than the remote file
+        return local_stats.st_size == remote_size and (remote_mtime is None or local_stats.st_mtime >= remote_mtime)
 
-    def get_goa_http_file(self, data_dir: str, data_file: str):
+    def read_manifest(self, data_file_path: str) -> dict:
         """
-        gets the GOA file via HTTP.
+        reads the manifest of a destination directory. each line is a json entry for a file, the last one for a file wins.
 
-        :param data_dir: the location where the data should be saved
-        :param data_file: the name of the file to get
-        :return int: the number of bytes read
+        :param data_file_path: the destination directory
+        :return: dict of file name to manifest entry
         """
-        self.logger.debug(f'Start of GOA file retrieval.')
+        # init the return
+        manifest: dict = {}
 
-        # get the rest of the files
-        byte_count: int = self.pull_via_http(f'http://current.geneontology.org/annotations/{data_file}', data_dir)
+        # get the manifest path
+        manifest_path: str = os.path.join(data_file_path, self.MANIFEST_FILE_NAME)
+
+        # no manifest yet
+        if not os.path.exists(manifest_path):
+            return manifest
+
+        with open(manifest_path, 'r') as fp:
+            for line in fp:
+                try:
+                    # load the entry
+                    entry: dict = json.loads(line)
+
+                    manifest[entry['file']] = entry
+                except (ValueError, KeyError):
+                    # a line cut short by a crash is skipped
+                    self.logger.debug(f'Skipping bad manifest line in {manifest_path}')
 
         # return to the caller
-        return byte_count
+        return manifest
 
-    def get_goa_ftp_files(self, data_dir: str, file_list: list, ftp_parent_dir: str, ftp_sub_dir: str) -> int:
+    def update_manifest(self, data_file_path: str, ftp_file: str, state: str, remote_size, remote_mtime):
         """
-        gets the uniprot GOA data file(s).
+        records the state of a file. the entry is appended to the manifest right away so it survives a crash.
 
-        :param data_dir: the data file(s) destination
-        :param file_list: the list of files
-        :param ftp_parent_dir: the ftp data parent directory
-        :param ftp_sub_dir: the ftp data sub directory
-        :return: the retrieved file count
+        :param data_file_path: the destination directory
+        :param ftp_file: the name of the file
+        :param state: 'partial' while the file is being transferred, 'complete' once it is in place
+        :param remote_size: the remote file size or None if unknown
+        :param remote_mtime: the remote modification timestamp or None if unknown
+        :return:
         """
-        self.logger.debug(f'Start of GOA file retrieval.')
-
-        # init some counters
-        attempts: int = 0
-        target_count: int = len(file_list)
-        file_count: int = 0
-
-        # a connection to this FTP site is not reliable
-        while attempts < 25:
-            try:
-                # get the rest of the files
-                file_count = self.pull_via_ftp('ftp.ebi.ac.uk', ftp_parent_dir + ftp_sub_dir, file_list, data_dir)
+        # create the entry
+        entry: dict = {'file': ftp_file, 'state': state, 'size': remote_size, 'mtime': remote_mtime}
 
-                # if we got all the files
-                if target_count != 0 and (target_count == file_count):
-                    break
-            # handle issues in file retrieval
-            except Exception as e:
-                self.logger.error(f'Error: target: {target_count}, actual: {file_count}, attempts: {attempts}, {e}')
-                attempts += 1
+        with self.manifest_lock:
+            # nothing to do if the file is already recorded this way
+            if self.manifest.get(ftp_file) == entry:
+                return
 
-        self.logger.debug(f'End of GOA file retrieval. {file_count} retrieved.')
+            # save the entry
+            self.manifest[ftp_file] = entry
+            self.manifest_changed = True
 
-        # return the number of files captured
-        return file_count
+            # append it to the manifest file
+            with open(os.path.join(data_file_path, self.MANIFEST_FILE_NAME), 'a') as fp:
+                fp.write(json.dumps(entry) + '\n')
 
-    @staticmethod
-    def format_normalization_failures(data_set_name: str, node_norm_failures: list, edge_norm_failures: list):
+    def write_manifest(self, data_file_path: str):
         """
-        outputs the nodes/edges that failed normalization
+        rewrites the manifest of a destination directory with only the latest entry for each file
 
-        :param data_set_name: the name of the data source that produced these results
-        :param node_norm_failures: set of node curies
-        :param edge_norm_failures: set of edge predicates
+        :param data_file_path: the destination directory
         :return:
         """
-        the_logger = LoggingUtil.init_logging(f"Data_services.Common.NormFailures.{data_set_name}", level=logging.INFO, line_format='minimum', log_file_path=os.path.join(Path(__file__).parents[1], 'logs'))
-
-        # get the list into a dataframe group
-        df = pd.DataFrame(node_norm_failures, columns=['curie'])
-        df_node_grp = df.groupby('curie').size() \
-            .reset_index(name='count') \
-            .sort_values('count', ascending=False)
-
-        # iterate through the groups and create the edge records.
-        for row_index, row in df_node_grp.iterrows():
-            the_logger.info(f'{row["curie"]}\t{data_set_name}')
-            # self.logger.info(f'Failed node CURIE: {row["curie"]}, count: {row["count"]}')
+        # get the manifest path
+        manifest_path: str = os.path.join(data_file_path, self.MANIFEST_FILE_NAME)
 
-            # get the list into a dataframe group
-        df = pd.DataFrame(edge_norm_failures, columns=['curie'])
-        df_edge_grp = df.groupby('curie').size() \
-            .reset_index(name='count') \
-            .sort_values('count', ascending=False)
+        with self.manifest_lock:
+            # write to a temp file and move it in place so the manifest is never half written
+            with open(f'{manifest_path}.tmp', 'w') as fp:
+                for entry in self.manifest.values():
+                    fp.write(json.dumps(entry) + '\n')
 
-        # iterate through the groups and create the edge records.
-        for row_index, row in df_edge_grp.iterrows():
-            the_logger.info(f'{row["curie"]}\t{data_set_name}')
-            # self.logger.info(f'Failed edge predicate: {row["curie"]}, count: {row["count"]}')
+            os.replace(f'{manifest_path}.tmp', manifest_path)
 
-    @staticmethod
-    def get_biolink_graph(data_uri: str) -> Graph:
+    def get_connection(self) -> FTP:
         """
-        Gets the passed URI into turtle format
+        gets an idle connection from the pool or logs in a new one
 
-        :return: A RDF Graph of the ttl data file passed in
+        :return: a logged in connection in the ftp directory
         """
+        try:
+            # reuse an idle connection
+            return self.connection_pool.get_nowait()
+        except Empty:
+            pass
 
-        # create a RDF graph of the json-ld
-        ret_val = Graph().parse(data_uri, format='turtle')
+        # open the FTP connection and go to the directory
+        ftp: FTP = FTP()
+        ftp.connect(self.ftp_site, self.port, timeout=self.timeout)
+        ftp.login()
+        ftp.cwd(self.ftp_dir)
 
-        # return the data to the caller
-        return ret_val
+        # return to the caller
+        return ftp
 
     @staticmethod
-    def split_file(data_file_path: str, data_file_name: str, lines_per_file: int = 150000) -> list:
+    def close_connection(ftp):
         """
-        splits a file into numerous smaller files.
+        closes a connection, ignoring any errors
 
-        :param data_file_path: the path to where the input file is and where the split files go
-        :param data_file_name: the name of the input data file
-        :param lines_per_file: the number of lines for each split file
-        :return: a list of file names that were created
+        :param ftp: the connection to close
+        :return:
         """
+        # nothing to do if the connection never opened
+        if ftp is None:
+            return
 
-        # init the return
-        ret_val: list = []
+        try:
+            # try to log out nicely
+            ftp.quit()
+        except Exception:
+            ftp.close()
 
-        # declare file name prefix
-        file_prefix: str = data_file_name + '.'
+    def close_all_connections(self):
+        """
+        closes all of the idle connections in the pool
 
-        # init a file and line counter
-        file_counter: int = 1
-        line_counter: int = 0
+        :return:
+        """
+        while True:
+            try:
+                self.close_connection(self.connection_pool.get_nowait())
+            except Empty:
+                break
 
-        # init storage for a group of lines
-        lines: list = []
 
-        # get all the data lines
-        with open(os.path.join(data_file_path, data_file_name), 'r') as fp:
-            while True:
-                # read the line
-                line = fp.readline()
+class GetData:
+    """
+    Class that contains methods that can be used to get various data sets.
+    """
 
-                # save the line if there is one
-                if line:
-                    lines.append(line)
-                    line_counter += 1
-                else:
-                    break
+    # the http session shared by all downloads
+    http_session = None
+    http_session_lock = threading.Lock()
 
-                # did we hit the write threshold
-                if line_counter >= lines_per_file:
-                    # loop through the lines
+    def __init__(self, log_level=logging.INFO):
+        """
+        constructor
+        :param log_level - overrides default log level
+        """
+        # create a logger
+        self.logger = LoggingUtil.init_logging("Data_services.Common.GetData", level=log_level, line_format='short', log_file_path=os.path.join(Path(__file__).parents[1], 'logs'))
+
+    def pull_via_ftp(self, ftp_site: str, ftp_dir: str, ftp_files: list, data_file_path: str) -> int:
+        """
+        gets the requested files from UniProtKB ftp directory
+
+        files are only transferred if they are missing or the remote size/modification time changed since they
+        were retrieved. interrupted transfers are resumed on the next call.
+
+        :param ftp_site: url of the ftp site
+        :param ftp_dir: the directory in the site
+        :param ftp_files: the name of the file to capture
+        :param data_file_path: the destination of the captured file
+        :return: the number of files that are in the destination
+        """
+
+        # init a retrieved file counter for the return
+        file_counter: int = 0
+
+        try:
+            # get the files over a single connection
+            ftp_manager: FTPDownloadManager = FTPDownloadManager(ftp_site, ftp_dir, connections=1, log_level=self.logger.level)
+
+            file_counter = ftp_manager.download(ftp_files, data_file_path)
+        except Exception as e:
+            self.logger.error(f'Error: pull_via_ftp() failed. Exception: {e}')
+
+        # return the file count to the caller
+        return file_counter
+
+    @classmethod
+    def get_http_session(cls) -> requests.Session:
+        """
+        gets the http session shared by all downloads. the session keeps a pool of
+        connections per host so repeated requests to a site reuse the open connections.
+
+        :return: the shared requests session
+        """
+        # only one thread creates the session
+        with cls.http_session_lock:
+            # create the session on first use
+            if cls.http_session is None:
+                # retry the requests that fail to connect or get a server error
+                retries: Retry = Retry(total=5, backoff_factor=2, status_forcelist=(500, 502, 503, 504), allowed_methods=('GET', 'HEAD'))
+
+                # create a pooled adapter for http and https
+                adapter: HTTPAdapter = HTTPAdapter(pool_connections=8, pool_maxsize=8, max_retries=retries)
+
+                # create the session and mount the adapter
+                cls.http_session = requests.Session()
+                cls.http_session.mount('http://', adapter)
+                cls.http_session.mount('https://', adapter)
+
+        # return to the caller
+        return cls.http_session
+
+    @staticmethod
+    def get_file_checksum(file_path: str, hash_type: str = 'md5', block_size: int = 1048576) -> str:
+        """
+        gets the hex digest of a file.
+
+        :param file_path: the path to the file
+        :param hash_type: the hashlib algorithm name (ex. md5, sha256)
+        :param block_size: the number of bytes read at a time
+        :return: the hex digest
+        """
+        # create the hash
+        file_hash = hashlib.new(hash_type)
+
+        # hash the file a block at a time
+        with open(file_path, 'rb') as fp:
+            for block in iter(lambda: fp.read(block_size), b''):
+                file_hash.update(block)
+
+        # return to the caller
+        return file_hash.hexdigest()
+
+    @staticmethod
+    def read_http_meta(meta_path: str) -> dict:
+        """
+        reads the http validators (ETag, Last-Modified) saved for a downloaded file.
+
+        :param meta_path: the path to the meta file
+        :return: the saved validators or an empty dict if there are none
+        """
+        # no meta file saved yet
+        if not os.path.exists(meta_path):
+            return {}
+
+        try:
+            # load the saved validators
+            with open(meta_path, 'r') as fp:
+                return json.load(fp)
+        except (OSError, ValueError):
+            # an unreadable meta file is the same as none
+            return {}
+
+    @staticmethod
+    def write_http_meta(meta_path: str, meta: dict):
+        """
+        saves the http validators for a downloaded file.
+
+        :param meta_path: the path to the meta file
+        :param meta: the validators to save
+        :return: nothing
+        """
+        # write to a temp file and move it in place so the meta file is never half written
+        with open(f'{meta_path}.tmp', 'w') as fp:
+            json.dump(meta, fp)
+
+        os.replace(f'{meta_path}.tmp', meta_path)
+
+    @staticmethod
+    def get_range_total(content_range: str):
+        """
+        gets the full size of a file from an http Content-Range header
+
+        :param content_range: the header value, ex. bytes 100-199/200 or bytes */200
+        :return: the size in bytes or None if it is not known
+        """
+        # get the part after the slash
+        total: str = (content_range or '').rpartition('/')[2]
+
+        # return to the caller
+        return int(total) if total.isdigit() else None
+
+    def pull_via_http(self, url: str, data_dir: str, checksum: str = None, hash_type: str = 'md5', block_size: int = 1048576, timeout: int = 120) -> int:
+        """
+        gets the file from an http stream.
+
+        the ETag and Last-Modified values of the download are saved in a meta file next to the data file.
+        later calls send them back so an unchanged file is not transferred again. the data is written to
+        a .part file that is renamed once it is complete. if a .part file is left over from an earlier
+        attempt the transfer resumes from the end of it with a Range request.
+
+        :param url: the url of the file
+        :param data_dir: the directory where the file is saved
+        :param checksum: optional hex digest the completed file must match
+        :param hash_type: the hashlib algorithm of the checksum
+        :param block_size: the number of bytes read at a time
+        :param timeout: the connect/read timeout in seconds
+        :return: the number of bytes read, the size of the file if it is unchanged or 0 on failure
+        """
+
+        # get the filename
+        data_file: str = url.split('/')[-1]
+
+        # get the paths to the data file, the partial download and the saved validators
+        file_path: str = os.path.join(data_dir, data_file)
+        part_path: str = f'{file_path}.part'
+        meta_path: str = f'{file_path}.meta'
+
+        # make sure the destination exists
+        os.makedirs(data_dir, exist_ok=True)
+
+        # get the validators saved from the last download
+        meta: dict = self.read_http_meta(meta_path)
+
+        # ask for the raw bytes so the byte offsets match the file on the server
+        headers: dict = {'Accept-Encoding': 'identity'}
+
+        # get the number of bytes already downloaded
+        offset: int = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+
+        # get the validator of the partial download
+        partial_validator: str = meta.get('partial', {}).get('etag') or meta.get('partial', {}).get('last_modified')
+
+        # resume the partial download if it can be matched to the server copy
+        if offset > 0 and partial_validator:
+            headers['Range'] = f'bytes={offset}-'
+            headers['If-Range'] = partial_validator
+        # else if there is a completed file only get it if it changed
+        elif os.path.exists(file_path):
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+
+            # fall back to the file time if there is no saved Last-Modified
+            headers['If-Modified-Since'] = meta.get('last_modified') or formatdate(os.path.getmtime(file_path), usegmt=True)
+
+        self.logger.debug(f'Retrieving {url} -> {data_dir}')
+
+        # init the byte counter
+        byte_counter: int = 0
+
+        try:
+            # make the request
+            with self.get_http_session().get(url, headers=headers, stream=True, timeout=timeout) as response:
+                # the file has not changed since the last download
+                if response.status_code == 304:
+                    self.logger.debug(f'{data_file} is unchanged, skipping retrieval')
+
+                    # return the size of the file on hand
+                    return os.path.getsize(file_path)
+
+                # the partial download already ends at or past the end of the file on the server
+                if response.status_code == 416:
+                    # get the size of the file on the server, from the response or the validators of the partial download
+                    total_length = self.get_range_total(response.headers.get('Content-Range'))
+
+                    if total_length is None:
+                        total_length = meta.get('partial', {}).get('length')
+
+                    # if the partial download is not the whole file it cant be used
+                    if total_length is None or offset != total_length:
+                        self.logger.warning(f'Partial data in {part_path} does not match {url}, restarting the download')
+
+                        # drop the partial download and the validators
+                        os.remove(part_path)
+                        os.remove(meta_path)
+
+                        # get the whole file
+                        return self.pull_via_http(url, data_dir, checksum, hash_type, block_size, timeout)
+
+                    self.logger.debug(f'{part_path} was already complete')
+
+                    # nothing left to transfer
+                    content_length = None
+                else:
+                    # raise on any other error
+                    response.raise_for_status()
+
+                    # get the number of bytes expected
+                    content_length: str = response.headers.get('Content-Length')
+
+                    # the server is sending the rest of the file
+                    if response.status_code == 206:
+                        # the range sent must pick up where the partial download ended
+                        if not response.headers.get('Content-Range', '').startswith(f'bytes {offset}-'):
+                            self.logger.error(f'Error retrieving {url}: unexpected range {response.headers.get("Content-Range")}, restarting next time')
+
+                            # drop the partial download
+                            os.remove(part_path)
+
+                            return 0
+
+                        file_mode: str = 'ab'
+
+                        # the full size of the file is after the range
+                        total_length = self.get_range_total(response.headers.get('Content-Range'))
+                    # else the whole file is coming
+                    else:
+                        file_mode = 'wb'
+                        offset = 0
+
+                        # the full size of the file is the size of the response
+                        total_length = int(content_length) if content_length is not None else None
+
+                    # save the validators and full size of this transfer so it can be resumed if it does not finish
+                    meta['partial'] = {'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified'), 'length': total_length}
+                    self.write_http_meta(meta_path, meta)
+
+                    # open a file for the data
+                    with open(part_path, file_mode) as fp:
+                        # until all bytes read
+                        for buffer in response.iter_content(chunk_size=block_size):
+                            # keep track of the number of bytes transferred
+                            byte_counter += len(buffer)
+
+                            # output the data to the file
+                            fp.write(buffer)
+        except requests.RequestException as e:
+            self.logger.error(f'Error retrieving {url}: {e}. Partial data kept in {part_path}')
+            return 0
+
+        # did we get everything the server said it was sending
+        if content_length is not None and byte_counter != int(content_length):
+            self.logger.error(f'Error retrieving {url}: expected {content_length} bytes, got {byte_counter}. Partial data kept in {part_path}')
+            return 0
+
+        # verify the contents if a checksum was passed
+        if checksum is not None and self.get_file_checksum(part_path, hash_type, block_size) != checksum.lower():
+            self.logger.error(f'Error retrieving {url}: {hash_type} checksum mismatch')
+
+            # the data is bad so start over next time
+            os.remove(part_path)
+            meta.pop('partial', None)
+            self.write_http_meta(meta_path, meta)
+
+            return 0
+
+        # move the completed file in place
+        os.replace(part_path, file_path)
+
+        # the validators of the completed transfer are used for the next conditional request
+        self.write_http_meta(meta_path, meta.pop('partial'))
+
+        # return the number of bytes read
+        return offset + byte_counter
+
+    def get_swiss_prot_id_set(self, data_dir: str, debug_mode=False):
+        """
+        gets/parses the swiss-prot listing file and returns a set of uniprot kb ids from
+        ftp://ftp.uniprot.org/pub/databases/uniprot/current_release/knowledgebase/complete/uniprot_sprot.dat.gz.
+
+        the ids are saved in a sorted accession index file named after the UniProt release. later calls
+        for the same release use the index file and skip the download and parse.
+
+        :param data_dir: the directory to place the file temporarily
+        :param debug_mode: flag it indicate debug mode
+        :return: a set like AccessionIndex of uniprot kb ids
+        """
+
+        self.logger.debug('Start of swiss-prot curated uniprot id retrieval')
+
+        # get the current UniProt release to key the index file
+        release: str = self.get_uniprot_release(data_dir)
+
+        # get the path to the index file for the release
+        index_file_path: str = os.path.join(data_dir, f'uniprot_sprot_{release}.acc')
+
+        # create the index if we dont already have it
+        if not os.path.exists(index_file_path):
+            # the name of the file that has the target data
+            data_file_name = 'uniprot_sprot.dat.gz'
+
+            # get the file that has the swiss-prot entries
+            self.pull_via_ftp('ftp.uniprot.org', '/pub/databases/uniprot/current_release/knowledgebase/complete/', [data_file_name], data_dir)
+
+            # get the accessions and save them in the index
+            AccessionIndex.create(index_file_path, self.get_swiss_prot_accessions(os.path.join(data_dir, data_file_name)))
+
+            # do not remove the file if in debug mode
+            if self.logger.level != logging.DEBUG and not debug_mode:
+                # remove the target file
+                os.remove(os.path.join(data_dir, data_file_name))
+        else:
+            self.logger.debug(f'Using the swiss-prot accession index for UniProt release {release}.')
+
+        # open the index
+        ret_val: AccessionIndex = AccessionIndex(index_file_path)
+
+        self.logger.debug(f'End of swiss-prot uniprot id retrieval. {len(ret_val)} retrieved.')
+
+        # return the list
+        return ret_val
+
+    def get_uniprot_release(self, data_dir: str) -> str:
+        """
+        gets the current UniProt release name (ex. 2020_05) from the release date file at
+        ftp://ftp.uniprot.org/pub/databases/uniprot/current_release/knowledgebase/complete/reldate.txt
+
+        :param data_dir: the directory to place the file temporarily
+        :return: the release name
+        """
+        # the name of the release date file
+        data_file_name: str = 'reldate.txt'
+
+        # remove any old copy so we get the current release
+        if os.path.exists(os.path.join(data_dir, data_file_name)):
+            os.remove(os.path.join(data_dir, data_file_name))
+
+        # get the file
+        self.pull_via_ftp('ftp.uniprot.org', '/pub/databases/uniprot/current_release/knowledgebase/complete/', [data_file_name], data_dir)
+
+        # the first line looks like "UniProt Knowledgebase Release 2020_05 consists of:"
+        with open(os.path.join(data_dir, data_file_name), 'r') as fp:
+            release = re.search(r'Release (\S+)', fp.readline())
+
+        # remove the file
+        os.remove(os.path.join(data_dir, data_file_name))
+
+        # make sure we found it
+        if release is None:
+            raise ValueError('The UniProt release could not be found.')
+
+        # return the release to the caller
+        return release.group(1)
+
+    @staticmethod
+    def get_swiss_prot_accessions(data_file_path: str, block_size: int = 16 * 1024 * 1024) -> set:
+        """
+        gets the accession numbers on the AC lines of a gzipped swiss-prot data file. the
+        file is read in large blocks and only the AC lines are looked at.
+
+        :param data_file_path: the path to the uniprot_sprot.dat.gz file
+        :param block_size: the number of uncompressed bytes to read at a time
+        :return: a set of accessions as bytes
+        """
+        # init the return value
+        ret_val: set = set()
+
+        # the lines we are looking for look like "AC   Q6GZX4; Q91G88;"
+        ac_line: re.Pattern = re.compile(rb'^AC   (.*)$', re.MULTILINE)
+
+        # init the partial line carried over between blocks
+        remainder: bytes = b''
+
+        # open the gzip file
+        with gzip.open(data_file_path, 'rb') as zf:
+            while True:
+                # get the next block
+                block: bytes = zf.read(block_size)
+
+                # at the end of the file whatever is left over is the last line
+                if not block:
+                    lines: bytes = remainder
+                else:
+                    # keep the partial last line for the next block
+                    block = remainder + block
+                    line_end: int = block.rfind(b'\n') + 1
+                    lines, remainder = block[:line_end], block[line_end:]
+
+                # save each accession listed
+                for ids in ac_line.findall(lines):
+                    ret_val.update(item.strip() for item in ids.split(b';') if item.strip())
+
+                # did we run out of data
+                if not block:
+                    break
+
+        # return the set to the caller
+        return ret_val
+
+    def get_ncbi_taxon_id_set(self, taxon_data_dir, organism_type: str) -> 'TaxonIdSet':
+        """
+        gets the files associated with viruses (and/or maybe bacteria)
+        the nodes.dmp file can be found in the archive: ftp://ftp.ncbi.nih.gov/pub/taxonomy/taxdump.tar.gz
+
+        the taxon ids come from the cached taxonomy division index. see TaxonomyIndex.
+
+        :param: the organism type
+        :return: the compact set of taxon ids of the division
+        """
+
+        self.logger.debug(f'Start of NCBI taxon retrieval.')
+
+        # get the taxon ids of the division. they are kept in the compact array form rather than copied to a set
+        ret_val: TaxonIdSet = TaxonomyIndex(taxon_data_dir, self.logger.level).get_division(organism_type)
+
+        self.logger.debug(f'End of NCBI taxon retrieval. {len(ret_val)} retrieved.')
+
+        # return the list
+        return ret_val
+
+    def get_uniprot_virus_date_stamp(self, data_dir):
+        """
+        retrieves and reads the only line in the uniprokb file "datestamp" that indicates the date
+        the data in the directory was created.
+
+        :return: the date stamp string
+        """
+
+        # get the date stamp file
+        self.pull_via_ftp('ftp.ebi.ac.uk', '/pub/databases/GO/goa/proteomes', ['datestamp'], data_dir)
+
+        # open the file and read the first line
+        with open(os.path.join(data_dir, 'datestamp'), 'r') as fp:
+            # get the line of text that is the date stamp
+            ret_val: str = fp.readline().strip('\n')
+
+        os.remove(os.path.join(data_dir, 'datestamp'))
+
+        # return to the caller
+        return ret_val
+
+    def get_uniprot_virus_file_list(self, proteome_data_dir: str, taxa_id_set: set) -> list:
+        """
+        gets the list of virus proteome file names that will be downloaded
+        the proteome2taxid file can be found in the ftp directory at: ftp://ftp.ebi.ac.uk/pub/databases/GO/goa/proteomes/
+
+        :param proteome_data_dir: the location of the proteome to taxon id conversion file
+        :param taxa_id_set: the set of taxa ids
+        :return: the set of file names to get
+        """
+        self.logger.debug(f'Start of uniprot virus file list retrieval.')
+
+        # init the return value
+        ret_val: list = []
+
+        # storage for the final file list
+        files: list = []
+
+        # set the data file name
+        data_file_name = 'proteome2taxid'
+
+        # get the proteome to taxon id file
+        file_count: int = self.pull_via_ftp('ftp.ebi.ac.uk', '/pub/databases/GO/goa/proteomes', [data_file_name], proteome_data_dir)
+
+        # did we get the file
+        if file_count == 1:
+            # open the file
+            with open(os.path.join(proteome_data_dir, data_file_name), 'r') as fp:
+                # create a csv reader for it
+                csv_reader: reader = csv.reader(fp, delimiter='\t')
+
+                # spin through the list and get the file name
+                for line in csv_reader:
+                    # is this file in the list of target taxa
+                    if line[1] in taxa_id_set:
+                        # save the file in the list
+                        files.append(line[2])
+
+            # add the sars cov-2 file manually
+            files.append('uniprot_sars-cov-2.gaf')
+
+            # sort the file list
+            ret_val = sorted(files)
+
+            # close the file
+            fp.close()
+
+            # do not remove the file if in debug mode
+            if self.logger.level != logging.DEBUG:
+                # remove the data file
+                os.remove(os.path.join(proteome_data_dir, data_file_name))
+
+            self.logger.debug(f'End of uniprot virus file list retrieval. {len(ret_val)} retrieved.')
+        else:
+            self.logger.error(f'Error: {data_file_name} as not retrieved.')
+
+        # return the list to the caller
+        return ret_val
+
+    def get_goa_http_file(self, data_dir: str, data_file: str):
+        """
+        gets the GOA file via HTTP.
+
+        :param data_dir: the location where the data should be saved
+        :param data_file: the name of the file to get
+        :return int: the number of bytes read
+        """
+        self.logger.debug(f'Start of GOA file retrieval.')
+
+        # get the rest of the files
+        byte_count: int = self.pull_via_http(f'http://current.geneontology.org/annotations/{data_file}', data_dir)
+
+        # return to the caller
+        return byte_count
+
+    def get_goa_ftp_files(self, data_dir: str, file_list: list, ftp_parent_dir: str, ftp_sub_dir: str, connections: int = 4, retries: int = 5) -> int:
+        """
+        gets the uniprot GOA data file(s).
+
+        :param data_dir: the data file(s) destination
+        :param file_list: the list of files
+        :param ftp_parent_dir: the ftp data parent directory
+        :param ftp_sub_dir: the ftp data sub directory
+        :param connections: the number of simultaneous ftp connections
+        :param retries: the number of attempts made for each file
+        :return: the retrieved file count
+        """
+        self.logger.debug(f'Start of GOA file retrieval.')
+
+        # a connection to this FTP site is not reliable so each file gets a number of attempts
+        ftp_manager: FTPDownloadManager = FTPDownloadManager('ftp.ebi.ac.uk', ftp_parent_dir + ftp_sub_dir, connections=connections, retries=retries, log_level=self.logger.level)
+
+        # get the files
+        file_count: int = ftp_manager.download(file_list, data_dir)
+
+        self.logger.debug(f'End of GOA file retrieval. {file_count} retrieved.')
+
+        # return the number of files captured
+        return file_count
+
+    @staticmethod
+    def format_normalization_failures(data_set_name: str, node_norm_failures: list, edge_norm_failures: list):
+        """
+        outputs the nodes/edges that failed normalization
+
+        :param data_set_name: the name of the data source that produced these results
+        :param node_norm_failures: set of node curies
+        :param edge_norm_failures: set of edge predicates
+        :return:
+        """
+        the_logger = LoggingUtil.init_logging(f"Data_services.Common.NormFailures.{data_set_name}", level=logging.INFO, line_format='minimum', log_file_path=os.path.join(Path(__file__).parents[1], 'logs'))
+
+        # get the list into a dataframe group
+        df = pd.DataFrame(node_norm_failures, columns=['curie'])
+        df_node_grp = df.groupby('curie').size() \
+            .reset_index(name='count') \
+            .sort_values('count', ascending=False)
+
+        # iterate through the groups and create the edge records.
+        for row_index, row in df_node_grp.iterrows():
+            the_logger.info(f'{row["curie"]}\t{data_set_name}')
+            # self.logger.info(f'Failed node CURIE: {row["curie"]}, count: {row["count"]}')
+
+            # get the list into a dataframe group
+        df = pd.DataFrame(edge_norm_failures, columns=['curie'])
+        df_edge_grp = df.groupby('curie').size() \
+            .reset_index(name='count') \
+            .sort_values('count', ascending=False)
+
+        # iterate through the groups and create the edge records.
+        for row_index, row in df_edge_grp.iterrows():
+            the_logger.info(f'{row["curie"]}\t{data_set_name}')
+            # self.logger.info(f'Failed edge predicate: {row["curie"]}, count: {row["count"]}')
+
+    @staticmethod
+    def get_biolink_graph(data_uri: str) -> Graph:
+        """
+        Gets the passed URI into turtle format
+
+        :return: A RDF Graph of the ttl data file passed in
+        """
+
+        # create a RDF graph of the json-ld
+        ret_val = Graph().parse(data_uri, format='turtle')
+
+        # return the data to the caller
+        return ret_val
+
+    @staticmethod
+    def split_file(data_file_path: str, data_file_name: str, lines_per_file: int = 150000) -> list:
+        """
+        splits a file into numerous smaller files.
+
+        :param data_file_path: the path to where the input file is and where the split files go
+        :param data_file_name: the name of the input data file
+        :param lines_per_file: the number of lines for each split file
+        :return: a list of file names that were created
+        """
+
+        # init the return
+        ret_val: list = []
+
+        # declare file name prefix
+        file_prefix: str = data_file_name + '.'
+
+        # init a file and line counter
+        file_counter: int = 1
+        line_counter: int = 0
+
+        # init storage for a group of lines
+        lines: list = []
+
+        # get all the data lines
+        with open(os.path.join(data_file_path, data_file_name), 'r') as fp:
+            while True:
+                # read the line
+                line = fp.readline()
+
+                # save the line if there is one
+                if line:
+                    lines.append(line)
+                    line_counter += 1
+                else:
+                    break
+
+                # did we hit the write threshold
+                if line_counter >= lines_per_file:
+                    # loop through the lines
                     # create the output file
                     file_name = os.path.join(data_file_path, file_prefix + str(file_counter))
 
@@ -935,6 +1639,69 @@ class GetData:
         # return to the caller
         return ret_val
 
+    def get_dataframe_from_csv(self, in_file: str, columns: dict, use_cache: bool = True) -> pd.DataFrame:
+        """
+        Opens the CSV file passed and loads only the columns requested into a data frame with the data types given.
+        low cardinality columns can be given the 'category' type so each distinct value is stored once.
+
+        the data frame is cached in a feather file next to the CSV file and the cache is used on later calls
+        for the same columns until the CSV file changes. older caches of the CSV file are removed when a new one is written.
+
+        :param in_file: the path to the file to be parsed
+        :param columns: dict of column name to data type (ex. {'food_id': 'category', 'name': str})
+        :param use_cache: flag to use and create the data frame cache
+        :return: the data frame with the columns in the order given. values are kept as they are in the file, empty strings are not converted to NaN
+        """
+        # the cache file name identifies the columns and the version of the CSV file
+        file_stat = os.stat(in_file)
+        cache_key: str = hashlib.md5(f'{file_stat.st_size}|{file_stat.st_mtime_ns}|{sorted((name, str(dtype)) for name, dtype in columns.items())}'.encode('utf-8')).hexdigest()[:12]
+        cache_file: str = f'{in_file}.{cache_key}.feather'
+
+        # use the cache if there is one
+        if use_cache and os.path.exists(cache_file):
+            self.logger.debug(f'Loading {in_file} from cache {cache_file}')
+
+            return pd.read_feather(cache_file)
+
+        # read the columns of the file
+        ret_val: pd.DataFrame = pd.read_csv(in_file, encoding='latin-1', usecols=list(columns), dtype=columns, keep_default_na=False, na_filter=False)[list(columns)]
+
+        # save the cache for next time
+        if use_cache:
+            # write to a temp file and move it in place so a cache is never half written
+            ret_val.to_feather(f'{cache_file}.tmp')
+
+            os.replace(f'{cache_file}.tmp', cache_file)
+
+            # remove the caches of older versions of the CSV file
+            cache_dir, cache_prefix = os.path.split(f'{in_file}.')
+
+            for file_name in os.listdir(cache_dir or '.'):
+                if file_name.startswith(cache_prefix) and file_name.endswith('.feather') and os.path.join(cache_dir, file_name) != cache_file:
+                    os.remove(os.path.join(cache_dir, file_name))
+
+        # return to the caller
+        return ret_val
+
+    @staticmethod
+    def get_index_from_dataframe(df: pd.DataFrame, index_by: str) -> dict:
+        """
+        Turns the data frame rows into a dict of the rows keyed by a column value.
+
+        :param df: the data frame
+        :param index_by: the column name to index the rows by
+        :return: a dict of column value to the list of row dicts with that value, in data frame order
+        """
+        # init the return
+        ret_val: dict = {}
+
+        # save each row under its index value
+        for item in df.to_dict('records'):
+            ret_val.setdefault(item[index_by], []).append(item)
+
+        # return to the caller
+        return ret_val
+
 
 class DatasetDescription:
     @staticmethod
@@ -970,3 +1737,586 @@ class DatasetDescription:
 
             # write out the node data
             out_node_f.write(f'{prov_data["data_set_version"]}_{prov_data["data_set_name"]}\t{prov_data["data_set_name"]}\tdataset|named_thing\t{prov_data["data_set_title"]}\t{prov_data["data_set_web_site"]}\t{prov_data["data_set_download_url"]}\t{prov_data["data_set_version"]}\t{prov_data["data_set_retrieved_on"]}\n')
+
+
+class DedupRegistry:
+    """
+    Class that keeps a compact record of the keys (node ids, edge ids, etc.) that have already been written.
+
+    each key is stored as a fixed size digest rather than the key string so very large
+    sets of keys can be tracked in bounded memory.
+    """
+
+    def __init__(self, digest_size: int = 16):
+        """
+        constructor
+
+        :param digest_size: the number of bytes kept for each key
+        """
+        self.digest_size: int = digest_size
+
+        # storage for the key digests
+        self.registry: set = set()
+
+    def __len__(self) -> int:
+        return len(self.registry)
+
+    def __contains__(self, key: str) -> bool:
+        return hashlib.blake2b(key.encode('utf-8'), digest_size=self.digest_size).digest() in self.registry
+
+    def add(self, key: str) -> bool:
+        """
+        adds the key to the registry
+
+        :param key: the key to add
+        :return: True if the key had not been seen before
+        """
+        # get the digest of the key
+        digest: bytes = hashlib.blake2b(key.encode('utf-8'), digest_size=self.digest_size).digest()
+
+        # was it already here
+        if digest in self.registry:
+            return False
+
+        # save the new key
+        self.registry.add(digest)
+
+        # return to the caller
+        return True
+
+    def clear(self):
+        """
+        removes all keys from the registry
+        """
+        self.registry.clear()
+
+
+class SpillDedupWriter:
+    """
+    Class that de-duplicates records (formatted nodes, edges, etc.) on disk so the memory used does not grow with the number of records.
+
+    records are appended to temp files picked by a hash of the record. when the records are written out each
+    partition file is read back and de-duplicated on its own, so only one partition is held in memory at a time.
+    records come out in partition order and then in the order they were added.
+    """
+
+    def __init__(self, temp_dir: str = None, partitions: int = 64):
+        """
+        constructor
+
+        :param temp_dir: the directory the temp files go in, defaults to the system temp directory
+        :param partitions: the number of partition files
+        """
+        # create a directory for the partition files
+        self.partition_dir: str = tempfile.mkdtemp(prefix='dedup_', dir=temp_dir)
+
+        # storage for the open partition files, they are opened on first use
+        self.partitions: int = partitions
+        self.partition_files: list = [None] * partitions
+
+        # the number of records added, including duplicates
+        self.added: int = 0
+
+    def add(self, record: str):
+        """
+        adds a record. records can not contain a new line.
+
+        :param record: the record to add
+        :return:
+        """
+        # get the partition of the record. crc32 is the same in every process so the output order is too
+        partition: int = zlib.crc32(record.encode('utf-8')) % self.partitions
+
+        # open the partition file if this is its first record
+        if self.partition_files[partition] is None:
+            self.partition_files[partition] = open(os.path.join(self.partition_dir, f'{partition}.part'), 'w', encoding='utf-8')
+
+        # save the record
+        self.partition_files[partition].write(record + '\n')
+
+        self.added += 1
+
+    def __iter__(self):
+        """
+        gets the distinct records. the records are removed as they are read back.
+
+        :return: iterator of the distinct records
+        """
+        # for each partition
+        for partition, partition_file in enumerate(self.partition_files):
+            # skip the empty ones
+            if partition_file is None:
+                continue
+
+            # finish writing the partition
+            partition_file.close()
+
+            # storage for the records seen in this partition
+            seen: set = set()
+
+            with open(partition_file.name, 'r', encoding='utf-8') as fp:
+                for line in fp:
+                    # get the record
+                    record: str = line[:-1]
+
+                    # only return the first of each
+                    if record not in seen:
+                        seen.add(record)
+
+                        yield record
+
+            # the partition is done
+            os.remove(partition_file.name)
+            self.partition_files[partition] = None
+
+    def write(self, out_f, output_mode: str) -> int:
+        """
+        writes out the distinct records to a KGX file
+
+        :param out_f: the output file pointer
+        :param output_mode: the output mode (tsv or json)
+        :return: the number of records written
+        """
+        # init the record counter
+        record_count: int = 0
+
+        # for each distinct record
+        for record in self:
+            # separate it from the previous record
+            if record_count > 0:
+                out_f.write(',\n' if output_mode == 'json' else '\n')
+
+            # write out the record
+            out_f.write(record)
+
+            record_count += 1
+
+        # return to the caller
+        return record_count
+
+    def close(self):
+        """
+        closes and removes the partition files
+
+        :return:
+        """
+        # close the open partition files
+        for partition_file in self.partition_files:
+            if partition_file is not None:
+                partition_file.close()
+
+        # remove the files
+        shutil.rmtree(self.partition_dir, ignore_errors=True)
+
+
+class GroupEdgeBuilder:
+    """
+    Class that creates the edges of node lists that use the grp/node_num pattern.
+
+    the subject node of each group is joined to the other nodes of the group in one merge so the
+    edges of all groups are created at once rather than group by group. the edge types are normalized
+    once per distinct relation and the edge ids are created in a batch.
+    """
+
+    def __init__(self, log_level=logging.INFO):
+        """
+        constructor
+        :param log_level - overrides default log level
+        """
+        # save the log level for the edge normalizer
+        self.log_level = log_level
+
+    @staticmethod
+    def get_group_edges(df: pd.DataFrame, subject_node_num: int = 1, edge_columns: list = None) -> pd.DataFrame:
+        """
+        joins the subject node of each group to the other nodes of the group
+
+        :param df: node storage data frame with grp, node_num and id columns
+        :param subject_node_num: the node_num of the subject node of a group
+        :param edge_columns: optional list of the columns of the object nodes to carry over to the edges
+        :return: data frame of the subject, object and edge columns of each edge
+        """
+        # init the carried over columns
+        edge_columns = list(edge_columns or [])
+
+        # get the first subject node of each group
+        subjects: pd.DataFrame = df.loc[(df['node_num'] == subject_node_num) & (df['id'] != ''), ['grp', 'id']].drop_duplicates('grp').rename(columns={'id': 'subject'})
+
+        # get the rest of the nodes
+        objects: pd.DataFrame = df.loc[df['node_num'] != subject_node_num, ['grp', 'id'] + edge_columns].rename(columns={'id': 'object'})
+
+        # join the nodes of each group to its subject node
+        edges: pd.DataFrame = objects.merge(subjects, on='grp', how='inner', sort=False)
+
+        # return to the caller
+        return edges[['subject', 'object'] + edge_columns].reset_index(drop=True)
+
+    def normalize(self, edges: pd.DataFrame, cached_edge_norms: dict = None) -> list:
+        """
+        calls the EdgeNormalization web service to get the normalized predicate and label of each distinct edge type. the edges are updated in place.
+
+        :param edges: edge data frame with predicate, relation and edge_label columns
+        :param cached_edge_norms: dict of previously captured normalizations
+        :return: the relations that failed to normalize
+        """
+        # the columns that make up an edge type
+        type_columns: list = ['predicate', 'relation', 'edge_label']
+
+        # get the distinct edge types
+        edge_types: pd.DataFrame = edges[type_columns].drop_duplicates()
+
+        # normalize the edge types. this updates them in place
+        edge_type_list: list = edge_types.to_dict('records')
+
+        failures: list = EdgeNormUtils(self.log_level).normalize_edge_data(edge_type_list, cached_edge_norms)
+
+        # get the normalized values of each edge type
+        normalized: pd.DataFrame = pd.DataFrame(edge_type_list, columns=type_columns, index=edge_types.index).add_prefix('normalized_')
+
+        # look up the normalized values of each edge
+        normalized = edges[type_columns].merge(pd.concat([edge_types, normalized], axis=1), on=type_columns, how='left', sort=False)
+
+        # update the edges
+        edges['predicate'] = normalized['normalized_predicate'].to_numpy()
+        edges['edge_label'] = normalized['normalized_edge_label'].to_numpy()
+
+        # return to the caller
+        return failures
+
+    @staticmethod
+    def get_edge_ids(edges: pd.DataFrame, id_columns: list = None) -> list:
+        """
+        gets the md5 id of each edge
+
+        :param edges: edge data frame
+        :param id_columns: the columns that make up the id, defaults to subject, relation, edge_label and object
+        :return: list of the hex digest id of each edge
+        """
+        # init the id columns
+        id_columns = id_columns or ['subject', 'relation', 'edge_label', 'object']
+
+        # put the id text of all edges together in one pass
+        record_ids: pd.Series = edges[id_columns[0]].astype(str).str.cat([edges[column].astype(str) for column in id_columns[1:]])
+
+        # return the ids to the caller
+        return [hashlib.md5(record_id.encode('utf-8')).hexdigest() for record_id in record_ids]
+
+
+class AccessionIndex:
+    """
+    Class that looks up accession numbers in a sorted binary file of fixed width accessions.
+
+    the file is memory mapped so the accessions are shared through the page cache instead of
+    being held in a python set. it supports "in" and len() like a set.
+    """
+
+    # the index file header and the width of an accession record
+    INDEX_MAGIC: bytes = b'ACCI\x00\x00\x00\x01'
+    RECORD_SIZE: int = 10
+
+    def __init__(self, index_file_path: str):
+        """
+        constructor
+
+        :param index_file_path: the path to the index file
+        """
+        # open the file and map it into memory
+        with open(index_file_path, 'rb') as fp:
+            self.index_mm: mmap.mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # check the file header
+        if self.index_mm[:len(self.INDEX_MAGIC)] != self.INDEX_MAGIC:
+            self.index_mm.close()
+            raise ValueError(f'{index_file_path} is not an accession index file.')
+
+        # get the number of accessions
+        self.record_count: int = (len(self.index_mm) - len(self.INDEX_MAGIC)) // self.RECORD_SIZE
+
+    def __len__(self) -> int:
+        return self.record_count
+
+    def __contains__(self, accession: str) -> bool:
+        # accessions are stored padded to the record width
+        key: bytes = accession.encode('utf-8').ljust(self.RECORD_SIZE)
+
+        # it cant be here if it doesnt fit
+        if len(key) != self.RECORD_SIZE:
+            return False
+
+        # binary search the records
+        low: int = 0
+        high: int = self.record_count
+
+        while low < high:
+            mid: int = (low + high) // 2
+            offset: int = len(self.INDEX_MAGIC) + mid * self.RECORD_SIZE
+            record: bytes = self.index_mm[offset:offset + self.RECORD_SIZE]
+
+            if record < key:
+                low = mid + 1
+            elif record > key:
+                high = mid
+            else:
+                return True
+
+        # not found
+        return False
+
+    def close(self):
+        """
+        closes the index file
+        """
+        self.index_mm.close()
+
+    @classmethod
+    def create(cls, index_file_path: str, accessions: set) -> int:
+        """
+        creates an index file of the accessions passed
+
+        :param index_file_path: the path to the index file to create
+        :param accessions: the set of accessions as bytes
+        :return: the number of accessions written
+        """
+        # write to a temp file so a failed run does not leave a partial index
+        temp_file_path: str = index_file_path + '.part'
+
+        # init the record counter
+        record_count: int = 0
+
+        with open(temp_file_path, 'wb') as fp:
+            # write the file header
+            fp.write(cls.INDEX_MAGIC)
+
+            # write the padded accessions in sorted order
+            for accession in sorted(item.ljust(cls.RECORD_SIZE) for item in accessions if len(item) <= cls.RECORD_SIZE):
+                fp.write(accession)
+                record_count += 1
+
+        # put the index in place
+        os.replace(temp_file_path, index_file_path)
+
+        # return to the caller
+        return record_count
+
+
+class TaxonIdSet:
+    """
+    Class that holds a sorted array of NCBI taxon ids. it supports "in", len() and iteration like a set of taxon id strings.
+    """
+
+    def __init__(self, taxon_ids: array):
+        """
+        constructor
+
+        :param taxon_ids: the sorted array of taxon ids
+        """
+        self.taxon_ids: array = taxon_ids
+
+    def __len__(self) -> int:
+        return len(self.taxon_ids)
+
+    def __iter__(self):
+        return (str(taxon_id) for taxon_id in self.taxon_ids)
+
+    def __contains__(self, taxon_id) -> bool:
+        try:
+            # taxon ids may come in as strings or ints
+            taxon_id = int(taxon_id)
+        except (TypeError, ValueError):
+            return False
+
+        # find where it would be in the array
+        idx: int = bisect.bisect_left(self.taxon_ids, taxon_id)
+
+        # return to the caller
+        return idx < len(self.taxon_ids) and self.taxon_ids[idx] == taxon_id
+
+
+class TaxonomyIndex:
+    """
+    Class that keeps the NCBI taxon ids of each taxonomy division in compact cached files.
+
+    the ids of a division are parsed out of nodes.dmp in ftp://ftp.ncbi.nih.gov/pub/taxonomy/taxdump.tar.gz
+    once and saved as a sorted int array in a file named for the division and the taxdump date. later
+    requests for the same taxdump use the saved files and skip the download and parse.
+    """
+
+    # the index file header
+    INDEX_MAGIC: bytes = b'TAXI\x00\x00\x00\x01'
+
+    # the location of the taxonomy data
+    FTP_SITE: str = 'ftp.ncbi.nih.gov'
+    FTP_DIR: str = '/pub/taxonomy'
+    TAXDUMP_FILE: str = 'taxdump.tar.gz'
+
+    def __init__(self, taxon_data_dir: str, log_level=logging.INFO):
+        """
+        constructor
+
+        :param taxon_data_dir: the directory for the taxdump file and the index files
+        :param log_level - overrides default log level
+        """
+        # create a logger
+        self.logger = LoggingUtil.init_logging("Data_services.Common.TaxonomyIndex", level=log_level, line_format='short', log_file_path=os.path.join(Path(__file__).parents[1], 'logs'))
+
+        # save the data directory
+        self.taxon_data_dir: str = taxon_data_dir
+
+        # the date of the taxdump file, looked up when first needed
+        self.taxdump_date: str = ''
+
+        # storage for the divisions that have been loaded
+        self.divisions: dict = {}
+
+    def get_division(self, division: str) -> TaxonIdSet:
+        """
+        gets the taxon ids of a taxonomy division
+
+        :param division: the division id (ex. 9 for viruses)
+        :return: the set of taxon ids in the division
+        """
+        # did we already load it
+        if division not in self.divisions:
+            # get the date of the current taxdump
+            if self.taxdump_date == '':
+                self.taxdump_date = self.get_taxdump_date()
+
+            # get the index file name
+            index_file_path: str = self.get_index_file_path(division)
+
+            # create the indexes if this taxdump hasnt been indexed yet
+            if not os.path.exists(index_file_path):
+                self.create_indexes()
+
+                # a division with no taxa gets an empty index
+                if not os.path.exists(index_file_path):
+                    self.write_index(index_file_path, array('I'))
+            else:
+                self.logger.debug(f'Using the taxon index for division {division} of the {self.taxdump_date} taxdump.')
+
+            # load the division
+            self.divisions[division] = TaxonIdSet(self.read_index(index_file_path))
+
+        # return to the caller
+        return self.divisions[division]
+
+    def get_index_file_path(self, division: str) -> str:
+        """
+        gets the path to the index file of a division for the current taxdump
+
+        :param division: the division id
+        :return: the path to the index file
+        """
+        return os.path.join(self.taxon_data_dir, f'ncbi_taxon_division_{division}_{self.taxdump_date}.bin')
+
+    def get_taxdump_date(self) -> str:
+        """
+        gets the modification date of the taxdump file on the ftp site
+
+        :return: the date as YYYYMMDDHHMMSS
+        """
+        # get a connection to the site
+        ftp_manager: FTPDownloadManager = FTPDownloadManager(self.FTP_SITE, self.FTP_DIR, log_level=self.logger.level)
+        ftp: FTP = ftp_manager.get_connection()
+
+        try:
+            # get the modification time of the file
+            remote_mtime = ftp_manager.get_remote_stats(ftp, self.TAXDUMP_FILE)[1]
+        finally:
+            ftp_manager.close_connection(ftp)
+
+        # make sure we got it
+        if remote_mtime is None:
+            raise ValueError(f'The date of {self.TAXDUMP_FILE} could not be found.')
+
+        # return the date to the caller
+        return datetime.fromtimestamp(remote_mtime, timezone.utc).strftime('%Y%m%d%H%M%S')
+
+    def create_indexes(self):
+        """
+        gets the taxdump file and saves the taxon ids of every division in an index file
+
+        :return:
+        """
+        # get the taxdump file
+        FTPDownloadManager(self.FTP_SITE, self.FTP_DIR, connections=1, log_level=self.logger.level).download([self.TAXDUMP_FILE], self.taxon_data_dir)
+
+        # parse the divisions out of the file
+        division_ids: dict = self.parse_taxdump(os.path.join(self.taxon_data_dir, self.TAXDUMP_FILE))
+
+        # save each division
+        for division, taxon_ids in division_ids.items():
+            self.write_index(self.get_index_file_path(division), taxon_ids)
+
+        self.logger.debug(f'{sum(len(taxon_ids) for taxon_ids in division_ids.values())} taxon ids in {len(division_ids)} divisions indexed for the {self.taxdump_date} taxdump.')
+
+        # do not remove the file if in debug mode
+        if self.logger.level != logging.DEBUG:
+            # remove the target file
+            os.remove(os.path.join(self.taxon_data_dir, self.TAXDUMP_FILE))
+
+    @staticmethod
+    def parse_taxdump(taxdump_file_path: str) -> dict:
+        """
+        streams the nodes.dmp file in the taxdump archive and gets the taxon ids of each division
+
+        :param taxdump_file_path: the path to the taxdump.tar.gz file
+        :return: a dict of division id to array of taxon ids
+        """
+        # init the return value
+        ret_val: dict = {}
+
+        # open the tar file and get a reference to the file
+        with tarfile.open(taxdump_file_path, 'r:gz') as tar_file, tar_file.extractfile('nodes.dmp') as fp:
+            # for each line in the file. lines look like "10239\t|\t1\t|\tsuperkingdom\t|\t\t|\t9\t|\t..."
+            for line in fp:
+                # split out the taxon id and the division id
+                parts: list = line.split(b'\t|\t', 5)
+
+                # save the taxon id in its division
+                ret_val.setdefault(parts[4].strip().decode('utf-8'), array('I')).append(int(parts[0]))
+
+        # return to the caller
+        return ret_val
+
+    @classmethod
+    def write_index(cls, index_file_path: str, taxon_ids: array):
+        """
+        writes the taxon ids to an index file in sorted order
+
+        :param index_file_path: the path to the index file
+        :param taxon_ids: the array of taxon ids
+        :return:
+        """
+        # write to a temp file so a failed run does not leave a partial index
+        temp_file_path: str = index_file_path + '.part'
+
+        with open(temp_file_path, 'wb') as fp:
+            # write the file header and the ids
+            fp.write(cls.INDEX_MAGIC)
+            fp.write(array('I', sorted(taxon_ids)).tobytes())
+
+        # put the index in place
+        os.replace(temp_file_path, index_file_path)
+
+    @classmethod
+    def read_index(cls, index_file_path: str) -> array:
+        """
+        reads the taxon ids in an index file
+
+        :param index_file_path: the path to the index file
+        :return: the sorted array of taxon ids
+        """
+        # init the return value
+        ret_val: array = array('I')
+
+        with open(index_file_path, 'rb') as fp:
+            # check the file header
+            if fp.read(len(cls.INDEX_MAGIC)) != cls.INDEX_MAGIC:
+                raise ValueError(f'{index_file_path} is not a taxon index file.')
+
+            # read the ids
+            ret_val.frombytes(fp.read())
+
+        # return to the caller
+        return ret_val
@@ -1,10 +1,9 @@
 import os
-import hashlib
 import argparse
 import pandas as pd
 import logging
 import json
-from Common.utils import LoggingUtil, GetData, NodeNormUtils, EdgeNormUtils
+from Common.utils import LoggingUtil, GetData, NodeNormUtils, DedupRegistry, GroupEdgeBuilder
 from pathlib import Path
 
 
@@ -28,6 +27,19 @@ class FDBLoader:
     total_nodes: int = 0
     total_edges: int = 0
 
+    # the columns used from each FooDB file and their data types
+    FOOD_COLUMNS: dict = {'id': str, 'name_scientific': str, 'ncbi_taxonomy_id': str}
+    CONTENT_COLUMNS: dict = {'food_id': 'category', 'source_id': 'category', 'source_type': 'category', 'orig_unit': 'category', 'orig_max': 'category'}
+    COMPOUND_COLUMNS: dict = {'id': str, 'name': str, 'moldb_inchikey': str, 'chembl_id': str, 'drugbank_id': str, 'kegg_compound_id': str, 'chebi_id': str, 'hmdb_id': str, 'pubchem_compound_id': str}
+    NUTRIENT_COLUMNS: dict = {'id': str, 'public_id': str, 'name': str}
+
+    # the compound identifier columns and their CURIE prefixes, in priority order
+    EQUIVALENT_ID_COLUMNS: tuple = (('moldb_inchikey', 'INCHIKEY:'), ('chembl_id', 'CHEMBL:'), ('drugbank_id', 'DRUGBANK:'), ('kegg_compound_id', 'KEGG:'),
+                                    ('chebi_id', 'CHEBI:'), ('hmdb_id', 'HMDB:'), ('pubchem_compound_id', 'PUBCHEM.COMPOUND:'))
+
+    # the number of queued nodes that triggers a normalization and write
+    node_queue_size: int = 50000
+
     def get_name(self):
         """
         returns the name of the class
@@ -46,6 +58,10 @@ class FDBLoader:
         # create a logger
         self.logger = LoggingUtil.init_logging("Data_services.FooDB.FooDBLoader", level=log_level, line_format='medium', log_file_path=os.path.join(Path(__file__).parents[2], 'logs'))
 
+        # the ids of the nodes and the edges already written
+        self.written_nodes: DedupRegistry = DedupRegistry()
+        self.written_edges: DedupRegistry = DedupRegistry()
+
     def load(self, data_file_path, out_name: str, output_mode: str = 'json') -> bool:
         """
         loads/parses FooDB data files
@@ -84,6 +100,9 @@ class FDBLoader:
         """
         Parses the food list to create KGX files.
 
+        the nodes of each food are created on their own and queued up. the queue is normalized and written out
+        whenever it fills so the memory used does not grow with the number of foods.
+
         :param data_file_path: the path to the data files
         :param out_edge_f: the edge file pointer
         :param out_node_f: the node file pointer
@@ -94,299 +113,277 @@ class FDBLoader:
         # and get a reference to the data gatherer
         gd = GetData(self.logger.level)
 
-        # storage for the nodes
-        node_list: list = []
+        # get the columns needed from the data files
+        foods_df: pd.DataFrame = gd.get_dataframe_from_csv(os.path.join(data_file_path, 'foods.csv'), self.FOOD_COLUMNS)
+        contents_df: pd.DataFrame = gd.get_dataframe_from_csv(os.path.join(data_file_path, 'contents.csv'), self.CONTENT_COLUMNS)
+        compounds_df: pd.DataFrame = gd.get_dataframe_from_csv(os.path.join(data_file_path, 'compounds.csv'), self.COMPOUND_COLUMNS)
+        nutrients_df: pd.DataFrame = gd.get_dataframe_from_csv(os.path.join(data_file_path, 'nutrients.csv'), self.NUTRIENT_COLUMNS)
 
-        # these node types are separated because a food may not necessarily have both
-        compound_node_list: list = []
-        nutrient_node_list: list = []
+        # get the foods to be parsed into a list of dicts sorted by id
+        foods_list: list = foods_df.sort_values('id', kind='stable').to_dict('records')
+
+        # get the row numbers of the contents of each food and the content values by column
+        contents_rows: dict = contents_df.groupby('food_id', observed=True, sort=False).indices
+        contents_columns: dict = {column: contents_df[column].to_numpy() for column in self.CONTENT_COLUMNS}
 
-        # get all the data to be parsed into a list of dicts
-        foods_list: list = gd.get_list_from_csv(os.path.join(data_file_path, 'foods.csv'), 'id')
-        contents_list: list = gd.get_list_from_csv(os.path.join(data_file_path, 'contents.csv'), 'food_id')
-        compounds_list: list = gd.get_list_from_csv(os.path.join(data_file_path, 'compounds.csv'), 'id')
-        nutrients_list: list = gd.get_list_from_csv(os.path.join(data_file_path, 'nutrients.csv'), 'id')
+        # get the preferred identifier of every compound once
+        compounds_df = pd.DataFrame({'id': compounds_df['id'], 'name': compounds_df['name'], 'equivalent_id': self.get_equivalent_ids(compounds_df)})
 
-        # global storage for the food being parsed
-        food_id: str = ''
-        food_name: str = ''
+        # get the compounds and nutrients into dicts keyed by the id they are looked up by
+        compounds_index: dict = gd.get_index_from_dataframe(compounds_df, 'id')
+        nutrients_index: dict = gd.get_index_from_dataframe(nutrients_df, 'id')
 
-        # foods_list = foods_list[:5]
+        # storage for the nodes waiting to be normalized and written out
+        node_queue: list = []
 
         # for each food
         for food_dict in foods_list:
-            # save the basic food info for this run
-            food_id = food_dict["id"]
-            food_name = food_dict["name_scientific"]
-
-            self.logger.debug(f'Working food id: {food_id}, name: {food_name}')
-
             # if there is no NCBI taxon ID it can't be processed
-            if food_dict["ncbi_taxonomy_id"] != '':
-                # get the content rows for the food
-                contents: iter = self.get_list_records_by_id(contents_list, 'food_id', food_id)
-
-                # go through each content record
-                for content in contents:
-                    # init a found flag
-                    found: bool = False
-
-                    # is this a compound
-                    if content['source_type'].startswith('C'):
-                        # look up the compound data by source id
-                        # compound_records: filter = filter(lambda data_record: data_record['id'] == content['source_id'], compounds_list)
-                        compound_records: iter = self.get_list_records_by_id(compounds_list, 'id', content['source_id'])
-
-                        # for each record returned
-                        for compound_record in compound_records:
-                            # set the found flag
-                            found = True
-
-                            # get the pertinent info from the record
-                            good_row, equivalent_id = self.get_equivalent_id(compound_record)
-
-                            # is it good enough to save
-                            if good_row:
-                                # save the node
-                                compound_node_list.append({'grp': f'{food_id}', 'node_num': 2, 'id': f'{equivalent_id}', 'name': f'{compound_record["name"]}', 'category': 'chemical_substance|molecular_entity|biological_entity|named_thing', 'equivalent_identifiers': f'{equivalent_id}', 'foodb_id': 0, 'content_type': 'compound', 'nutrient': 'false', 'unit': f'{content["orig_unit"]}', 'amount': f'{content["orig_max"]}'})
-
-                    # is this a nutrient
-                    elif content['source_type'].startswith('N'):
-                        # look up the nutrient data by source id
-                        # nutrient_records: filter = filter(lambda data_record: data_record['id'] == content['source_id'], nutrients_list)
-                        nutrient_records: iter = self.get_list_records_by_id(nutrients_list, 'id', content['source_id'])
-
-                        # for each record returned
-                        for nutrient_record in nutrient_records:
-                            # set the found flag
-                            found = True
-
-                            # save the node
-                            nutrient_node_list.append({'grp': f'{food_id}', 'node_num': 3, 'id': f'{nutrient_record["public_id"]}', 'name': f'{nutrient_record["name"]}', 'category': 'chemical_substance|molecular_entity|biological_entity|named_thing', 'equivalent_identifiers': '', 'foodb_id': 0, 'content_type': 'nutrient', 'nutrient': 'true', 'unit': f'{content["orig_unit"]}', 'amount': f'{content["orig_max"]}'})
-
-                    # was the compound found
-                    if not found:
-                        self.logger.info(f"{content['source_type']} not found. Food {food_id}, name: {food_name}, content id: {content['id']}, source id: {content['source_id']}")
-                    else:
-                        # add the food node
-                        compound_node_list.append({'grp': f'{food_id}', 'node_num': 1, 'id': f'NCBITaxon:{food_dict["ncbi_taxonomy_id"]}', 'name': f'{food_name}', 'category': '', 'equivalent_identifiers': '', 'foodb_id': f'{food_id}', 'content_type': 'food', 'nutrient': 'false'})
-
-                # were there any compound records
-                if len(compound_node_list) > 0:
-                    # save the normalized data
-                    node_list.extend(compound_node_list)
-                else:
-                    self.logger.info(f'No compound records. Food ID {food_id}, name: {food_name}')
-
-                # were there nutrient records
-                if len(nutrient_node_list) > 0:
-                    # extend the nutrient data
-                    node_list.extend(nutrient_node_list)
-                else:
-                    self.logger.info(f'No nutrient records. Food ID {food_id}, name: {food_name}')
-            else:
-                self.logger.warning(f"NCBI Taxon ID missing. Food ID {food_id}, name: {food_name}. Continuing..")
+            if food_dict["ncbi_taxonomy_id"] == '':
+                self.logger.warning(f'NCBI Taxon ID missing. Food ID {food_dict["id"]}, name: {food_dict["name_scientific"]}. Continuing..')
                 continue
 
-        # is there anything to do
-        if len(node_list) > 0:
-            # de-dupe the list
-            node_list = [dict(t) for t in {tuple(d.items()) for d in node_list}]
+            # get the content rows for the food
+            contents: list = [{column: values[row] for column, values in contents_columns.items()} for row in contents_rows.get(food_dict['id'], [])]
 
-            # get a reference to the node normalize utility
-            nnu = NodeNormUtils(self.logger.level)
+            # queue up the nodes of the food
+            node_queue.extend(self.get_food_nodes(food_dict, contents, compounds_index, nutrients_index))
 
-            # normalize the node data
-            self.node_norm_failures = nnu.normalize_node_data(node_list, block_size=1000)
+            # is it time to normalize and write out the queue
+            if len(node_queue) >= self.node_queue_size:
+                self.write_node_queue(node_queue, out_node_f, out_edge_f, output_mode)
 
-            self.logger.debug('Creating edges.')
+        # write out the remainder
+        self.write_node_queue(node_queue, out_node_f, out_edge_f, output_mode)
 
-            # create a data frame with the node list
-            df: pd.DataFrame = pd.DataFrame(node_list, columns=['grp', 'node_num', 'id', 'name', 'category', 'equivalent_identifiers', 'foodb_id', 'content_type', 'nutrient', 'unit', 'amount'])
+        # finish off the json if we have to
+        if output_mode == 'json':
+            out_node_f.write('\n]}')
+            out_edge_f.write('\n]}')
 
-            # get the list of unique edges
-            edge_set: set = self.get_edge_set(df, output_mode)
+        self.logger.debug(f'{len(self.written_nodes)} nodes and {len(self.written_edges)} edges written.')
 
-            self.logger.debug(f'{len(edge_set)} unique edges found, creating KGX edge file.')
+        # output the failures
+        gd.format_normalization_failures(self.get_name(), self.node_norm_failures, self.edge_norm_failures)
 
-            # write out the edge data
-            if output_mode == 'json':
-                out_edge_f.write(',\n'.join(edge_set))
-            else:
-                out_edge_f.write('\n'.join(edge_set))
+        self.logger.debug(f'FooDB data parsing and KGX file creation complete.\n')
+
+    def get_food_nodes(self, food_dict: dict, contents: list, compounds_index: dict, nutrients_index: dict) -> list:
+        """
+        gets the distinct nodes of a food and its compound and nutrient contents
 
-            # init a set for the node de-duplication
-            final_node_set: set = set()
+        :param food_dict: the food record
+        :param contents: the content records of the food
+        :param compounds_index: the compound records by id
+        :param nutrients_index: the nutrient records by id
+        :return: the list of nodes grouped by the food id, the food node first
+        """
+        # save the basic food info
+        food_id: str = food_dict['id']
+        food_name: str = food_dict['name_scientific']
 
-            # write out the unique nodes
-            for idx, row in enumerate(node_list):
-                # format the output depending on the mode
-                if output_mode == 'json':
-                    # turn these into json
-                    category: str = json.dumps(row["category"].split('|'))
-                    identifiers: str = json.dumps(row["equivalent_identifiers"].split('|'))
-                    name: str = row["name"].replace('"', '\\"')
+        self.logger.debug(f'Working food id: {food_id}, name: {food_name}')
+
+        # these node types are separated because a food may not necessarily have both
+        compound_nodes: list = []
+        nutrient_nodes: list = []
+
+        # go through each content record
+        for content in contents:
+            # init a found flag
+            found: bool = False
+
+            # is this a compound
+            if content['source_type'].startswith('C'):
+                # look up the compound data by source id
+                compound_records: list = compounds_index.get(content['source_id'], [])
+
+                # for each record returned
+                for compound_record in compound_records:
+                    # set the found flag
+                    found = True
+
+                    # get the preferred identifier of the compound
+                    equivalent_id: str = compound_record['equivalent_id']
+
+                    # if no identifier was found the record is no good
+                    if equivalent_id != '':
+                        # save the node
+                        compound_nodes.append({'grp': f'{food_id}', 'node_num': 2, 'id': f'{equivalent_id}', 'name': f'{compound_record["name"]}', 'category': 'chemical_substance|molecular_entity|biological_entity|named_thing', 'equivalent_identifiers': f'{equivalent_id}', 'foodb_id': 0, 'content_type': 'compound', 'nutrient': 'false', 'unit': f'{content["orig_unit"]}', 'amount': f'{content["orig_max"]}'})
+
+            # is this a nutrient
+            elif content['source_type'].startswith('N'):
+                # look up the nutrient data by source id
+                nutrient_records: list = nutrients_index.get(content['source_id'], [])
+
+                # for each record returned
+                for nutrient_record in nutrient_records:
+                    # set the found flag
+                    found = True
 
                     # save the node
-                    final_node_set.add(f'{{"id":"{row["id"]}", "name":"{name}", "category":{category}, "equivalent_identifiers":{identifiers}, "foodb_id":{row["foodb_id"]}, "content_type":"{row["content_type"]}", "nutrient":"{row["nutrient"]}"}}')
-                else:
-                    # save the node
-                    final_node_set.add(f"{row['id']}\t{row['name']}\t{row['category']}\t{row['equivalent_identifiers']}\t{row['foodb_id']}\t{row['content_type']}\t{row['nutrient']}")
+                    nutrient_nodes.append({'grp': f'{food_id}', 'node_num': 3, 'id': f'{nutrient_record["public_id"]}', 'name': f'{nutrient_record["name"]}', 'category': 'chemical_substance|molecular_entity|biological_entity|named_thing', 'equivalent_identifiers': '', 'foodb_id': 0, 'content_type': 'nutrient', 'nutrient': 'true', 'unit': f'{content["orig_unit"]}', 'amount': f'{content["orig_max"]}'})
 
-            self.logger.debug(f'Creating KGX node file with {len(final_node_set)} nodes.')
+            # was the content found
+            if not found:
+                self.logger.info(f"{content['source_type']} not found. Food {food_id}, name: {food_name}, source id: {content['source_id']}")
 
-            # write out the node data
-            if output_mode == 'json':
-                out_node_f.write(',\n'.join(final_node_set))
-            else:
-                out_node_f.write('\n'.join(final_node_set))
+        # were there any compound records
+        if len(compound_nodes) == 0:
+            self.logger.info(f'No compound records. Food ID {food_id}, name: {food_name}')
+
+        # were there nutrient records
+        if len(nutrient_nodes) == 0:
+            self.logger.info(f'No nutrient records. Food ID {food_id}, name: {food_name}')
+
+        # nothing to do if no content was found
+        if len(compound_nodes) == 0 and len(nutrient_nodes) == 0:
+            return []
+
+        # create the food node
+        food_node: dict = {'grp': f'{food_id}', 'node_num': 1, 'id': f'NCBITaxon:{food_dict["ncbi_taxonomy_id"]}', 'name': f'{food_name}', 'category': '', 'equivalent_identifiers': '', 'foodb_id': f'{food_id}', 'content_type': 'food', 'nutrient': 'false'}
 
-            # finish off the json if we have to
+        # return the distinct nodes to the caller
+        return [dict(t) for t in dict.fromkeys(tuple(d.items()) for d in [food_node] + compound_nodes + nutrient_nodes)]
+
+    def write_node_queue(self, node_queue: list, out_node_f, out_edge_f, output_mode: str):
+        """
+        normalizes the queued nodes and writes out the nodes and the edges between each food and its contents
+
+        :param node_queue: the list of nodes grouped by food. it is cleared when done
+        :param out_node_f: the node file pointer
+        :param out_edge_f: the edge file pointer
+        :param output_mode: the output mode (tsv or json)
+        :return:
+        """
+        # is there anything to do
+        if len(node_queue) == 0:
+            return
+
+        # get a reference to the node normalize utility
+        nnu = NodeNormUtils(self.logger.level)
+
+        # normalize the node data
+        self.node_norm_failures.extend(nnu.normalize_node_data(node_queue, self.cached_node_norms, block_size=1000))
+
+        self.logger.debug('Creating edges.')
+
+        # create a data frame with the node list
+        df: pd.DataFrame = pd.DataFrame(node_queue, columns=['grp', 'node_num', 'id', 'name', 'category', 'equivalent_identifiers', 'foodb_id', 'content_type', 'nutrient', 'unit', 'amount'])
+
+        # write out the edges
+        for edge in self.get_edge_set(df, output_mode):
+            # skip the edge if it was already written
+            if self.written_edges.add(edge):
+                self.write_record(out_edge_f, edge, len(self.written_edges), output_mode)
+
+        # write out the nodes
+        for row in node_queue:
+            # skip the node if it was already written
+            if not self.written_nodes.add(row['id']):
+                continue
+
+            # format the output depending on the mode
             if output_mode == 'json':
-                out_node_f.write('\n]}')
-                out_edge_f.write('\n]}')
-        else:
-            self.logger.warning(f'No records found for food {food_id}, name: {food_name}')
+                # turn these into json
+                category: str = json.dumps(row["category"].split('|'))
+                identifiers: str = json.dumps(row["equivalent_identifiers"].split('|'))
+                name: str = row["name"].replace('"', '\\"')
 
-        # output the failures
-        gd.format_normalization_failures(self.get_name(), self.node_norm_failures, self.edge_norm_failures)
+                # save the node
+                node: str = f'{{"id":"{row["id"]}", "name":"{name}", "category":{category}, "equivalent_identifiers":{identifiers}, "foodb_id":{row["foodb_id"]}, "content_type":"{row["content_type"]}", "nutrient":"{row["nutrient"]}"}}'
+            else:
+                # save the node
+                node: str = f"{row['id']}\t{row['name']}\t{row['category']}\t{row['equivalent_identifiers']}\t{row['foodb_id']}\t{row['content_type']}\t{row['nutrient']}"
 
-        self.logger.debug(f'FooDB data parsing and KGX file creation complete.\n')
+            # write out the node
+            self.write_record(out_node_f, node, len(self.written_nodes), output_mode)
+
+        # clear out for the next load
+        node_queue.clear()
 
     @staticmethod
-    def get_list_records_by_id(data_list: list, data_key: str, search_id: str) -> iter:
+    def write_record(out_f, record: str, record_count: int, output_mode: str):
         """
-            returns a list iterator of item dicts by their id
+        writes a node or edge record to a KGX file with the separator that goes before it
 
-        :param data_list: the data list to search
-        :param data_key: the data dict key to use for the dict value
-        :param search_id: the value to search for
-        :return: iterable of content dicts
+        :param out_f: the node or edge file
+        :param record: the formatted node or edge
+        :param record_count: the number of records written to the file including this one
+        :param output_mode: the output mode (tsv or json)
+        :return:
         """
-        # init the list of found food contents
-        ret_val: list = []
-
-        # get the last index
-        last_index: int = len(data_list) - 1
-
-        # find the contents records for this food ID
-        for index, data_record in enumerate(data_list):
-            # did we find a food record with this id
-            if data_record[data_key] == search_id:
-                # save data for each record id matches
-                while data_list[index][data_key] == search_id:
-                    # append the contents to the return list
-                    ret_val.append(data_list[index])
-
-                    # go to the next contents list item
-                    index += 1
-
-                    # check for overflow
-                    if index > last_index:
-                        break
-
-                # we gone thru all the contents with this food id
-                break
-
-        # return the list of contents to the caller
-        return iter(ret_val)
-
-    #############
-    # get_equivalent_id - inspects a compounds record and returns pertinent info
-    #
-    # param: compound: dict - the compounds record
-    # return: good_row: bool, public_food_id: str, equivalent_identifier: str
-    #############
-    @staticmethod
-    def get_equivalent_id(compound: dict) -> (bool, str, dict):
-        # init the return values
-        good_row: bool = False
-
-        # init the equivalent identifier
-        equivalent_identifier: str = ''
-
-        # get the identifier. these are in priority order
-        if compound['moldb_inchikey'] != '':
-            equivalent_identifier = f'INCHIKEY:{compound["moldb_inchikey"]}'.replace('InChIKey=', '')
-        elif compound['chembl_id'] != '':
-            equivalent_identifier = f'CHEMBL:{compound["chembl_id"]}'
-        elif compound['drugbank_id'] != '':
-            equivalent_identifier = f'DRUGBANK:{compound["drugbank_id"]}'
-        elif compound['kegg_compound_id'] != '':
-            equivalent_identifier = f'KEGG:{compound["kegg_compound_id"]}'
-        elif compound['chebi_id'] != '':
-            equivalent_identifier = f'CHEBI:{compound["chebi_id"]}'
-        elif compound['hmdb_id'] != '':
-            equivalent_identifier = f'HMDB:{compound["hmdb_id"]}'
-        elif compound['pubchem_compound_id'] != '':
-            equivalent_identifier = f'PUBCHEM.COMPOUND:{compound["pubchem_compound_id"]}'
-
-        # if no identifier found the record is no good
-        if equivalent_identifier != '':
-            # set the good row flag
-            good_row = True
+        # the first record has no separator
+        if record_count > 1:
+            if output_mode == 'json':
+                out_f.write(',\n')
+            else:
+                out_f.write('\n')
 
-        # return to the caller
-        return good_row, equivalent_identifier
+        # write out the record
+        out_f.write(record)
 
-    def get_edge_set(self, df: pd.DataFrame, output_mode: str) -> set:
+    def get_equivalent_ids(self, compounds_df: pd.DataFrame) -> pd.Series:
         """
-        gets a list of edges for the data frame passed
+        gets the preferred identifier of each compound. the first identifier column that has a value wins.
 
-        :param df: node storage data frame
-        :param output_mode: the output mode (tsv or json)
-        :return: list of KGX ready edges
+        :param compounds_df: the compounds data frame
+        :return: series of the CURIE of each compound, empty if the compound has no identifiers
         """
+        # init the identifiers
+        equivalent_ids: pd.Series = pd.Series('', index=compounds_df.index, dtype=object)
 
-        # separate the data into triplet groups
-        df_grp: pd.groupby_generic.DataFrameGroupBy = df.set_index('grp').groupby('grp')
+        # go through the columns from the lowest priority up so the higher ones overwrite them
+        for column, prefix in reversed(self.EQUIVALENT_ID_COLUMNS):
+            # get the column values
+            values: pd.Series = compounds_df[column]
 
-        # init a list for edge normalizations
-        edge_list: list = []
+            # the inchikeys may come with a prefix of their own
+            if column == 'moldb_inchikey':
+                values = values.str.replace('InChIKey=', '', regex=False)
 
-        # init a set for the edges
-        edge_set: set = set()
+            # take the values that are there
+            equivalent_ids = equivalent_ids.mask(compounds_df[column] != '', prefix + values)
 
-        # iterate through the groups and create the edge records.
-        for row_index, rows in df_grp:
-            # init variables for each group
-            node_1_id: str = ''
+        # return to the caller
+        return equivalent_ids
 
-            # find the food node
-            for row in rows.iterrows():
-                # save the node id for the edges
-                if row[1].node_num == 1:
-                    node_1_id = row[1]['id']
-                    break
+    def get_edge_set(self, df: pd.DataFrame, output_mode: str) -> list:
+        """
+        gets a list of edges for the data frame passed
 
-            # did we find the root node
-            if node_1_id != '':
-                # now for each node that isn't a food
-                for row in rows.iterrows():
-                    # save the node id for the edges
-                    if row[1].node_num != 1:
-                        edge_list.append({"predicate": "", "subject": f"{node_1_id}", "relation": "RO:0001019", "object": f"{row[1]['id']}", "edge_label": "biolink:related_to", "unit": f"{row[1]['unit']}", "amount": f"{row[1]['amount']}"})
+        :param df: node storage data frame
+        :param output_mode: the output mode (tsv or json)
+        :return: list of KGX ready edges
+        """
+        # get a reference to the edge builder
+        geb = GroupEdgeBuilder(self.logger.level)
 
-        # get a reference to the edge normalizer
-        en = EdgeNormUtils(self.logger.level)
+        # join each food node to its contents
+        edges: pd.DataFrame = geb.get_group_edges(df, edge_columns=['unit', 'amount'])
+
+        # set the edge type
+        edges['predicate'] = ''
+        edges['relation'] = 'RO:0001019'
+        edges['edge_label'] = 'biolink:related_to'
 
         # normalize the edges
-        self.edge_norm_failures = en.normalize_edge_data(edge_list)
+        self.edge_norm_failures.extend(geb.normalize(edges, self.cached_edge_norms))
 
-        for item in edge_list:
-            # create the record ID
-            record_id: str = item["subject"] + item["relation"] + item["edge_label"] + item["object"]
+        # create the record IDs
+        edges['id'] = geb.get_edge_ids(edges)
 
-            # depending on the output mode, create the KGX edge data for nodes 1 and 3
-            if output_mode == 'json':
-                edge_set.add(f'{{"id":"{hashlib.md5(record_id.encode("utf-8")).hexdigest()}", "predicate":"{item["predicate"]}", "subject":"{item["subject"]}", "relation":"{item["relation"]}", "object":"{item["object"]}", "edge_label":"{item["edge_label"]}", "unit":"{item["unit"]}", "amount":"{item["amount"]}", "source_database":"FooDB"}}')
-            else:
-                edge_set.add(f'{hashlib.md5(record_id.encode("utf-8")).hexdigest()}\t{item["predicate"]}\t{item["subject"]}\t{item["relation"]}\t{item["edge_label"]}\t{item["object"]}\t{item["unit"]}\t{item["amount"]}\tFooDB')
+        # depending on the output mode, create the KGX edge data
+        if output_mode == 'json':
+            edge_list: list = [f'{{"id":"{item.id}", "predicate":"{item.predicate}", "subject":"{item.subject}", "relation":"{item.relation}", "object":"{item.object}", "edge_label":"{item.edge_label}", "unit":"{item.unit}", "amount":"{item.amount}", "source_database":"FooDB"}}'
+                               for item in edges.itertuples(index=False)]
+        else:
+            edge_list: list = [f'{item.id}\t{item.predicate}\t{item.subject}\t{item.relation}\t{item.edge_label}\t{item.object}\t{item.unit}\t{item.amount}\tFooDB' for item in edges.itertuples(index=False)]
 
-        self.logger.debug(f'{len(edge_set)} unique edges identified.')
+        self.logger.debug(f'{len(edge_list)} edges identified.')
 
         # return the list to the caller
-        return edge_set
+        return edge_list
 
 
 if __name__ == '__main__':
@@ -1,39 +1,15 @@
 import os
 import hashlib
 import argparse
-import enum
-import pandas as pd
-import gzip
 import logging
 import json
 
-from io import TextIOWrapper
-from csv import reader
-from Common.utils import LoggingUtil, GetData, NodeNormUtils, EdgeNormUtils
+from io import TextIOBase
+from Common.utils import LoggingUtil, GetData, NodeNormUtils, DedupRegistry
+from Common.gaf_reader import GAFReader, GOTermEdgeBuilder
 from pathlib import Path
 
 
-# the data header columns are:
-class DATACOLS(enum.IntEnum):
-    DB = 0
-    DB_Object_ID = 1
-    DB_Object_Symbol = 2
-    Qualifier = 3
-    GO_ID = 4
-    DB_Reference = 5
-    Evidence_Code = 6
-    With_From = 7
-    Aspect = 8
-    DB_Object_Name = 9
-    DB_Object_Synonym = 10
-    DB_Object_Type = 11
-    Taxon_Interacting_taxon = 12
-    Date = 13
-    Assigned_By = 14
-    Annotation_Extension = 15
-    Gene_Product_Form_ID = 16
-
-
 ##############
 # Class: UniProtKB GOA loader
 #
@@ -47,6 +23,13 @@ class GOALoader:
     node_norm_failures: list = []
     edge_norm_failures: list = []
 
+    # storage for cached node and edge normalizations
+    cached_node_norms: dict = {}
+    cached_edge_norms: dict = {}
+
+    # the default gene node category. could be overwritten in normalization
+    GENE_CATEGORY: str = 'gene|gene_or_gene_product|macromolecular_machine|genomic_entity|molecular_entity|biological_entity|named_thing'
+
     def get_name(self):
         """
         returns the name of the class
@@ -63,6 +46,17 @@ class GOALoader:
         # create a logger
         self.logger = LoggingUtil.init_logging("Data_services.GOA.GOALoader", level=log_level, line_format='medium', log_file_path=os.path.join(Path(__file__).parents[2], 'logs'))
 
+        # the normalized gene and GO term nodes keyed by the curie in the data. None if a GO term did not normalize
+        self.normalized_nodes: dict = {}
+
+        # the GAF file reader and the gene to GO term edge builder
+        self.gaf_reader: GAFReader = GAFReader(log_level)
+        self.edge_builder: GOTermEdgeBuilder = GOTermEdgeBuilder(log_level)
+
+        # registries of the node and edge ids written to the KGX files
+        self.written_nodes: DedupRegistry = DedupRegistry()
+        self.written_edges: DedupRegistry = DedupRegistry()
+
     def load(self, data_file_path, data_file_name: str, out_name: str, output_mode: str = 'json', test_mode: bool = False) -> bool:
         """
         loads/parses goa data file from ftp://ftp.ebi.ac.uk/pub/databases/GO/goa/<ftp_dir_path>
@@ -85,12 +79,12 @@ class GOALoader:
         # do the real thing if we arent in debug mode
         if not test_mode:
             # get the uniprot kb ids that were curated by swiss-prot
-            swiss_prots: set = gd.get_swiss_prot_id_set(data_file_path, test_mode)
+            swiss_prots = gd.get_swiss_prot_id_set(data_file_path, test_mode)
 
             # get the GOA data file
             byte_count: int = gd.get_goa_http_file(data_file_path, data_file_name)
         else:
-            swiss_prots: set = {'A0A024RBG1'}
+            swiss_prots = {'A0A024RBG1'}
             byte_count: int = 1
 
         # did we get all the files and swiss prots
@@ -131,6 +125,9 @@ class GOALoader:
         """
         Parses the data file for graph nodes/edges and writes them out the KGX tsv files.
 
+        The file is read twice. The first pass gets the distinct genes and GO terms so they can be normalized
+        up front. The second pass writes out the nodes and edge of each annotation as it is read.
+
         :param infile_path: the name of the intact file to process
         :param out_edge_f: the edge file pointer
         :param out_node_f: the node file pointer
@@ -138,218 +135,160 @@ class GOALoader:
         :param swiss_prots: the list of uniprot ids that have been swiss curated
         :return:
         """
+        # init storage for the distinct genes (with the first symbol found) and GO terms
+        genes: dict = {}
+        go_terms: set = set()
 
-        with gzip.open(infile_path, 'r') as zf:
-            # read the file and make the list
-            node_list: list = self.get_node_list(zf, swiss_prots)
-
-            self.logger.debug(f'Node list loaded with {len(node_list)} entries.')
+        with GAFReader.open(infile_path) as zf:
+            # get the distinct genes and GO terms
+            for record in self.gaf_reader.read(zf, swiss_prots):
+                genes.setdefault(record.gene_id, record.symbol)
+                go_terms.add(record.go_id)
 
-            # de-dupe the list
-            node_list = [dict(t) for t in {tuple(d.items()) for d in node_list}]
+        self.logger.debug(f'{len(genes)} genes and {len(go_terms)} GO terms found.')
 
-            # normalize the group of entries on the data frame.
-            nnu = NodeNormUtils(self.logger.level)
+        # normalize the genes and GO terms
+        self.normalize_nodes(genes, go_terms)
 
-            # normalize the node data
-            self.node_norm_failures = nnu.normalize_node_data(node_list)
+        # normalize the edge types
+        self.edge_norm_failures = self.edge_builder.normalize(self.cached_edge_norms)
 
-            self.logger.debug('Creating edges.')
+        # reset the written node and edge registries
+        self.written_nodes.clear()
+        self.written_edges.clear()
 
-            # create a data frame with the node list
-            df: pd.DataFrame = pd.DataFrame(node_list, columns=['grp', 'node_num', 'id', 'name', 'category', 'equivalent_identifiers'])
+        with GAFReader.open(infile_path) as zf:
+            # for each annotation
+            for record in self.gaf_reader.read(zf, swiss_prots):
+                # get the normalized nodes
+                gene_node: dict = self.normalized_nodes[record.gene_id]
+                go_node = self.normalized_nodes[record.go_id]
 
-            # get the list of unique edges
-            final_edges: set = self.get_edge_set(df, output_mode)
+                # write out the gene node
+                self.write_node(out_node_f, gene_node, output_mode)
 
-            self.logger.debug(f'{len(final_edges)} unique edges found, creating KGX edge file.')
+                # GO terms that did not normalize cant have an edge
+                if go_node is None:
+                    continue
 
-            # write out the edge data
-            if output_mode == 'json':
-                out_edge_f.write(',\n'.join(final_edges))
-            else:
-                out_edge_f.write('\n'.join(final_edges))
+                # write out the GO term node
+                self.write_node(out_node_f, go_node, output_mode)
 
-            self.logger.debug(f'De-duplicating {len(node_list)} nodes')
+                # write out the edge that connects the gene and the GO term
+                self.write_edge(out_edge_f, gene_node, go_node, record.aspect, output_mode)
 
-            # init a set for the node de-duplication
-            final_node_set: set = set()
+        self.logger.debug(f'{len(self.written_nodes)} nodes and {len(self.written_edges)} edges written.')
 
-            # write out the unique nodes
-            for row in node_list:
-                # format the output depending on the mode
-                if output_mode == 'json':
-                    # turn these into json
-                    category = json.dumps(row["category"].split('|'))
-                    identifiers = json.dumps(row["equivalent_identifiers"].split('|'))
-
-                    # save the node
-                    final_node_set.add(f'{{"id":"{row["id"]}", "name":"{row["name"]}", "category":{category}, "equivalent_identifiers":{identifiers}}}')
-                else:
-                    # save the node
-                    final_node_set.add(f"{row['id']}\t{row['name']}\t{row['category']}\t{row['equivalent_identifiers']}")
-
-            self.logger.debug(f'Creating KGX node file with {len(final_node_set)} nodes.')
-
-            # write out the node data
-            if output_mode == 'json':
-                out_node_f.write(',\n'.join(final_node_set))
-            else:
-                out_node_f.write('\n'.join(final_node_set))
-
-            # finish off the json if we have to
-            if output_mode == 'json':
-                out_node_f.write('\n]}')
-                out_edge_f.write('\n]}')
+        # finish off the json if we have to
+        if output_mode == 'json':
+            out_node_f.write('\n]}')
+            out_edge_f.write('\n]}')
 
         self.logger.debug(f'GOA data parsing and KGX file creation complete.\n')
 
-    def get_edge_set(self, df: pd.DataFrame, output_mode: str) -> set:
+    def normalize_nodes(self, genes: dict, go_terms: set):
         """
-        gets a list of edges for the data frame passed
+        calls the NodeNormalization web service to get the normalized gene and GO term nodes.
+        the results are saved in the normalized nodes lookup.
 
-        :param df: node storage data frame
-        :param output_mode: the output mode (tsv or json)
-        :return: list of KGX ready edges
+        :param genes: the gene curies and their symbols
+        :param go_terms: the GO term curies
+        :return:
         """
+        # create the nodes to normalize, keyed by the curie in the data
+        nodes: dict = {gene_id: {'id': gene_id, 'name': gene_symbol, 'category': self.GENE_CATEGORY, 'equivalent_identifiers': gene_id} for gene_id, gene_symbol in genes.items()}
+        nodes.update({go_id: {'id': go_id, 'name': '', 'category': '', 'equivalent_identifiers': ''} for go_id in go_terms})
 
-        # separate the data into triplet groups
-        df_grp: pd.groupby_generic.DataFrameGroupBy = df.set_index('grp').groupby('grp')
-
-        # init a list for edge normalizations
-        edge_list: list = []
-
-        # init a set for the edges
-        edge_set: set = set()
-
-        # iterate through the groups and create the edge records.
-        for row_index, rows in df_grp:
-            # init variables for each group
-            node_1_id: str = ''
-            node_3_id: str = ''
-            node_3_type: str = ''
-            grp: str = ''
-
-            # if we dont get a pair something is odd (but not necessarily bad)
-            if len(rows) != 2:
-                self.logger.debug(f'Debug: Mis-matched node grouping. {rows}')
-
-            # for each row in the triplet
-            for row in rows.iterrows():
-                # save the node ids for the edges
-                if row[1].node_num == 1:
-                    grp = row[0]
-                    node_1_id = row[1]['id']
-                elif row[1].node_num == 3:
-                    node_3_id = row[1]['id']
-                    node_3_type = row[1]['category']
-
-            # write out an edge that connects nodes 1 and 3
-            """ An edge between the gene and the go term. If the go term is a molecular_activity, 
-            then the edge should be (go term)-[enabled_by]->(gene). If the go term is a biological 
-            process then it should be (gene)-[actively_involved_in]->(go term). If it is a cellular 
-            component then it should be (go term)-[has_part]->(gene) """
-
-            # init node 1 to node 3 edge details
-            predicate: str = ''
-            relation: str = ''
-            src_node_id: str = ''
-            obj_node_id: str = ''
-            valid_type = True
-
-            # find the predicate and edge relationships
-            if node_3_type.find('molecular_activity') > -1:
-                predicate = 'biolink:enabled_by'
-                relation = 'RO:0002333'
-                src_node_id = node_3_id
-                obj_node_id = node_1_id
-            elif node_3_type.find('biological_process') > -1:
-                predicate = 'biolink:actively_involved_in'
-                relation = 'RO:0002331'
-                src_node_id = node_1_id
-                obj_node_id = node_3_id
-            elif node_3_type.find('cellular_component') > -1:
-                predicate = 'biolink:has_part'
-                relation = 'RO:0000051'
-                src_node_id = node_3_id
-                obj_node_id = node_1_id
-            else:
-                valid_type = False
-                self.logger.debug(f'Debug: Unrecognized node 3 type for {grp}')
+        # normalize the nodes. this updates the nodes in place
+        self.node_norm_failures = NodeNormUtils(self.logger.level).normalize_node_data(list(nodes.values()), self.cached_node_norms)
 
-            # was this a good value
-            if valid_type:
-                edge_list.append({"predicate": f"{predicate}", "subject": f"{src_node_id}", "relation": f"{relation}", "object": f"{obj_node_id}", "edge_label": f"{relation}"})
+        # save the nodes. the ones that dont have a category cant have an edge
+        for curie, node in nodes.items():
+            self.normalized_nodes[curie] = node if node['category'] != '' else None
 
-        # get a reference to the ege normalizer
-        en = EdgeNormUtils(self.logger.level)
+    def write_edge(self, out_edge_f: TextIOBase, gene_node: dict, go_node: dict, aspect: str, output_mode: str):
+        """
+        writes the edge between a gene and a GO term to the KGX edge file if it has not been written already
 
-        # normalize the edges
-        self.edge_norm_failures = en.normalize_edge_data(edge_list)
+        :param out_edge_f: the edge file
+        :param gene_node: the normalized gene node
+        :param go_node: the normalized GO term node
+        :param aspect: the GAF aspect of the annotation (F, P or C)
+        :param output_mode: the output mode (tsv or json)
+        :return:
+        """
+        # get the edge for the GO term type
+        item = self.edge_builder.get_edge(gene_node['id'], go_node, aspect)
 
-        for item in edge_list:
-            # create the record ID
-            record_id: str = item["subject"] + item["relation"] + item["edge_label"] + item["object"]
+        # was this a good value
+        if item is None:
+            self.logger.debug(f'Debug: Unrecognized node 3 type for {go_node["id"]}')
+            return
 
-            # depending on the output mode, create the KGX edge data for nodes 1 and 3
-            if output_mode == 'json':
-                edge_set.add(f'{{"id":"{hashlib.md5(record_id.encode("utf-8")).hexdigest()}", "predicate": "{item["predicate"]}", "subject":"{item["subject"]}", "relation":"{item["relation"]}", "object":"{item["object"]}", "edge_label":"{item["edge_label"]}", "source_database":"GOA_EBI-Human"}}')
-            else:
-                edge_set.add(f'{hashlib.md5(record_id.encode("utf-8")).hexdigest()}\t{item["predicate"]}\t{item["subject"]}\t{item["relation"]}\t{item["edge_label"]}\t{item["object"]}\tGOA_EBI-Human')
+        # create the record ID
+        record_id: str = hashlib.md5((item["subject"] + item["relation"] + item["edge_label"] + item["object"]).encode("utf-8")).hexdigest()
 
-            self.logger.debug(f'{len(edge_set)} unique edges identified.')
+        # skip the edge if it was already written
+        if not self.written_edges.add(record_id):
+            return
 
-        # return the list to the caller
-        return edge_set
+        # depending on the output mode, create the KGX edge data for nodes 1 and 3
+        if output_mode == 'json':
+            record: str = f'{{"id":"{record_id}", "predicate": "{item["predicate"]}", "subject":"{item["subject"]}", "relation":"{item["relation"]}", "object":"{item["object"]}", "edge_label":"{item["edge_label"]}", "source_database":"GOA_EBI-Human"}}'
+        else:
+            record: str = f'{record_id}\t{item["predicate"]}\t{item["subject"]}\t{item["relation"]}\t{item["edge_label"]}\t{item["object"]}\tGOA_EBI-Human'
 
-    def get_node_list(self, fp, swiss_prots: set) -> list:
-        """ loads the nodes from the file handle passed
+        # write out the edge
+        self.write_record(out_edge_f, record, len(self.written_edges), output_mode)
 
-        :param fp: open file pointer
-        :param swiss_prots: list of swiss-prot curated uniprot id entries
-        :return: list of nodes for further processing
+    def write_node(self, out_node_f: TextIOBase, node: dict, output_mode: str):
         """
+        writes a node to the KGX node file if it has not been written already
 
-        # create a csv parser
-        lines = reader(TextIOWrapper(fp, "utf-8"), delimiter='\t')
-
-        # clear out the node list
-        node_list: list = []
-
-        # set the default category. could be overwritten in normalization
-        default_category: str = 'gene|gene_or_gene_product|macromolecular_machine|genomic_entity|molecular_entity|biological_entity|named_thing'
-
-        # while there are lines in the csv file
-        for line in lines:
-            # skip over data comments
-            if line[0] == '!' or line[0][0] == '!':
-                continue
-
-            # is this a swiss-port curated entry
-            if line[1] in swiss_prots:
-                # set the default identifier. could be overwritten in normalization
-                default_identifier: str = f'{line[DATACOLS.DB.value]}:{line[DATACOLS.DB_Object_ID.value]}'
-
-                try:
-                    # an example record looks like this
-                    """ UniProtKB       O73942  apeI            GO:0004518      GO_REF:0000043  IEA     UniProtKB-KW:KW-0540    F       
-                        Homing endonuclease I-ApeI      apeI|APE_1929.1 protein 272557  20200229        UniProt """
+        :param out_node_f: the node file
+        :param node: the node to write
+        :param output_mode: the output mode (tsv or json)
+        :return:
+        """
+        # skip the node if it was already written
+        if not self.written_nodes.add(node['id']):
+            return
+
+        # format the output depending on the mode
+        if output_mode == 'json':
+            # turn these into json
+            category = json.dumps(node["category"].split('|'))
+            identifiers = json.dumps(node["equivalent_identifiers"].split('|'))
+
+            # save the node
+            record: str = f'{{"id":"{node["id"]}", "name":"{node["name"]}", "category":{category}, "equivalent_identifiers":{identifiers}}}'
+        else:
+            # save the node
+            record: str = f"{node['id']}\t{node['name']}\t{node['category']}\t{node['equivalent_identifiers']}"
 
-                    # create a unique group identifier
-                    grp: str = f'{line[DATACOLS.DB_Object_ID.value]}/{line[DATACOLS.GO_ID.value]}/{line[DATACOLS.Taxon_Interacting_taxon.value]}'
+        # write out the node
+        self.write_record(out_node_f, record, len(self.written_nodes), output_mode)
 
-                    # create node type 1
-                    """ A gene with identifier UniProtKB:O73942, and name "apeI", and description "Homing endonuclease I-ApeI". """
-                    node_list.append({'grp': grp, 'node_num': 1, 'id': f'{line[DATACOLS.DB.value]}:{line[DATACOLS.DB_Object_ID.value]}', 'name': f'{line[DATACOLS.DB_Object_Symbol.value]}', 'category': f'{default_category}', 'equivalent_identifiers': f'{default_identifier}'})
+    @staticmethod
+    def write_record(out_f: TextIOBase, record: str, record_count: int, output_mode: str):
+        """
+        writes a node or edge record to a KGX file with the separator that goes before it
 
-                    # create node type 3
-                    """ A node for the GO term GO:0004518. It should normalize, telling us the type/name. """
-                    node_list.append({'grp': grp, 'node_num': 3, 'id': f'{line[DATACOLS.GO_ID.value]}', 'name': '', 'category': '', 'equivalent_identifiers': ''})
-                except Exception as e:
-                    self.logger.error(f'Error: Exception: {e}')
+        :param out_f: the node or edge file
+        :param record: the formatted node or edge
+        :param record_count: the number of records written to the file including this one
+        :param output_mode: the output mode (tsv or json)
+        :return:
+        """
+        # the first record has no separator
+        if record_count > 1:
+            if output_mode == 'json':
+                out_f.write(',\n')
+            else:
+                out_f.write('\n')
 
-        # return the list to the caller
-        return node_list
+        # write out the record
+        out_f.write(record)
 
 
 if __name__ == '__main__':
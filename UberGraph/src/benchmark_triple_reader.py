@@ -0,0 +1,72 @@
+import os
+import time
+import argparse
+from rdflib import Graph
+from Common.triple_reader import TripleReader, CurieConverter
+from Common.utils import LoggingUtil
+from pathlib import Path
+
+# create a logger
+logger = LoggingUtil.init_logging("Data_services.UberGraph.benchmark_triple_reader", line_format='medium', log_file_path=os.path.join(Path(__file__).parents[2], 'logs'))
+
+
+if __name__ == '__main__':
+    # create a command line parser
+    ap = argparse.ArgumentParser(description='Compare the UberGraph triple parsing rate of the rdflib graph and the line parser.')
+
+    # command line should be like: python benchmark_triple_reader.py -f ../../tests/resources/ubergraph_test.ttl -c 20000
+    ap.add_argument('-f', '--sample_file', required=False, default=os.path.join(Path(__file__).parents[2], 'tests', 'resources', 'ubergraph_test.ttl'), help='The file of sample triples')
+    ap.add_argument('-c', '--triple_count', required=False, type=int, default=20000, help='The number of triples to parse')
+    ap.add_argument('-s', '--subject_count', required=False, type=int, default=500, help='The number of distinct subjects in the triples')
+
+    # parse the arguments
+    args = vars(ap.parse_args())
+
+    # get the sample triples
+    with open(args['sample_file'], 'r') as fp:
+        sample_lines: list = fp.readlines()
+
+    # create the triples over a set of distinct subjects so the terms recur like they do in UberGraph
+    lines: list = [sample_lines[idx % len(sample_lines)].replace('0011150', f'{idx % args["subject_count"]:07}') for idx in range(args['triple_count'])]
+
+    # the rdflib graph with two qname lookups per term
+    graph_start: float = time.perf_counter()
+
+    g: Graph = Graph().parse(data=''.join(lines), format='turtle')
+
+    graph_triples: list = []
+
+    for t in g.triples((None, None, None)):
+        triple: list = []
+
+        for n in t:
+            val: str = g.compute_qname(n)[2]
+
+            if not val.islower():
+                val = g.compute_qname(n)[2].replace('_', ':')
+
+            triple.append(val)
+
+        graph_triples.append(tuple(triple))
+
+    # the line parser without the cached conversions
+    uncached_start: float = time.perf_counter()
+
+    tr = TripleReader()
+    tr.get_curie = CurieConverter().convert
+
+    uncached_triples: list = list(tr.read(iter(lines)))
+
+    # the line parser with the shared cached conversions
+    cached_start: float = time.perf_counter()
+
+    cached_triples: list = list(TripleReader().read(iter(lines)))
+
+    cached_end: float = time.perf_counter()
+
+    logger.info(f'UberGraph triples/sec. rdflib graph: {len(lines) / (uncached_start - graph_start):.0f}, '
+                f'line parser: {len(lines) / (cached_start - uncached_start):.0f}, line parser with cached CURIEs: {len(lines) / (cached_end - cached_start):.0f}')
+
+    # all the ways must get the same triples
+    if cached_triples != uncached_triples or set(cached_triples) != set(graph_triples):
+        logger.error('Error: The parsers did not get the same triples.')
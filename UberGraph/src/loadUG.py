@@ -1,18 +1,43 @@
 import os
 import hashlib
 import argparse
-import pandas as pd
 import logging
 import json
 import time
 
 from datetime import datetime
-from rdflib import Graph
-from operator import itemgetter
-from Common.utils import LoggingUtil, NodeNormUtils, DatasetDescription, EdgeNormUtils, GetData
+from multiprocessing import Pool
+from Common.utils import LoggingUtil, NodeNormUtils, DatasetDescription, EdgeNormUtils, GetData, SpillDedupWriter
+from Common.triple_reader import TripleReader
 from pathlib import Path
 
 
+# the loader used by the UberGraph chunk parsing worker processes
+_worker_loader = None
+
+
+def _init_ug_worker(log_level):
+    """
+    creates the loader that parses UberGraph file chunks in each worker process
+
+    :param log_level: the log level of the loader
+    :return:
+    """
+    global _worker_loader
+
+    _worker_loader = UGLoader(log_level)
+
+
+def _parse_chunk_worker(chunk_args: tuple) -> dict:
+    """
+    parses a UberGraph file chunk in a worker process
+
+    :param chunk_args: the arguments of UGLoader.parse_chunk
+    :return: the chunk results
+    """
+    return _worker_loader.parse_chunk(*chunk_args)
+
+
 ##############
 # Class: UberGraph data loader
 #
@@ -33,9 +58,8 @@ class UGLoader:
     total_nodes: int = 0
     total_edges: int = 0
 
-    # lists for the output data
-    final_node_set: set = set()
-    final_edge_set: set = set()
+    # the number of bytes of the data file each worker process parses at a time
+    chunk_size: int = 64 * 1024 * 1024
 
     def get_name(self):
         """
@@ -53,16 +77,30 @@ class UGLoader:
         # create a logger
         self.logger = LoggingUtil.init_logging("Data_services.UberGraph.UGLoader", level=log_level, line_format='medium', log_file_path=os.path.join(Path(__file__).parents[2], 'logs'))
 
+        # lookup of the normalized node for each curie in the data, None if it failed to normalize
+        self.normalized_nodes: dict = {}
+
+        # lookup of the normalized edge details for each relation in the data
+        self.normalized_edges: dict = {}
+
+        # the de-duplicating writers of the output nodes and edges, created for each file parsed
+        self.final_nodes = None
+        self.final_edges = None
+
+        # the ids of the nodes already saved to the node writer
+        self.written_node_ids: set = set()
+
     # init the node and edge data arrays
-    def load(self, data_file_path: str, data_file_names: str, output_mode: str = 'json', file_size: int = 150000, test_mode: bool = False):
+    def load(self, data_file_path: str, data_file_names: str, output_mode: str = 'json', file_size: int = 150000, test_mode: bool = False, workers: int = 1):
         """
         Loads/parsers the UberGraph data file to produce node/edge KGX files for importation into a graph database.
 
         :param data_file_path: the directory that will contain the UberGraph data file
         :param data_file_names: The input file name.
         :param output_mode: the output mode (tsv or json)
-        :param file_size: the threshold data count to initiate writing data out
+        :param file_size: the number of triples normalized and written out at a time
         :param test_mode: sets the usage of using a test data file
+        :param workers: the number of file chunk parsing processes
         :return: None
         """
         self.logger.info(f'UGLoader - Start of UberGraph data processing.')
@@ -89,318 +127,455 @@ class UGLoader:
                     out_node_f.write(f'id\tname\tcategory\tequivalent_identifiers\n')
                     out_edge_f.write(f'id\tpredicate\tsubject\trelation\tedge_label\tobject\tsource_database\n')
 
-                self.logger.info(f'Splitting UberGraph data file: {file_name}. {file_size} records per file + remainder')
+                self.logger.info(f'Parsing UberGraph data file: {file_name}. {file_size} triples per block')
 
                 # parse the data
-                split_files = self.parse_data_file(data_file_path, file_name, out_node_f, out_edge_f, output_mode, file_size)
+                self.parse_data_file(data_file_path, file_name, out_node_f, out_edge_f, output_mode, file_size, workers)
 
             # do not remove the file if in debug mode
             if self.logger.level != logging.DEBUG and not test_mode:
                 # remove the data file
                 os.remove(os.path.join(data_file_path, file_name))
 
-                # remove all the intermediate files
-                for file in split_files:
-                    os.remove(file)
-
         self.logger.info(f'UGLoader - Processing complete.')
 
-    def parse_data_file(self, data_file_path: str, data_file_name: str, out_node_f, out_edge_f, output_mode: str, block_size: int) -> list:
+    def parse_data_file(self, data_file_path: str, data_file_name: str, out_node_f, out_edge_f, output_mode: str, block_size: int, workers: int = 1):
         """
         Parses the data file for graph nodes/edges and writes them out the KGX tsv files.
 
+        the triples are streamed out of the file a line at a time and processed in blocks. with more than one
+        worker the file is cut into chunks that are parsed in parallel and the chunk results are merged.
+
         :param data_file_path: the path to the UberGraph data file
         :param data_file_name: the name of the UberGraph file
         :param out_edge_f: the edge file pointer
         :param out_node_f: the node file pointer
         :param output_mode: the output mode (tsv or json)
-        :param block_size: the threshold data count to initiate writing data out
-        :return: split_files: the temporary files created of the input file
+        :param block_size: the number of triples normalized and written out at a time
+        :param workers: the number of file chunk parsing processes
+        :return: None
         """
 
         # get a reference to the data handler object
         gd = GetData(self.logger.level)
 
-        # storage for the nodes and edges
-        node_list: list = []
-        edge_list: list = []
+        # are we parsing in parallel
+        if workers > 1:
+            # get the chunks of the file
+            chunks: list = self.get_file_chunks(os.path.join(data_file_path, data_file_name), self.chunk_size)
+
+            self.logger.debug(f'Parsing {len(chunks)} chunk(s) of {data_file_name} with {workers} workers.')
+
+            # create the pool of chunk parsers
+            pool: Pool = Pool(workers, initializer=_init_ug_worker, initargs=(self.logger.level,))
+
+            try:
+                # parse the chunks. the results come back in chunk order
+                chunk_results: list = pool.map(_parse_chunk_worker, [(data_file_path, data_file_name, chunk_idx, start, end, output_mode, block_size) for chunk_idx, (start, end) in enumerate(chunks)], chunksize=1)
+            finally:
+                # shut down the pool
+                pool.terminate()
+                pool.join()
+
+            # save the failures
+            for chunk_result in chunk_results:
+                self.node_norm_failures.extend(chunk_result['node_norm_failures'])
+                self.edge_norm_failures.extend(chunk_result['edge_norm_failures'])
+
+            # merge the chunk results into the output files
+            self.total_nodes = self.merge_shards([chunk_result['node_shard'] for chunk_result in chunk_results], out_node_f, output_mode)
+            self.total_edges = self.merge_shards([chunk_result['edge_shard'] for chunk_result in chunk_results], out_edge_f, output_mode)
+        else:
+            # create the writers that de-duplicate the nodes and edges on disk
+            self.create_writers(data_file_path)
 
-        # init a list for the output data
-        triple: list = []
+            try:
+                with open(os.path.join(data_file_path, data_file_name), 'r', encoding='utf-8') as fp:
+                    # parse the triples
+                    self.parse_triples(fp, output_mode, 'UberGraph ' + data_file_name.split('.')[0], block_size)
 
-        # split the file into pieces
-        split_files: list = gd.split_file(data_file_path, data_file_name, block_size)
+                # write out the node and edge data
+                self.total_nodes = self.final_nodes.write(out_node_f, output_mode)
+                self.total_edges = self.final_edges.write(out_edge_f, output_mode)
+            finally:
+                # remove any temp files
+                self.close_writers()
 
-        # parse each file
-        for file in split_files:
-            self.logger.info(f'Working file: {file}')
+        # finish off the json if we have to
+        if output_mode == 'json':
+            out_node_f.write('\n]}')
+            out_edge_f.write('\n]}')
 
-            # get a time stamp
-            tm_start = time.time()
+        # output the failures
+        gd.format_normalization_failures(self.get_name(), self.node_norm_failures, self.edge_norm_failures)
 
-            # get the biolink json-ld data
-            g: Graph = gd.get_biolink_graph(file)
+        # create the dataset KGX node data
+        # self.get_dataset_provenance(data_file_path, data_prov)
 
-            # get the triples
-            g_t = g.triples((None, None, None))
+    def parse_triples(self, lines, output_mode: str, data_source_name: str, block_size: int) -> int:
+        """
+        Parses the triples in the lines passed and saves their nodes and edges in the node and edge writers.
 
-            # for every triple in the input data
-            for t in g_t:
-                # clear before use
-                triple.clear()
+        :param lines: iterator of text lines
+        :param output_mode: the output mode (tsv or json)
+        :param data_source_name: the name of the source file
+        :param block_size: the number of triples normalized and written out at a time
+        :return: the number of triples parsed
+        """
 
-                # get the curie for each element in the triple
-                for n in t:
-                    try:
-                        # get the value
-                        val: str = g.compute_qname(n)[2]
+        # get a reference to the triple reader
+        tr = TripleReader(log_level=self.logger.level)
 
-                        # if string is all lower it is not a curie
-                        if not val.islower():
-                            # replace the underscores to create a curie
-                            val = g.compute_qname(n)[2].replace('_', ':')
-                    except Exception as e:
-                        # save it anyway
-                        val = n
-                        self.logger.warning(f'Exception parsing RDF qname {val}. {e}')
+        # storage for a block of triples
+        triples: list = []
 
-                    # add it to the group
-                    triple.append(val)
+        # init the triple counters
+        triple_count: int = 0
+        block_count: int = 0
 
-                # create the grouping
-                grp: str = '/'.join(triple)
+        # get a time stamp
+        tm_start = time.time()
 
-                # create the nodes
-                node_list.append({'grp': f'{grp}', 'node_num': 1, 'id': f'{triple[0]}', 'name': f'{triple[0]}', 'category': '', 'equivalent_identifiers': ''})
-                edge_list.append({'grp': f'{grp}', 'predicate': f'{triple[1]}', 'relation': f'{triple[1]}', 'edge_label': f'{triple[1]}'})
-                node_list.append({'grp': f'{grp}', 'node_num': 2, 'id': f'{triple[2]}', 'name': f'{triple[2]}', 'category': '', 'equivalent_identifiers': ''})
+        # for every triple in the input data
+        for triple in tr.read(lines):
+            # save the triple
+            triples.append(triple)
 
-            # write out the data for this file
-            self.write_out_data(node_list, edge_list, output_mode, 'UberGraph ' + data_file_name.split('.')[0])
+            # increment the triple counter
+            triple_count += 1
 
-            self.logger.debug(f'Loading complete for file {file.split(".")[2]} of {len(split_files)} in {round(time.time() - tm_start, 0)} seconds.')
+            # did we hit the write threshold
+            if triple_count % block_size == 0:
+                # write out the data for this block
+                self.write_triples(triples, output_mode, data_source_name)
 
-        # write out the node data
-        if output_mode == 'json':
-            out_node_f.write(',\n'.join(self.final_node_set))
-        else:
-            out_node_f.write('\n'.join(self.final_node_set))
+                block_count += 1
 
-        # write out the edge data
-        if output_mode == 'json':
-            out_edge_f.write(',\n'.join(self.final_edge_set))
-        else:
-            out_edge_f.write('\n'.join(self.final_edge_set))
+                self.logger.debug(f'Loading complete for block {block_count} ({triple_count} triples) in {round(time.time() - tm_start, 0)} seconds.')
 
-        # finish off the json if we have to
-        if output_mode == 'json':
-            out_node_f.write('\n]}')
-            out_edge_f.write('\n]}')
+                # get a time stamp
+                tm_start = time.time()
 
-        # output the failures
-        gd.format_normalization_failures(self.get_name(), self.node_norm_failures, self.edge_norm_failures)
+        # write out the remainder
+        if len(triples) > 0:
+            self.write_triples(triples, output_mode, data_source_name)
 
-        # create the dataset KGX node data
-        # self.get_dataset_provenance(data_file_path, data_prov)
+        self.logger.debug(f'{triple_count} triples parsed.')
 
-        # return the split file names so they can be removed if desired
-        return split_files
+        # return to the caller
+        return triple_count
 
-    def write_out_data(self, node_list: list, edge_list: list, output_mode: str, data_source_name: str):
+    def parse_chunk(self, data_file_path: str, data_file_name: str, chunk_idx: int, start: int, end: int, output_mode: str, block_size: int) -> dict:
         """
-        writes out the data collected from the UberGraph file node list to KGX node and edge files
+        Parses a chunk of the data file and writes its distinct nodes and edges to sorted shard files.
 
-        :param node_list: the list of nodes create edges and to write out to file
-        :param edge_list: the list of edge relations by group name
+        :param data_file_path: the path to the UberGraph data file
+        :param data_file_name: the name of the UberGraph file
+        :param chunk_idx: the number of the chunk
+        :param start: the file offset of the first line in the chunk
+        :param end: the file offset of the end of the chunk
         :param output_mode: the output mode (tsv or json)
-        :param data_source_name: the name of the source file
-        :return: Nothing
+        :param block_size: the number of triples normalized and written out at a time
+        :return: dict of the shard file paths and the normalization failures
         """
+        # start this chunk with empty results, the normalization caches are kept for the next chunk
+        self.node_norm_failures = []
+        self.edge_norm_failures = []
 
-        # get a reference to the node and edge normalization classes
-        en = EdgeNormUtils(self.logger.level)
-        nn = NodeNormUtils(self.logger.level)
+        # get the data file path
+        file_path: str = os.path.join(data_file_path, data_file_name)
 
-        self.logger.debug(f'Normalizing data.')
+        # init the return
+        ret_val: dict = {'node_shard': f'{file_path}.{chunk_idx}.nodes.shard', 'edge_shard': f'{file_path}.{chunk_idx}.edges.shard',
+                         'node_norm_failures': self.node_norm_failures, 'edge_norm_failures': self.edge_norm_failures}
 
-        # normalize the nodes
-        failures: list = nn.normalize_node_data(node_list, self.cached_node_norms, block_size=2900)
+        # create the writers that de-duplicate the nodes and edges on disk
+        self.create_writers(data_file_path)
 
-        # save the node failures
-        self.node_norm_failures.extend(failures)
+        try:
+            # parse the triples in the chunk
+            triple_count: int = self.parse_triples(self.read_chunk_lines(file_path, start, end), output_mode, 'UberGraph ' + data_file_name.split('.')[0], block_size)
 
-        # normalize the edges
-        failures: list = en.normalize_edge_data(edge_list, self.cached_edge_norms, block_size=1000)
+            # write out the distinct records. they come out in the same order every time so the merge does too
+            for shard_file, writer in ((ret_val['node_shard'], self.final_nodes), (ret_val['edge_shard'], self.final_edges)):
+                with open(shard_file, 'w', encoding='utf-8') as fp:
+                    fp.writelines(f'{record}\n' for record in writer)
+        finally:
+            # remove any temp files
+            self.close_writers()
 
-        # save the edge failures
-        self.edge_norm_failures.extend(failures)
+        self.logger.debug(f'Chunk {chunk_idx} of {data_file_name}: {triple_count} triples.')
 
-        self.logger.debug('Writing out data...')
+        # return to the caller
+        return ret_val
 
-        # write out the edges. nodes that have edges will be returned
-        new_node_list: list = self.write_edge_data(node_list, edge_list, output_mode, data_source_name)
+    @staticmethod
+    def get_file_chunks(file_path: str, chunk_size: int) -> list:
+        """
+        cuts a file into chunks of about chunk_size bytes that end on a line boundary
 
-        # create a data frame with the node list
-        df_nodes: pd.DataFrame = pd.DataFrame(new_node_list, columns=['grp', 'node_num', 'id', 'name', 'category', 'equivalent_identifiers'])
+        :param file_path: the path to the file
+        :param chunk_size: the target number of bytes per chunk
+        :return: list of (start offset, end offset) tuples
+        """
+        # init the return
+        chunks: list = []
 
-        # reshape the data frame and remove all node duplicates.
-        new_df: pd.DataFrame = df_nodes.drop(['grp', 'node_num'], axis=1)
-        new_df.drop_duplicates(keep='first', inplace=True)
+        # get the file size
+        file_size: int = os.path.getsize(file_path)
 
-        self.logger.debug(f'{len(new_df.index)} nodes found.')
+        # init the start of the first chunk
+        start: int = 0
 
-        # write out the unique nodes
-        for item in new_df.iterrows():
-            if output_mode == 'json':
-                # turn these into json
-                category: str = json.dumps(item[1]['category'].split('|'))
-                identifiers: str = json.dumps(item[1]['equivalent_identifiers'].split('|'))
-                name: str = item[1]["name"].replace('"', '\\"')
+        with open(file_path, 'rb') as fp:
+            # until the whole file is covered
+            while start < file_size:
+                # go to the target end of the chunk
+                fp.seek(min(start + chunk_size, file_size))
 
-                # output the node
-                node: str = f'{{"id":"{item[1]["id"]}","name":"{name}","category":{category},"equivalent_identifiers":{identifiers}}}'
-            else:
-                node: str = f"{item[1]['id']}\t{item[1]['name']}\t{item[1]['category']}\t{item[1]['equivalent_identifiers']}"
+                # move the end to the start of the next line
+                fp.readline()
+                end: int = min(fp.tell(), file_size)
 
-            # save the node text
-            self.final_node_set.add(node)
+                # save the chunk
+                chunks.append((start, end))
 
-            # increment the total node counter
-            self.total_nodes += 1
+                # the next chunk starts where this one ended
+                start = end
 
-        # clear out for the next load
-        node_list.clear()
-        edge_list.clear()
+        # return to the caller
+        return chunks
 
-        self.logger.debug('Writing out to data file complete.')
+    @staticmethod
+    def read_chunk_lines(file_path: str, start: int, end: int):
+        """
+        gets the lines of a file chunk
 
-    def write_edge_data(self, node_list: list, edge_list: list, output_mode: str, data_source_name: str) -> list:
+        :param file_path: the path to the file
+        :param start: the file offset of the first line in the chunk
+        :param end: the file offset of the end of the chunk
+        :return: iterator of the text lines in the chunk
         """
-        writes edges for the node list passed
+        with open(file_path, 'rb') as fp:
+            # go to the start of the chunk
+            fp.seek(start)
+
+            # init the position in the file
+            position: int = start
+
+            # until the end of the chunk
+            while position < end:
+                # get the line
+                line: bytes = fp.readline()
+
+                # did we run out of data
+                if not line:
+                    break
+
+                # keep track of the position
+                position += len(line)
+
+                # return the line
+                yield line.decode('utf-8')
 
-        :param node_list: list of node groups
-        :param edge_list: list of edge relations by group
+    @staticmethod
+    def merge_shards(shard_files: list, out_f, output_mode: str) -> int:
+        """
+        writes out the distinct records of the shard files in order and removes the shard files
+
+        :param shard_files: the list of shard file paths
+        :param out_f: the output file pointer
+        :param output_mode: the output mode (tsv or json)
+        :return: the number of records written
+        """
+        # nothing to merge
+        if len(shard_files) == 0:
+            return 0
+
+        # create a writer that de-duplicates the records on disk
+        merged: SpillDedupWriter = SpillDedupWriter(os.path.dirname(shard_files[0]))
+
+        try:
+            # for each shard
+            for shard_file in shard_files:
+                with open(shard_file, 'r', encoding='utf-8') as fp:
+                    for line in fp:
+                        # save the record
+                        merged.add(line[:-1])
+
+                # remove the shard
+                os.remove(shard_file)
+
+            # write out the distinct records
+            return merged.write(out_f, output_mode)
+        finally:
+            # remove any temp files
+            merged.close()
+
+    def create_writers(self, temp_dir: str):
+        """
+        creates the writers that de-duplicate the nodes and edges on disk
+
+        :param temp_dir: the directory for the temp files
+        :return:
+        """
+        self.final_nodes = SpillDedupWriter(temp_dir)
+        self.final_edges = SpillDedupWriter(temp_dir)
+
+        # no nodes written yet
+        self.written_node_ids.clear()
+
+    def close_writers(self):
+        """
+        closes the node and edge writers and removes their temp files
+
+        :return:
+        """
+        for writer in (self.final_nodes, self.final_edges):
+            if writer is not None:
+                writer.close()
+
+        self.final_nodes = None
+        self.final_edges = None
+
+        # no longer needed
+        self.written_node_ids.clear()
+
+    def write_triples(self, triples: list, output_mode: str, data_source_name: str):
+        """
+        normalizes a block of triples and saves an edge and its nodes for each one in the node and edge writers
+
+        :param triples: the list of (subject, predicate, object) tuples. it is cleared when done
         :param output_mode: the output mode (tsv or json)
         :param data_source_name: the name of the source file
         :return: Nothing
         """
 
-        self.logger.debug(f'Creating edges for {len(node_list)} nodes.')
+        self.logger.debug(f'Normalizing data.')
 
-        # init group detection variables
-        cur_grp_name: str = ''
-        first: bool = True
-        node_idx: int = 0
-        grp_list: list = []
+        # normalize the curies and relations not seen before
+        self.normalize_curies({curie for triple in triples for curie in (triple[0], triple[2]) if curie not in self.normalized_nodes})
+        self.normalize_relations({triple[1] for triple in triples if triple[1] not in self.normalized_edges})
 
-        # init the new node list to be returned
-        new_node_list: list = []
+        self.logger.debug('Writing out data...')
 
-        # convert the edge list into a dataframe for faster searching
-        df_edges: pd.DataFrame = pd.DataFrame(edge_list, columns=['grp', 'predicate', 'relation', 'edge_label'])
-        df_edges.set_index(keys=['grp'], inplace=True)
+        # for each triple
+        for subject_id, relation, object_id in triples:
+            # get the normalized nodes and edge details
+            source_node: dict = self.normalized_nodes[subject_id]
+            object_node: dict = self.normalized_nodes[object_id]
+            edge_type: dict = self.normalized_edges[relation]
 
-        # sort the list of interactions in the experiment group
-        sorted_nodes: list = sorted(node_list, key=itemgetter('grp'))
+            # did we get everything
+            if source_node is not None and object_node is not None and relation != '':
+                # save the edge and its nodes
+                self.write_edge(source_node, edge_type, object_node, output_mode, data_source_name)
+                self.write_node(source_node, output_mode)
+                self.write_node(object_node, output_mode)
+            else:
+                self.logger.debug(f'Node or edge relationship missing: ({subject_id})-[{relation}]-({object_id})')
 
-        # get the number of records in this sorted experiment group
-        node_count: int = len(sorted_nodes)
+        # clear out for the next load
+        triples.clear()
 
-        # iterate through node groups and create the edge records.
-        while node_idx < node_count:
-            # if its the first time in prime the pump
-            if first:
-                # save the interaction name
-                cur_grp_name = sorted_nodes[node_idx]['grp']
+        self.logger.debug('Writing out to data file complete.')
 
-                # reset the first record flag
-                first = False
+    def write_edge(self, source_node: dict, edge_type: dict, object_node: dict, output_mode: str, data_source_name: str):
+        """
+        saves an edge in the edge writer
 
-            # init the list that will contain the node groups
-            grp_list.clear()
+        :param source_node: the normalized subject node
+        :param edge_type: the normalized predicate, relation and edge label
+        :param object_node: the normalized object node
+        :param output_mode: the output mode (tsv or json)
+        :param data_source_name: the name of the source file
+        :return: Nothing
+        """
+        # create the record ID
+        record_id: str = source_node['id'] + edge_type['relation'] + object_node['id']
 
-            # for each entry member in the group
-            while sorted_nodes[node_idx]['grp'] == cur_grp_name:
-                # add the dict to the group
-                grp_list.append(sorted_nodes[node_idx])
+        # format the edge
+        if output_mode == 'json':
+            edge: str = f'{{"id":"{hashlib.md5(record_id.encode("utf-8")).hexdigest()}","predicate":"{edge_type["predicate"]}","subject":"{source_node["id"]}","relation":"{edge_type["relation"]}","object":"{object_node["id"]}","edge_label":"{edge_type["edge_label"]}","source_database":"{data_source_name}"}}'
+        else:
+            edge: str = f'{hashlib.md5(record_id.encode("utf-8")).hexdigest()}\t{edge_type["predicate"]}\t{source_node["id"]}\t{edge_type["relation"]}\t{edge_type["edge_label"]}\t{object_node["id"]}\t{data_source_name}'
 
-                # increment the node counter pairing
-                node_idx += 1
+        # save the edge, duplicates are dropped when the edges are written out
+        self.final_edges.add(edge)
 
-                # insure we dont overrun the list
-                if node_idx >= node_count:
-                    break
+    def write_node(self, node: dict, output_mode: str):
+        """
+        saves a node in the node writer if it has not been saved already
 
-            # if we didnt get a pair then we cant create an edge
-            if len(grp_list) > 2:
-                self.logger.info(f'Nodes in group > 2 {cur_grp_name}')
-            elif len(grp_list) < 2:
-                # insure we dont overrun the list
-                if node_idx >= node_count:
-                    break
+        :param node: the normalized node
+        :param output_mode: the output mode (tsv or json)
+        :return: Nothing
+        """
+        # skip the node if it was already saved
+        if node['id'] in self.written_node_ids:
+            return
 
-                # save the next interaction name
-                cur_grp_name = sorted_nodes[node_idx]['grp']
+        self.written_node_ids.add(node['id'])
 
-                continue
+        # format the node
+        if output_mode == 'json':
+            # turn these into json
+            category: str = json.dumps(node['category'].split('|'))
+            identifiers: str = json.dumps(node['equivalent_identifiers'].split('|'))
+            name: str = node["name"].replace('"', '\\"')
 
-            # init the group index counter
-            grp_idx: int = 0
+            # output the node
+            record: str = f'{{"id":"{node["id"]}","name":"{name}","category":{category},"equivalent_identifiers":{identifiers}}}'
+        else:
+            record: str = f"{node['id']}\t{node['name']}\t{node['category']}\t{node['equivalent_identifiers']}"
 
-            # init the source and object ids
-            source_node: dict = {}
-            object_node: dict = {}
+        # save the node
+        self.final_nodes.add(record)
 
-            # get the predicate, relation and label using the group name
-            edge_relation = df_edges.loc[cur_grp_name].relation
-            edge_label = df_edges.loc[cur_grp_name].edge_label
-            edge_predicate = df_edges.loc[cur_grp_name].predicate
+    def normalize_curies(self, curies: set):
+        """
+        calls the NodeNormalization web service to get the normalized node for each curie passed.
+        the results are saved in the normalized nodes lookup.
 
-            # now that we have a group create the edges
-            while grp_idx < len(grp_list):
-                if grp_list[grp_idx]['node_num'] == 1:
-                    # get the source node id
-                    source_node = grp_list[grp_idx]
-                elif grp_list[grp_idx]['node_num'] == 2:
-                    # get the object node id
-                    object_node = grp_list[grp_idx]
-                else:
-                    self.logger.error(f'Unknown node number: {grp_list[grp_idx]["node_num"]}')
+        :param curies: the set of curies to normalize
+        :return:
+        """
+        # anything to do
+        if len(curies) == 0:
+            return
 
-                # goto the next node in the group
-                grp_idx += 1
+        self.logger.debug(f'{len(curies)} unique nodes will be normalized.')
 
-            # did we get everything
-            if len(source_node) > 0 and len(object_node) > 0 and edge_relation != '':
-                # add the nodes to the new node list
-                new_node_list.append(source_node)
-                new_node_list.append(object_node)
+        # create the nodes to normalize, keyed by the curie in the data
+        nodes: dict = {curie: {'id': curie, 'name': curie, 'category': '', 'equivalent_identifiers': ''} for curie in curies}
 
-                # create the record ID
-                record_id: str = source_node['id'] + edge_relation + object_node['id']
+        # normalize the nodes. this updates the nodes in place
+        self.node_norm_failures.extend(NodeNormUtils(self.logger.level).normalize_node_data(list(nodes.values()), self.cached_node_norms, block_size=2900))
 
-                # write out the edge
-                if output_mode == 'json':
-                    self.final_edge_set.add(f'{{"id":"{hashlib.md5(record_id.encode("utf-8")).hexdigest()}","predicate":"{edge_predicate}","subject":"{source_node["id"]}","relation":"{edge_relation}","object":"{object_node["id"]}","edge_label":"{edge_label}","source_database":"{data_source_name}"}}')
-                else:
-                    self.final_edge_set.add(f'{hashlib.md5(record_id.encode("utf-8")).hexdigest()}\t{edge_predicate}\t{source_node["id"]}\t{edge_relation}\t{edge_label}\t{object_node["id"]}\t{data_source_name}')
+        # save the nodes. the ones that dont have a category cant have an edge
+        for curie, node in nodes.items():
+            self.normalized_nodes[curie] = node if node['category'] != '' else None
 
-                # increment the edge count
-                self.total_edges += 1
-            else:
-                self.logger.debug(f'Node or edge relationship missing: {cur_grp_name}. ({source_node["id"]})-[{edge_relation}]-({object_node["id"]})')
+    def normalize_relations(self, relations: set):
+        """
+        calls the EdgeNormalization web service to get the normalized predicate and label for each relation passed.
+        the results are saved in the normalized edges lookup.
 
-            # insure we dont overrun the list
-            if node_idx >= node_count:
-                break
+        :param relations: the set of relations to normalize
+        :return:
+        """
+        # anything to do
+        if len(relations) == 0:
+            return
 
-            # save the next interaction name
-            cur_grp_name = sorted_nodes[node_idx]['grp']
+        # create the edge details to normalize, keyed by the relation in the data
+        edges: dict = {relation: {'predicate': relation, 'relation': relation, 'edge_label': relation} for relation in relations}
 
-        self.logger.debug(f'{node_idx} edges created.')
+        # normalize the edges. this updates the edges in place
+        self.edge_norm_failures.extend(EdgeNormUtils(self.logger.level).normalize_edge_data(list(edges.values()), self.cached_edge_norms, block_size=1000))
 
-        # return the new node list to the caller
-        return new_node_list
+        # save the edge details
+        self.normalized_edges.update(edges)
 
     @staticmethod
     def get_dataset_provenance(data_path: str, data_prov: list, file_name: str):
@@ -441,6 +616,7 @@ if __name__ == '__main__':
     ap.add_argument('-u', '--data_dir', required=True, help='The UberGraph data file directory.')
     ap.add_argument('-s', '--data_file', required=True, help='Comma separated UberGraph data file(s) to parse.')
     ap.add_argument('-m', '--out_mode', required=True, help='The output file mode (tsv or json)')
+    ap.add_argument('-w', '--workers', required=False, type=int, default=1, help='The number of file chunk parsing processes')
 
     # parse the arguments
     args = vars(ap.parse_args())
@@ -456,4 +632,4 @@ if __name__ == '__main__':
     ug = UGLoader()
 
     # load the data files and create KGX output files
-    ug.load(UG_data_dir, UG_data_file, out_mode, file_size=200000)
+    ug.load(UG_data_dir, UG_data_file, out_mode, file_size=200000, workers=args['workers'])
@@ -1,6 +1,7 @@
 import os
 import argparse
 from ViralProteome.src.loadUniRef import UniRefSimLoader
+from ViralProteome.src.uniref_taxon_index import UniRefTaxonIndex
 from Common.utils import LoggingUtil, GetData
 from pathlib import Path
 
@@ -15,6 +16,7 @@ if __name__ == '__main__':
     # command line should be like: python get_uniref_taxon_targets.py -d /projects/stars/Data_services/UniRef_data -f uniref50,uniref90,uniref100
     ap.add_argument('-d', '--data_dir', required=True, help='The location of the UniRef data files')
     ap.add_argument('-f', '--UniRef_files', required=True, help='Name(s) of input UniRef files (comma delimited)')
+    ap.add_argument('-w', '--workers', required=False, type=int, default=None, help='The number of indexing processes (defaults to the cpu count)')
 
     # parse the arguments
     args = vars(ap.parse_args())
@@ -36,41 +38,23 @@ if __name__ == '__main__':
     # get the list of target taxa
     target_taxa_set: set = gd.get_ncbi_taxon_id_set(uniref_data_dir, UniRefSimLoader().TYPE_VIRUS)
 
-    logger.info('Creating taxon search file.')
-
-    # the path to the file that contains the list of taxa to search for
-    search_file_path = os.path.join(uniref_data_dir, 'taxon_list.txt')
-
-    # write out the list of taxa to search for
-    with open(search_file_path, 'w') as wfp:
-        for item in target_taxa_set:
-            wfp.write(f'<property type="common taxon ID" value="{item}"\n')
-
-    logger.info('Executing dos2unix command.')
-
-    # optional: execute the dos2unix command on the target taxon file to get the line endings correct
-    os.system(f'dos2unix "{search_file_path}."')
+    # get the indexer
+    indexer = UniRefTaxonIndex()
 
     # for each uniref file type
     for file in in_file_list:
         logger.info(f'Working input file: {file}.')
 
         # get the path to the file with taxon indexes
-        index_file_path = os.path.join(uniref_data_dir, f'{file.lower()}_taxon_file_indexes.txt')
+        index_file_path = os.path.join(uniref_data_dir, f'{file.lower()}_taxon_file_indexes.bin')
 
         # get the in and out file paths
         uniref_infile_path: str = os.path.join(uniref_data_dir, f'{file.lower()}.xml')
 
-        logger.info(f'Executing grep command: grep -F -b -f "{search_file_path}" "{uniref_infile_path}" >> "{index_file_path}"')
-
-        # execute the grep command using the target taxon list
-        # Note: you must use the latest version of grep for this to work
-        # grep -F -b -f "/e/Data_services/UniRef_data/taxon_list.txt" "/e/Data_services/UniRef_data/uniref100.xml" >> "/e/Data_services/UniRef_data/uniref100_taxon_file_indexes.txt"
-        # grep -F -b -f "/e/Data_services/UniRef_data/taxon_list.txt" "/e/Data_services/UniRef_data/uniref90.xml" >> "/e/Data_services/UniRef_data/uniref90_taxon_file_indexes.txt"
-        # grep -F -b -f "/e/Data_services/UniRef_data/taxon_list.txt" "/e/Data_services/UniRef_data/uniref50.xml" >> "/e/Data_services/UniRef_data/uniref50_taxon_file_indexes.txt"
-        # os.system(f'grep -F -b -f "{search_file_path}" "{uniref_infile_path}" >> "{index_file_path}"')
+        try:
+            # create the index of virus entry elements
+            entry_count: int = indexer.create_index(uniref_infile_path, index_file_path, target_taxa_set, args['workers'])
 
-    # do not remove the file if in debug mode
-    # if logger.level != logging.DEBUG:
-    #     # remove the original list of taxon ids
-    #     os.remove(search_file_path)
+            logger.info(f'{entry_count} virus entries indexed in {index_file_path}.')
+        except Exception as e:
+            logger.error(f'Error: Indexing {uniref_infile_path} failed. Exception: {e}')
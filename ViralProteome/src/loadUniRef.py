@@ -1,16 +1,104 @@
 import os
+import re
+import mmap
 import argparse
 import hashlib
-import pandas as pd
 import requests
 import json
 import logging
 
 from io import TextIOBase
+from html import unescape
+from itertools import islice
+from collections import deque
+from multiprocessing import Pool
 from xml.etree import ElementTree as ETree
-from Common.utils import LoggingUtil, GetData, EdgeNormUtils
+from Common.utils import LoggingUtil, GetData, EdgeNormUtils, DedupRegistry
+from ViralProteome.src.uniref_taxon_index import UniRefTaxonIndex
 from pathlib import Path
 
+# the order of the node data elements in the compact node tuples
+NODE_COLS: tuple = ('grp', 'node_num', 'id', 'name', 'category', 'equivalent_identifiers', 'similarity_bin')
+
+# the entry id attribute of a UniRef entry element
+ENTRY_ID_RE: re.Pattern = re.compile(rb'<entry id="([^"]*)"')
+
+# the entry elements the entry scanner needs, in the attribute order UniProt writes them: a property (type, value), the start of a member dbReference (id) and the end of a member dbReference
+ENTRY_TOKEN_RE: re.Pattern = re.compile(rb'<property type="([^"]*)" value="([^"]*)"|<dbReference type="[^"]*" id="([^"]*)"|(</dbReference>)')
+
+# the member dbReference property types the entry scanner captures
+MEMBER_PROP_TYPES: frozenset = frozenset({b'UniProtKB accession', b'source organism', b'NCBI taxonomy', b'protein name'})
+
+# the uniref file memory map and target taxa for the entry parsing worker processes
+_worker_uniref_mm = None
+_worker_taxa: set = set()
+
+
+def _init_entry_worker(uniref_infile_path: str, target_taxa: set):
+    """
+    maps the uniref file into memory once in each entry parsing worker process
+
+    :param uniref_infile_path: the path to the uniref XML file
+    :param target_taxa: the set of target virus taxon ids
+    :return:
+    """
+    global _worker_uniref_mm, _worker_taxa
+
+    # the memory map keeps its own reference to the file
+    with open(uniref_infile_path, 'rb') as uniref_fp:
+        _worker_uniref_mm = mmap.mmap(uniref_fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+    _worker_taxa = target_taxa
+
+
+def _parse_entry_block_worker(entry_block: list) -> tuple:
+    """
+    parses a block of entries in a worker process
+
+    :param entry_block: a list of (entry start offset, entry length) tuples
+    :return: the entry count, the compact node tuples of each captured entry and the invalid entry offsets
+    """
+    return parse_entry_block(_worker_uniref_mm, entry_block, _worker_taxa)
+
+
+def parse_entry_block(uniref_mm, entry_block: list, target_taxa: set) -> tuple:
+    """
+    parses a block of entry elements into compact node tuples. the node tuples are returned in entry order.
+
+    :param uniref_mm: the memory map of the uniref file
+    :param entry_block: a list of (entry start offset, entry length) tuples
+    :param target_taxa: the set of target virus taxon ids
+    :return: the entry count, the compact node tuples of each captured entry and the invalid entry offsets
+    """
+    # init the returns
+    entry_nodes: list = []
+    invalid_offsets: list = []
+
+    # init storage for the nodes of an entry
+    node_list: list = []
+
+    # for each entry in the block
+    for entry_offset, entry_length in entry_block:
+        # get the entry element
+        entry_element: bytes = UniRefSimLoader.get_entry_element(entry_offset, entry_length, uniref_mm)
+
+        # did we get something back
+        if entry_element != b'':
+            # scan the entry into nodes
+            UniRefSimLoader.scan_entry_data(entry_element, node_list, target_taxa)
+
+            # save the nodes of a captured entry as compact tuples
+            if node_list:
+                entry_nodes.append(tuple(tuple(node[col] for col in NODE_COLS) for node in node_list))
+
+            # clear out for the next entry
+            node_list.clear()
+        else:
+            invalid_offsets.append(entry_offset)
+
+    # return to the caller
+    return len(entry_block), entry_nodes, invalid_offsets
+
 
 ##############
 # Class: UniRef similarities loader
@@ -31,6 +119,10 @@ class UniRefSimLoader:
     node_norm_failures: list = []
     edge_norm_failures: list = []
 
+    # the number of distinct un-normalized taxa or entries that trigger a normalize and write of the queued entries
+    norm_block_size: int = 2500
+    entry_queue_size: int = 50000
+
     def get_name(self):
         """
         returns the name of the class
@@ -47,7 +139,11 @@ class UniRefSimLoader:
         # create a logger
         self.logger = LoggingUtil.init_logging("Data_services.ViralProteome.UniRefSimLoader", level=log_level, line_format='medium', log_file_path=os.path.join(Path(__file__).parents[2], 'logs'))
 
-    def load(self, data_dir: str, in_file_names: list, taxon_index_file: str, output_mode: str = 'json', test_mode: bool = False):
+        # registries of the node and edge ids written to the current KGX files
+        self.written_nodes: DedupRegistry = DedupRegistry()
+        self.written_edges: DedupRegistry = DedupRegistry()
+
+    def load(self, data_dir: str, in_file_names: list, taxon_index_file: str, output_mode: str = 'json', test_mode: bool = False, workers: int = 1):
         """
         parses the UniRef data files gathered from ftp://ftp.uniprot.org/pub/databases/uniprot/uniref/ to
         create standard KGX files to import thr data into a graph database
@@ -57,6 +153,7 @@ class UniRefSimLoader:
         :param taxon_index_file: the list of UniRef virus file indexes
         :param output_mode: the output mode (tsv or json)
         :param test_mode: debug mode flag to indicate use of smaller input files
+        :param workers: the number of entry parsing processes
         :return
         """
 
@@ -94,18 +191,23 @@ class UniRefSimLoader:
                     full_file = f + '.xml'
 
                 # read the file and make the list
-                self.parse_data_file(os.path.join(data_dir, full_file), os.path.join(data_dir, f'{f}_{taxon_index_file}'), target_taxon_set, out_node_f, out_edge_f, output_mode)
+                self.parse_data_file(os.path.join(data_dir, full_file), os.path.join(data_dir, f'{f}_{taxon_index_file}'), target_taxon_set, out_node_f, out_edge_f, output_mode, workers)
 
                 self.logger.info(f'UniRefSimLoader - {f} Processing complete.')
 
         # output the normalization failures
         gd.format_normalization_failures(self.get_name(), self.node_norm_failures, self.edge_norm_failures)
 
-    def parse_data_file(self, uniref_infile_path: str, index_file_path: str, target_taxa: set, out_node_f, out_edge_f, output_mode):
+    def parse_data_file(self, uniref_infile_path: str, index_file_path: str, target_taxa: set, out_node_f, out_edge_f, output_mode, workers: int = 1, block_size: int = 5000):
         """
         Parses the data file for graph nodes/edges and writes them to the KGX csv files.
 
-        The parsing uses and entry index file to read the uniref entry data elements on the fly rather.
+        The parsing uses an entry index file of exact entry element locations to read the uniref entry data elements on the fly.
+        When more than 1 worker is requested blocks of index entries are parsed in a process pool. The blocks
+        are returned in index order.
+
+        Parsed entries are queued until enough un-normalized taxa have been seen to make a normalization
+        call worthwhile. The queued entries are then normalized and their nodes and edges written out.
 
         :param uniref_infile_path: the name of the uniref file to process
         :param index_file_path: the name of the uniref entry index file
@@ -113,47 +215,74 @@ class UniRefSimLoader:
         :param out_node_f: the node file pointer
         :param out_edge_f: the edge file pointer
         :param output_mode: the output mode (tsv or json)
-        :return: ret_val: the node list
+        :param workers: the number of entry parsing processes
+        :param block_size: the number of index entries in a parsing block
+        :return:
         """
-        # init the array that will contain nodes to write to KGX files
-        node_list: list = []
+        # init the queue of entry node lists waiting to be normalized and written
+        entry_queue: list = []
+
+        # init the set of queued taxa that have not been normalized yet
+        pending_taxa: set = set()
 
         # uniref entry index counter
         index_counter: int = 0
 
-        self.logger.debug(f'Parsing XML data file start.')
+        # reset the written node and edge registries for this file
+        self.written_nodes.clear()
+        self.written_edges.clear()
 
-        # open the taxon file indexes and the uniref data file
-        with open(index_file_path, 'r') as index_fp, open(uniref_infile_path, 'rb+') as uniref_fp:
-            # for each taxon index
-            for line in index_fp:
-                # increment the node counter
-                index_counter += 1
+        self.logger.debug(f'Parsing XML data file start.')
 
-                # output a status indicator
-                if index_counter % 500000 == 0:
-                    self.logger.debug(f'Completed {index_counter} taxa.')
+        # split the index into blocks of entry locations
+        entry_blocks = self.get_entry_blocks(index_file_path, block_size)
 
-                # start looking a bit before the location grep found
-                taxon_index = int(line.split(':')[0]) - 150
+        # open the uniref data file and map it into memory
+        with open(uniref_infile_path, 'rb') as uniref_fp, mmap.mmap(uniref_fp.fileno(), 0, access=mmap.ACCESS_READ) as uniref_mm:
+            # are we parsing in parallel
+            if workers > 1:
+                # create the pool of entry parsers. the results come back in index order
+                pool: Pool = Pool(workers, initializer=_init_entry_worker, initargs=(uniref_infile_path, target_taxa))
+                block_results = self.get_pool_results(pool, entry_blocks, 2 * workers)
+            else:
+                pool = None
+                block_results = (parse_entry_block(uniref_mm, entry_block, target_taxa) for entry_block in entry_blocks)
 
-                # get the next entry element
-                entry_element: str = self.get_entry_element(taxon_index, uniref_fp)
+            try:
+                # for each block of parsed entries
+                for entry_count, entry_nodes, invalid_offsets in block_results:
+                    # output a status indicator
+                    if (index_counter + entry_count) // 500000 > index_counter // 500000:
+                        self.logger.debug(f'Completed {index_counter + entry_count} taxa.')
 
-                # did we get something back
-                if entry_element != '':
-                    # call to get an entry and enter it into the node list
-                    self.capture_entry_data(entry_element, node_list, target_taxa)
-                else:
-                    self.logger.error(f'Error: Entry node for {line} at line number {index_counter} invalid.')
+                    # increment the node counter
+                    index_counter += entry_count
+
+                    # report anything that went wrong
+                    for entry_offset in invalid_offsets:
+                        self.logger.error(f'Error: Entry node at offset {entry_offset} invalid.')
+
+                    # for each captured entry
+                    for node_tuples in entry_nodes:
+                        # queue up the entry nodes
+                        node_list: list = [dict(zip(NODE_COLS, node)) for node in node_tuples]
+                        entry_queue.append(node_list)
+
+                        # save the taxa that will need a normalization lookup
+                        pending_taxa.update(node['id'] for node in node_list if node['id'].startswith('N') and node['id'] not in self.cached_node_norms)
+
+                        # is it time to normalize and write out the queue
+                        if len(pending_taxa) >= self.norm_block_size or len(entry_queue) >= self.entry_queue_size:
+                            self.write_entry_queue(entry_queue, out_node_f, out_edge_f, output_mode)
+                            pending_taxa.clear()
+            finally:
+                # shut down the pool
+                if pool is not None:
+                    pool.terminate()
+                    pool.join()
 
         # save any remainders
-        if len(node_list) > 0:
-            # normalize the group of entries on the data frame.
-            self.normalize_node_data(node_list)
-
-            # write out what we have
-            self.write_out_data(node_list, out_node_f, out_edge_f, output_mode)
+        self.write_entry_queue(entry_queue, out_node_f, out_edge_f, output_mode)
 
         # finish off the json if we have to
         if output_mode == 'json':
@@ -282,60 +411,87 @@ class UniRefSimLoader:
         return node_list
 
     @staticmethod
-    def get_entry_element(taxon_index: int, uniref_fp) -> str:
+    def get_pool_results(pool: Pool, entry_blocks, window: int) -> iter:
         """
-        Looks for and returns the entry node at the byte location passed
+        gets the parsed entry blocks from the pool in index order.
+
+        only a window of blocks is given to the pool at a time. the next block is only submitted once one
+        is handed back, so parsed blocks do not pile up while the caller is normalizing and writing.
 
-        :param taxon_index: the index into the uniref file to start looking
-        :param uniref_fp:  the file pointer to the uniref file
-        :return: the text of the uniref entry node
+        :param pool: the pool of entry parsers
+        :param entry_blocks: iterator of lists of (entry start offset, entry length) tuples
+        :param window: the number of blocks in the pool at a time
+        :return: iterator of the parsed entry blocks
         """
+        # make sure the blocks are read one after the other
+        entry_blocks = iter(entry_blocks)
 
-        # init the return
-        entry_node_text: str = ''
+        # the blocks given to the pool, oldest first
+        pending: deque = deque(pool.apply_async(_parse_entry_block_worker, (entry_block,)) for entry_block in islice(entry_blocks, window))
 
-        # backup up to 500 characters max to look for the "<entry>" start
-        for i in range(0, 500):
-            # goto the last checked position
-            uniref_fp.seek(taxon_index)
+        # until all the blocks are handed back
+        while pending:
+            # wait for the oldest block
+            block_result: tuple = pending.popleft().get()
 
-            # read 6 characters to see if it is the start of the entry
-            uniref_line = uniref_fp.read(6)
+            # take its place in the window with the next block
+            for entry_block in islice(entry_blocks, 1):
+                pending.append(pool.apply_async(_parse_entry_block_worker, (entry_block,)))
 
-            # did we find the entry start
-            if uniref_line.decode("utf-8") == "<entry":
-                # go back to the start of the 'entry'
-                uniref_fp.seek(taxon_index)
+            # return the parsed block
+            yield block_result
 
-                # start writing out data until we see the end of the entry
-                while True:
-                    # get the line form the uniref file
-                    uniref_line = uniref_fp.readline().decode("utf-8")
+    @staticmethod
+    def get_entry_blocks(index_file_path: str, block_size: int) -> iter:
+        """
+        splits the entry index into blocks of consecutive entry locations
 
-                    # no need to save the DNA sequence data
-                    if uniref_line.startswith('  <seq'):
-                        continue
+        :param index_file_path: the name of the uniref entry index file
+        :param block_size: the number of index entries in a block
+        :return: iterator of lists of (entry start offset, entry length) tuples
+        """
+        # get an iterator over the index
+        index_iter = iter(UniRefTaxonIndex.read_index(index_file_path))
 
-                    # write out the line
-                    entry_node_text += uniref_line
+        while True:
+            # get the next block of entries
+            entry_block: list = list(islice(index_iter, block_size))
 
-                    # did we find the end of the entry
-                    if uniref_line.startswith('</entr'):
-                        break
+            # did we run out of data
+            if not entry_block:
                 break
-            else:
-                # move up a character and recheck
-                taxon_index -= 1
+
+            yield entry_block
+
+    @staticmethod
+    def get_entry_element(entry_offset: int, entry_length: int, uniref_mm) -> bytes:
+        """
+        returns the entry node at the byte location passed
+
+        :param entry_offset: the byte offset of the start of the entry element
+        :param entry_length: the length of the entry element in bytes
+        :param uniref_mm: the memory map of the uniref file
+        :return: the raw text of the uniref entry node
+        """
+
+        # get the entry element in one read
+        entry_node_text: bytes = uniref_mm[entry_offset:entry_offset + entry_length]
+
+        # make sure we were pointed at an entry element
+        if not entry_node_text.startswith(b'<entry') or not entry_node_text.endswith(b'</entry>'):
+            entry_node_text = b''
 
         # return the entry node text to the caller
         return entry_node_text
 
     @staticmethod
-    def capture_entry_data(entry_element: str, node_list: list, in_taxon_set: set):
+    def capture_entry_data(entry_element: bytes, node_list: list, in_taxon_set: set):
         """
         Loads the xml string and parses it to create graph nodes.
 
-        :param entry_element: the text of the XML entry node
+        This builds the full element tree of the entry. scan_entry_data() creates the same nodes much faster.
+
+        :param entry_element: the raw text of the XML entry node
         :param node_list: the main list that will contain all nodes
         :param in_taxon_set: the list of taxa that we are interested in capturing
         :return:
@@ -448,178 +604,284 @@ class UniRefSimLoader:
         # if not virus_capture:
         #     logger.debug(f'{grp} not captured.')
 
-    def write_out_data(self, node_list, out_node_f: TextIOBase, out_edge_f: TextIOBase, output_mode: str):
+    @staticmethod
+    def scan_entry_data(entry_element: bytes, node_list: list, in_taxon_set: set):
         """
-        writes out the data collected from the UniRef file node list to KGX node and edge files
+        Scans the raw xml text of an entry to create graph nodes.
 
-        :param node_list: the list of nodes create edges and to write out to file
-        :param out_node_f: the node file
-        :param out_edge_f: the edge file
-        :param output_mode: the output mode (tsv or json)
+        Only the entry id, the common taxon ID property and the member dbReference properties that become
+        node data are picked out of the entry. Everything else (including the sequence) is passed over.
+        The nodes created are the same as capture_entry_data().
+
+        :param entry_element: the raw text of the XML entry node
+        :param node_list: the main list that will contain all nodes
+        :param in_taxon_set: the list of taxa that we are interested in capturing
         :return:
         """
+        # get the entry id
+        entry_id = ENTRY_ID_RE.match(entry_element)
+
+        # nothing to do if this isn't an entry
+        if entry_id is None:
+            return
 
-        self.logger.debug(f'Loading data frame with {len(node_list)} nodes.')
+        # set the entry name, group id and similarity bin name
+        entry_name = entry_id.group(1).decode('utf-8').replace('_', ':')
+        grp: str = entry_name.split(':')[1]
+        similarity_bin: str = entry_name.split(':')[0]
 
-        # write out the edges
-        self.write_edge_data(out_edge_f, node_list, output_mode)
+        # create local storage for the nodes will conditionally add to main node list later
+        tmp_node_list: list = []
 
-        # create a data frame with the node list
-        df: pd.DataFrame = pd.DataFrame(node_list, columns=['grp', 'node_num', 'id', 'name', 'category', 'equivalent_identifiers', 'similarity_bin'])
+        # init the node counter
+        node_counter: int = 0
 
-        # reshape the data frame and remove all node duplicates.
-        new_df = df.drop(['grp', 'node_num'], axis=1)
-        new_df = new_df.drop_duplicates(keep='first')
+        # init the flag to indicate we did something
+        virus_capture: bool = False
 
-        self.logger.debug(f'{len(new_df.index)} nodes found.')
+        # init the flag that indicates we are inside of a member dbReference element
+        in_db_ref: bool = False
+
+        # init storage for the properties of the member being scanned. this is None when the member isn't captured
+        member_props = None
+
+        # for each element we care about in the entry
+        for prop_type, prop_value, db_ref_id, db_ref_end in ENTRY_TOKEN_RE.findall(entry_element):
+            # is this a property
+            if prop_type:
+                # properties outside of a member belong to the entry
+                if not in_db_ref:
+                    if prop_type == b'common taxon ID':
+                        # we found a virus to capture
+                        virus_capture = True
+
+                        # get the common taxon id
+                        taxon_id: str = UniRefSimLoader.get_attrib_value(prop_value)
+
+                        # save nodes for UniRef ID (UniRef###_accession) and UniRef taxon nodes (common taxon ID) for the entry
+                        tmp_node_list.append({'grp': grp, 'node_num': node_counter, 'id': entry_name, 'name': entry_name, 'category': 'gene_family|named_thing|biological_entity|molecular_entity', 'equivalent_identifiers': entry_name,
+                                              'similarity_bin': similarity_bin})
+
+                        tmp_node_list.append({'grp': grp, 'node_num': node_counter + 1, 'id': 'NCBITaxon:' + taxon_id, 'name': 'NCBITaxon:' + taxon_id, 'category': '',
+                                              'equivalent_identifiers': 'NCBITaxon:' + taxon_id, 'similarity_bin': similarity_bin})
+
+                        # increment the node counter
+                        node_counter += 2
+                # save the needed member properties. only the first UniProtKB accession is used
+                elif member_props is not None and prop_type in MEMBER_PROP_TYPES and (prop_type != b'UniProtKB accession' or prop_type not in member_props):
+                    member_props[prop_type] = UniRefSimLoader.get_attrib_value(prop_value)
+            # is this the start of a member
+            elif db_ref_id:
+                in_db_ref = True
+
+                # only collect member properties once the entry has been captured
+                member_props = {} if virus_capture else None
+            # this is the end of a member
+            elif db_ref_end:
+                try:
+                    # is this a virus taxon
+                    if member_props is not None and member_props[b'NCBI taxonomy'] in in_taxon_set:
+                        # insure all member elements are there before we add the nodes
+                        ncbi_taxon: str = 'NCBITaxon:' + member_props[b'NCBI taxonomy']
+                        uniprot: str = 'UniProtKB:' + member_props[b'UniProtKB accession']
+                        source_organ: str = member_props[b'source organism']
+                        protein_name: str = member_props[b'protein name']
+
+                        # add the member Uniprot KB accession node
+                        tmp_node_list.append({'grp': grp, 'node_num': node_counter, 'id': uniprot, 'name': protein_name,
+                                              'category': 'gene|gene_or_gene_product|macromolecular_machine|genomic_entity|molecular_entity|biological_entity|named_thing', 'equivalent_identifiers': uniprot, 'similarity_bin': similarity_bin})
+
+                        # add the member NCBI taxon node
+                        tmp_node_list.append({'grp': grp, 'node_num': node_counter, 'id': ncbi_taxon, 'name': source_organ, 'category': 'organism_taxon|named_thing|ontology_class', 'equivalent_identifiers': ncbi_taxon,
+                                              'similarity_bin': similarity_bin})
+
+                        # make ready for the next member node pair
+                        node_counter += 1
+                except KeyError:
+                    pass
+
+                # reset for the next member
+                in_db_ref = False
+                member_props = None
 
-        # init a set for the node de-duplication
-        final_node_set: set = set()
+        # did we get at least 3 node pairs (entry node pair, rep member node pair, at least 1 cluster member pair)
+        if len(tmp_node_list) >= 6:
+            node_list.extend(tmp_node_list)
 
-        # write out the unique nodes
-        for item in new_df.iterrows():
-            if output_mode == 'json':
-                # turn these into json
-                category = json.dumps(item[1]['category'].split('|'))
-                identifiers = json.dumps(item[1]['equivalent_identifiers'].split('|'))
+    @staticmethod
+    def get_attrib_value(raw_value: bytes) -> str:
+        """
+        decodes a raw XML attribute value
 
-                # save the node
-                final_node_set.add(f'{{"id":"{item[1]["id"]}", "name":"{item[1]["name"]}", "category":{category}, "equivalent_identifiers":{identifiers}}}')
-            else:
-                final_node_set.add(f"{item[1]['id']}\t{item[1]['name']}\t{item[1]['category']}\t{item[1]['equivalent_identifiers']}")
+        :param raw_value: the attribute value as it appears in the file
+        :return: the attribute value with any character references resolved
+        """
+        # decode the value
+        ret_val: str = raw_value.decode('utf-8')
 
-        # write out the node data
-        if output_mode == 'json':
-            out_node_f.write(',\n'.join(final_node_set))
-        else:
-            out_node_f.write('\n'.join(final_node_set))
+        # resolve any escaped characters
+        if '&' in ret_val:
+            ret_val = unescape(ret_val)
 
-        self.logger.debug('Writing out to data file complete.')
+        # return to the caller
+        return ret_val
 
-    def write_edge_data(self, out_edge_f: TextIOBase, node_list: list, output_mode: str):
+    def write_entry_queue(self, entry_queue: list, out_node_f: TextIOBase, out_edge_f: TextIOBase, output_mode: str):
         """
-        writes edges for the node list passed
+        normalizes the queued entries and writes out their nodes and edges to the KGX node and edge files
 
+        :param entry_queue: the list of entry node lists
+        :param out_node_f: the node file
         :param out_edge_f: the edge file
-        :param node_list: node storage data frame
         :param output_mode: the output mode (tsv or json)
-        :return: nothing
+        :return:
         """
+        # anything to do
+        if len(entry_queue) == 0:
+            return
 
-        self.logger.debug(f'Creating edges for {len(node_list)} nodes.')
+        # gather the nodes of all the queued entries
+        node_list: list = [node for entry_node_list in entry_queue for node in entry_node_list]
 
-        # init group detection
-        cur_group_name: str = ''
-        first: bool = True
-        node_idx: int = 0
+        self.logger.debug(f'Writing {len(entry_queue)} entries with {len(node_list)} nodes.')
 
-        # save the node list count to avoid grabbing it over and over
-        node_count: int = len(node_list)
+        # normalize the taxon nodes in one pass
+        self.normalize_node_data(node_list)
 
         # init a list for edges to normalize
         edge_list: list = []
 
-        # get the edge normalizer
-        en = EdgeNormUtils(self.logger.level)
+        # each entry has edges that only reference the nodes in the entry
+        for entry_node_list in entry_queue:
+            edge_list.extend(self.get_entry_edges(entry_node_list))
 
-        # iterate through node groups and create the edge records.
-        while node_idx < node_count:
-            # logger.debug(f'Working index: {node_idx}')
-
-            # if its the first time in prime the pump
-            if first:
-                cur_group_name = node_list[node_idx]['grp']
-                first = False
-
-            # init variables for each group
-            similarity_bin: str = ''
-            gene_family_node_id: str = ''
-            rep_member_node_id: str = ''
-
-            # for each entry member in the group
-            while node_list[node_idx]['grp'] == cur_group_name:
-                """
-                Entry nodes UniRef ID (UniRef###_accession) and UniRef taxon nodes (common taxon ID)
-                Ex. (node number 0 and 1): (gene_family UniRef100_Q6GZX4)-[in_taxon]-(NCBITaxon:10493)
-
-                For all member node pairs (representative or cluster) where node number N starts at 2...
-                    Member ID (UniProtKB accession) and UniRef ID (UniRef###_accession)
-                    Ex. (node number N and 0): (gene UniProt:A0A0F6NZX8)-[part of]-(UniRef100_Q6GZX4)
-                    Member ID (UniProtKB accession) and taxon ID (NCBI taxonomy)
-                    Ex. (node number N+1 and 1): (gene UniProt:A0A0F6NZX8)-[in_taxon]-(NCBITaxon:10493)
-
-                (Optional) Combination Member ID (UniProtKB accession) to Member ID (UniProtKB accession)
-                Ex. (node number X and Y): (gene UniProt:Q6GZX4)-[SO:similar_to]-(gene UniProt:A0A0F6NZX8)            
-                """
-
-                # get the UniRef entry ID and similarity bin
-                if node_list[node_idx]['node_num'] == 0:
-                    gene_family_node_id = node_list[node_idx]['id']
-                    similarity_bin = node_list[node_idx]['similarity_bin']
-                # get the UniRef entry common taxon ID and create the UniRef ID to taxon edge
-                elif node_list[node_idx]['node_num'] == 1 and gene_family_node_id != '':
-                    edge_list.append({"predicate": "biolink:in_taxon", "subject": f"{gene_family_node_id}", "relation": "RO:0002162", "object": f"{node_list[node_idx]['id']}", "edge_label": "in_taxon", "source_database": f"{similarity_bin}"})
-                # get the member node edges
-                elif similarity_bin != '' and gene_family_node_id != '':
-                    edge_list.append({"predicate": "biolink:part_of", "subject": f"{node_list[node_idx]['id']}", "relation": "BFO:0000050", "object": f"{gene_family_node_id}", "edge_label": "part_of", "source_database": f"{similarity_bin}"})
-                    edge_list.append({"predicate": "biolink:in_taxon", "subject": f"{node_list[node_idx]['id']}", "relation": "RO:0002162", "object": f"{node_list[node_idx + 1]['id']}", "edge_label": "in_taxon", "source_database": f"{similarity_bin}"})
-
-                    # this node is the representative UniProtKB ID node
-                    if node_list[node_idx]['node_num'] == 2:
-                        rep_member_node_id: str = node_list[node_idx]['id']
-
-                    # add the spoke edge if it isn't a reflection of itself
-                    if rep_member_node_id != node_list[node_idx]['id']:
-                        edge_list.append({"predicate": "biolink:similar_to", "subject": f"{rep_member_node_id}", "relation": "RO:HOM0000000", "object": f"{node_list[node_idx]['id']}", "edge_label": "similar_to", "source_database": f"{similarity_bin}"})
-
-                    # increment the node counter pairing
-                    node_idx += 1
-                else:
-                    self.logger.error('Missing data elements similarity_bin or gene_family_node_id')
+        # normalize the edges
+        EdgeNormUtils(self.logger.level).normalize_edge_data(edge_list, self.cached_edge_norms)
 
-                # increment the node counter
-                node_idx += 1
+        # write out all the edges not already written
+        for item in edge_list:
+            # create the record ID
+            record_id: str = hashlib.md5((item["subject"] + item["relation"] + item["edge_label"] + item["object"]).encode("utf-8")).hexdigest()
 
-                # insure we dont overrun the list
-                if node_idx >= node_count:
-                    break
+            # skip the edge if it was already written
+            if not self.written_edges.add(record_id):
+                continue
 
-            # insure we dont overrun the list
-            if node_idx >= node_count:
-                break
+            # depending on the output mode save the edge data
+            if output_mode == 'json':
+                edge: str = f'{{"id":"{record_id}", "predicate":"{item["predicate"]}", "subject":"{item["subject"]}", "relation":"{item["relation"]}", "object":"{item["object"]}", "edge_label":"{item["edge_label"]}", "source_database":"{item["source_database"]}"}}'
+            else:
+                edge: str = f'{record_id}\t{item["predicate"]}\t{item["subject"]}\t{item["relation"]}\t{item["edge_label"]}\t{item["object"]}\t{item["source_database"]}'
 
-            # save the new group name
-            cur_group_name = node_list[node_idx]['grp']
+            # write out the edge
+            self.write_record(out_edge_f, edge, len(self.written_edges), output_mode)
 
-        # normalize the edges
-        en.normalize_edge_data(edge_list, self.cached_edge_norms)
+        # write out all the nodes not already written
+        for item in node_list:
+            # skip the node if it was already written
+            if not self.written_nodes.add(item['id']):
+                continue
+
+            if output_mode == 'json':
+                # turn these into json
+                category = json.dumps(item['category'].split('|'))
+                identifiers = json.dumps(item['equivalent_identifiers'].split('|'))
 
-        # create an edge set to remove duplicates
-        edge_set: set = set()
+                # save the node
+                node: str = f'{{"id":"{item["id"]}", "name":"{item["name"]}", "category":{category}, "equivalent_identifiers":{identifiers}}}'
+            else:
+                node: str = f"{item['id']}\t{item['name']}\t{item['category']}\t{item['equivalent_identifiers']}"
 
-        # write out all the edges
-        for item in edge_list:
-            # create the record ID
-            record_id: str = item["subject"] + item["relation"] + item["edge_label"] + item["object"]
+            # write out the node
+            self.write_record(out_node_f, node, len(self.written_nodes), output_mode)
 
-            # depending on the output mode save the edge data
+        # empty out the queue
+        entry_queue.clear()
+
+    @staticmethod
+    def write_record(out_f: TextIOBase, record: str, record_count: int, output_mode: str):
+        """
+        writes a node or edge record to a KGX file with the separator that goes before it
+
+        :param out_f: the node or edge file
+        :param record: the formatted node or edge
+        :param record_count: the number of records written to the file including this one
+        :param output_mode: the output mode (tsv or json)
+        :return:
+        """
+        # the first record has no separator
+        if record_count > 1:
             if output_mode == 'json':
-                edge_set.add(f'{{"id":"{hashlib.md5(record_id.encode("utf-8")).hexdigest()}", "predicate":"{item["predicate"]}", "subject":"{item["subject"]}", "relation":"{item["relation"]}", "object":"{item["object"]}", "edge_label":"{item["edge_label"]}", "source_database":"{item["source_database"]}"}}')
+                out_f.write(',\n')
             else:
-                edge_set.add(f'{hashlib.md5(record_id.encode("utf-8")).hexdigest()}\t{item["predicate"]}\t{item["subject"]}\t{item["relation"]}\t{item["edge_label"]}\t{item["object"]}\t{item["source_database"]}')
+                out_f.write('\n')
 
-        # write out the edge data
-        if output_mode == 'json':
-            out_edge_f.write(',\n'.join(edge_set))
-        else:
-            out_edge_f.write('\n'.join(edge_set))
+        # write out the record
+        out_f.write(record)
+
+    def get_entry_edges(self, node_list: list) -> list:
+        """
+        gets the edges for the nodes of a single UniRef entry
 
-        # empty out the edge list and set
-        edge_list.clear()
-        edge_set.clear()
+        Entry nodes UniRef ID (UniRef###_accession) and UniRef taxon nodes (common taxon ID)
+        Ex. (node number 0 and 1): (gene_family UniRef100_Q6GZX4)-[in_taxon]-(NCBITaxon:10493)
 
-        self.logger.debug(f'{node_idx} Entry member edges created.')
+        For all member node pairs (representative or cluster) where node number N starts at 2...
+            Member ID (UniProtKB accession) and UniRef ID (UniRef###_accession)
+            Ex. (node number N and 0): (gene UniProt:A0A0F6NZX8)-[part of]-(UniRef100_Q6GZX4)
+            Member ID (UniProtKB accession) and taxon ID (NCBI taxonomy)
+            Ex. (node number N+1 and 1): (gene UniProt:A0A0F6NZX8)-[in_taxon]-(NCBITaxon:10493)
+
+        (Optional) Combination Member ID (UniProtKB accession) to Member ID (UniProtKB accession)
+        Ex. (node number X and Y): (gene UniProt:Q6GZX4)-[SO:similar_to]-(gene UniProt:A0A0F6NZX8)
+
+        :param node_list: the nodes of the entry in the order they were captured
+        :return: the list of edges
+        """
+        # init the return
+        edge_list: list = []
+
+        # init variables for the entry
+        similarity_bin: str = ''
+        gene_family_node_id: str = ''
+        rep_member_node_id: str = ''
+        node_idx: int = 0
+
+        # save the node list count to avoid grabbing it over and over
+        node_count: int = len(node_list)
+
+        # for each entry member
+        while node_idx < node_count:
+            # get the UniRef entry ID and similarity bin
+            if node_list[node_idx]['node_num'] == 0:
+                gene_family_node_id = node_list[node_idx]['id']
+                similarity_bin = node_list[node_idx]['similarity_bin']
+            # get the UniRef entry common taxon ID and create the UniRef ID to taxon edge
+            elif node_list[node_idx]['node_num'] == 1 and gene_family_node_id != '':
+                edge_list.append({"predicate": "biolink:in_taxon", "subject": f"{gene_family_node_id}", "relation": "RO:0002162", "object": f"{node_list[node_idx]['id']}", "edge_label": "in_taxon", "source_database": f"{similarity_bin}"})
+            # get the member node edges
+            elif similarity_bin != '' and gene_family_node_id != '' and node_idx + 1 < node_count:
+                edge_list.append({"predicate": "biolink:part_of", "subject": f"{node_list[node_idx]['id']}", "relation": "BFO:0000050", "object": f"{gene_family_node_id}", "edge_label": "part_of", "source_database": f"{similarity_bin}"})
+                edge_list.append({"predicate": "biolink:in_taxon", "subject": f"{node_list[node_idx]['id']}", "relation": "RO:0002162", "object": f"{node_list[node_idx + 1]['id']}", "edge_label": "in_taxon", "source_database": f"{similarity_bin}"})
+
+                # this node is the representative UniProtKB ID node
+                if node_list[node_idx]['node_num'] == 2:
+                    rep_member_node_id = node_list[node_idx]['id']
+
+                # add the spoke edge if it isn't a reflection of itself
+                if rep_member_node_id != node_list[node_idx]['id']:
+                    edge_list.append({"predicate": "biolink:similar_to", "subject": f"{rep_member_node_id}", "relation": "RO:HOM0000000", "object": f"{node_list[node_idx]['id']}", "edge_label": "similar_to", "source_database": f"{similarity_bin}"})
+
+                # increment the node counter pairing
+                node_idx += 1
+            else:
+                self.logger.error('Missing data elements similarity_bin or gene_family_node_id')
+
+            # increment the node counter
+            node_idx += 1
 
+        # return the edges to the caller
+        return edge_list
 
 if __name__ == '__main__':
     # create a command line parser
@@ -629,6 +891,7 @@ if __name__ == '__main__':
     ap.add_argument('-r', '--data_dir', required=True, help='The location of the UniRef data files')
     ap.add_argument('-f', '--UniRef_files', required=True, help='Name(s) of input UniRef files (comma delimited)')
     ap.add_argument('-m', '--out_mode', required=True, help='The output file mode (tsv or json')
+    ap.add_argument('-w', '--workers', required=False, type=int, default=1, help='The number of entry parsing processes')
 
     # parse the arguments
     args = vars(ap.parse_args())
@@ -646,4 +909,4 @@ if __name__ == '__main__':
     vp = UniRefSimLoader()
 
     # load the data files and create KGX output
-    vp.load(UniRef_data_dir, file_list, 'taxon_file_indexes.txt', output_mode=out_mode)
+    vp.load(UniRef_data_dir, file_list, 'taxon_file_indexes.bin', output_mode=out_mode, workers=args['workers'])
@@ -1,38 +1,41 @@
 import os
-import csv
 import argparse
 import hashlib
-import pandas as pd
-import enum
-import requests
 import json
 import logging
 
 from datetime import datetime
-from csv import reader
-from Common.utils import LoggingUtil, GetData, DatasetDescription, EdgeNormUtils
+from multiprocessing import Pool
+from io import TextIOBase
+from Common.utils import LoggingUtil, GetData, DatasetDescription, NodeNormUtils, EdgeNormUtils, DedupRegistry
+from Common.gaf_reader import GAFReader, GOTermEdgeBuilder
 from pathlib import Path
 
 
-# the data header columns are:
-class DATACOLS(enum.IntEnum):
-    DB = 0
-    DB_Object_ID = 1
-    DB_Object_Symbol = 2
-    Qualifier = 3
-    GO_ID = 4
-    DB_Reference = 5
-    Evidence_Code = 6
-    With_From = 7
-    Aspect = 8
-    DB_Object_Name = 9
-    DB_Object_Synonym = 10
-    DB_Object_Type = 11
-    Taxon_Interacting_taxon = 12
-    Date = 13
-    Assigned_By = 14
-    Annotation_Extension = 15
-    Gene_Product_Form_ID = 16
+# the loader used by the GAF parsing worker processes
+_worker_loader = None
+
+
+def _init_gaf_worker(log_level):
+    """
+    creates the loader that parses GAF files in each worker process
+
+    :param log_level: the log level of the loader
+    :return:
+    """
+    global _worker_loader
+
+    _worker_loader = VPLoader(log_level)
+
+
+def _get_file_annotations_worker(file_path: str) -> list:
+    """
+    parses a GAF file in a worker process
+
+    :param file_path: the path to the GAF file
+    :return: the distinct annotations in the file
+    """
+    return _worker_loader.get_file_annotations(file_path)
 
 
 ##############
@@ -51,6 +54,17 @@ class VPLoader:
     node_norm_failures: list = []
     edge_norm_failures: list = []
 
+    # storage for cached node and edge normalizations
+    cached_node_norms: dict = {}
+    cached_edge_norms: dict = {}
+
+    # the number of distinct un-normalized curies or annotations that trigger a normalize and write of the queued annotations
+    norm_block_size: int = 2500
+    annotation_queue_size: int = 100000
+
+    # the gene node category
+    GENE_CATEGORY: str = 'gene|gene_or_gene_product|macromolecular_machine|genomic_entity|molecular_entity|biological_entity|named_thing'
+
     def get_name(self):
         """
         returns the name of the class
@@ -67,14 +81,29 @@ class VPLoader:
         # create a logger
         self.logger = LoggingUtil.init_logging("Data_services.ViralProteome.VPLoader", level=log_level, line_format='medium', log_file_path=os.path.join(Path(__file__).parents[2], 'logs'))
 
-    def load(self, data_path: str, out_name: str, output_mode: str = 'json', test_mode: bool = False):
+        # the normalized taxon and GO term nodes keyed by the curie in the data. None if the curie did not normalize
+        self.normalized_nodes: dict = {}
+
+        # registries of the node and edge ids written to the KGX files
+        self.written_nodes: DedupRegistry = DedupRegistry()
+        self.written_edges: DedupRegistry = DedupRegistry()
+
+        # the GAF file reader and the gene to GO term edge builder
+        self.gaf_reader: GAFReader = GAFReader(log_level)
+        self.edge_builder: GOTermEdgeBuilder = GOTermEdgeBuilder(log_level)
+
+    def load(self, data_path: str, out_name: str, output_mode: str = 'json', test_mode: bool = False, workers: int = 1):
         """
         loads goa and gaf associated data gathered from ftp://ftp.ebi.ac.uk/pub/databases/GO/goa/proteomes/
 
+        When more than 1 worker is requested the GAF files are parsed in a process pool. The parsed
+        files are returned in file list order.
+
         :param data_path: root directory of output data files
         :param out_name: the output name prefix of the KGX files
         :param output_mode: the output mode (tsv or json)
         :param test_mode: flag to signify test mode
+        :param workers: the number of GAF file parsing processes
         :return: True
         """
         self.logger.info(f'VPLoader - Start of viral proteome data processing.')
@@ -119,79 +148,58 @@ class VPLoader:
                 # init a file counter
                 file_counter: int = 0
 
-                # init the total set of nodes
-                total_nodes: list = []
-
-                # get the edge normalization object
-                en = EdgeNormUtils(self.logger.level)
-
-                # process each file
-                for f in file_list:
-                    # open up the file
-                    with open(os.path.join(goa_data_dir, f), 'r', encoding="utf-8") as fp:
-                        # increment the file counter
-                        file_counter += 1
-
-                        self.logger.debug(f'Parsing file number {file_counter}, {f[:-1]}.')
-
-                        # read the file and make the list
-                        node_list: list = self.get_node_list(fp)
-
-                        # save this list of nodes to the running collection
-                        total_nodes.extend(node_list)
-
-                # de-dupe the list
-                total_nodes = [dict(t) for t in {tuple(d.items()) for d in total_nodes}]
-
-                self.logger.debug(f'Node list loaded with {len(total_nodes)} entries.')
+                # init the queue of annotations waiting to be normalized and written
+                annotation_queue: list = []
 
-                # normalize the group of entries on the data frame.
-                total_nodes = self.normalize_node_data(total_nodes)
+                # init the set of queued curies that have not been normalized yet
+                pending_curies: set = set()
 
-                self.logger.debug('Creating edges.')
+                # reset the written node and edge registries
+                self.written_nodes.clear()
+                self.written_edges.clear()
 
-                # create a data frame with the node list
-                df: pd.DataFrame = pd.DataFrame(total_nodes, columns=['grp', 'node_num', 'id', 'name', 'category', 'equivalent_identifiers'])
+                # get the paths to the GAF files
+                file_paths: list = [os.path.join(goa_data_dir, f) for f in file_list]
 
-                # get the list of unique edges
-                edge_list: list = self.get_edge_list(df)
-
-                # normalize the edge list
-                self.edge_norm_failures = en.normalize_edge_data(edge_list)
-
-                # get the unique edge data to write to the file
-                final_edge_set: set = self.get_edge_set(edge_list, output_mode)
+                # are we parsing in parallel
+                if workers > 1:
+                    # create the pool of GAF file parsers. the results come back in file list order
+                    pool: Pool = Pool(workers, initializer=_init_gaf_worker, initargs=(self.logger.level,))
+                    file_results = pool.imap(_get_file_annotations_worker, file_paths, chunksize=8)
+                else:
+                    pool = None
+                    file_results = (self.get_file_annotations(file_path) for file_path in file_paths)
 
-                self.logger.debug(f'{len(edge_list)} edges found. De-duplicating {len(total_nodes)} nodes.')
+                try:
+                    # process the annotations of each file
+                    for f, annotations in zip(file_list, file_results):
+                        # increment the file counter
+                        file_counter += 1
 
-                # init a set for the node de-duplication
-                final_node_set: set = set()
+                        self.logger.debug(f'Parsed file number {file_counter}, {f}. {len(annotations)} annotations.')
 
-                # write out the unique nodes
-                for row in total_nodes:
-                    if output_mode == 'json':
-                        # turn these into json
-                        category = json.dumps(row["category"].split('|'))
-                        identifiers = json.dumps(row["equivalent_identifiers"].split('|'))
+                        # for each annotation in the file
+                        for annotation in annotations:
+                            # queue it up
+                            annotation_queue.append(annotation)
 
-                        # save the node
-                        final_node_set.add(f'{{"id":"{row["id"]}", "name":"{row["name"]}", "category":{category}, "equivalent_identifiers":{identifiers}}}')
-                    else:
-                        final_node_set.add(f"{row['id']}\t{row['name']}\t{row['category']}\t{row['equivalent_identifiers']}")
+                            # save the taxon and GO term curies that will need a normalization lookup
+                            pending_curies.update(curie for curie in (annotation.taxon_id, annotation.go_id) if curie not in self.normalized_nodes)
 
-                self.logger.debug(f'Creating KGX node file with {len(final_node_set)} nodes.')
+                            # is it time to normalize and write out the queue
+                            if len(pending_curies) >= self.norm_block_size or len(annotation_queue) >= self.annotation_queue_size:
+                                self.write_annotation_queue(annotation_queue, out_node_f, out_edge_f, output_mode)
+                                pending_curies.clear()
+                finally:
+                    # shut down the pool
+                    if pool is not None:
+                        pool.terminate()
+                        pool.join()
 
-                # write out the node data
-                if output_mode == 'json':
-                    out_node_f.write(',\n'.join(final_node_set))
-                else:
-                    out_node_f.write('\n'.join(final_node_set))
+                # save any remainders
+                self.write_annotation_queue(annotation_queue, out_node_f, out_edge_f, output_mode)
 
-                # write out the edge data
-                if output_mode == 'json':
-                    out_edge_f.write(',\n'.join(final_edge_set))
-                else:
-                    out_edge_f.write('\n'.join(final_edge_set))
+                self.logger.debug(f'{len(self.written_nodes)} nodes and {len(self.written_edges)} edges written.')
 
                 # finish off the json if we have to
                 if output_mode == 'json':
@@ -212,25 +220,6 @@ class VPLoader:
         # get/KGX save the dataset provenance information node
         self.get_dataset_provenance(data_path)
 
-    @staticmethod
-    def get_edge_set(edge_list: list, output_mode: str) -> set:
-        # init a new set
-        edge_set: set = set()
-
-        # for each edge in the list
-        for item in edge_list:
-            # create the record ID
-            record_id: str = item["subject"] + item["relation"] + item["edge_label"] + item["object"]
-
-            # depending on the output mode save edge contents
-            if output_mode == 'json':
-                edge_set.add(f'{{"id":"{hashlib.md5(record_id.encode("utf-8")).hexdigest()}", "predicate":"{item["predicate"]}", "subject":"{item["subject"]}", "relation":"{item["relation"]}", "object":"{item["object"]}", "edge_label":"{item["edge_label"]}", "source_database":"UniProtKB GOA Viral proteomes"}}')
-            else:
-                edge_set.add(f'{hashlib.md5(record_id.encode("utf-8")).hexdigest()}\t{item["predicate"]}\t{item["subject"]}\t{item["relation"]}\t{item["edge_label"]}\t{item["object"]}\tUniProtKB GOA Viral proteomes')
-
-        # return the edge set to the caller
-        return edge_set
-
     def get_dataset_provenance(self, data_path: str):
         # get the util object for getting data
         gd: GetData = GetData(self.logger.level)
@@ -250,281 +239,172 @@ class VPLoader:
         # create the data description KGX file
         DatasetDescription.create_description(data_path, ds, 'Viral_proteome')
 
-    def get_edge_list(self, df) -> list:
+    def write_annotation_queue(self, annotation_queue: list, out_node_f: TextIOBase, out_edge_f: TextIOBase, output_mode: str):
         """
-        gets a list of edges for the data frame passed
+        normalizes the taxa and GO terms of the queued annotations and writes out their nodes and edges to the KGX node and edge files
 
-        :param df: node storage data frame
-        :return: list of KGX ready edges
+        :param annotation_queue: the list of GAF record annotations
+        :param out_node_f: the node file
+        :param out_edge_f: the edge file
+        :param output_mode: the output mode (tsv or json)
+        :return:
         """
+        # anything to do
+        if len(annotation_queue) == 0:
+            return
+
+        self.logger.debug(f'Writing {len(annotation_queue)} annotations.')
 
-        # init the list of edges
+        # normalize the new taxon and GO term curies
+        self.normalize_curies({curie for annotation in annotation_queue for curie in (annotation.taxon_id, annotation.go_id) if curie not in self.normalized_nodes})
+
+        # init a list for edges to normalize
         edge_list: list = []
 
-        # separate the data into triplet groups
-        df_grp: pd.groupby_generic.DataFrameGroupBy = df.set_index('grp').groupby('grp')
-
-        # iterate through the groups and create the edge records.
-        for row_index, rows in df_grp:
-            # init variables for each group
-            node_1_id: str = ''
-            node_2_id: str = ''
-            node_3_id: str = ''
-            node_3_type: str = ''
-
-            # if we dont get a set of 3 something is odd (but not necessarily bad)
-            if len(rows) != 3:
-                self.logger.warning(f'Warning: Mis-matched node grouping. {rows}')
-
-            # for each row in the triplet
-            for row in rows.iterrows():
-                # save the node ids for the edges
-                if row[1].node_num == 1:
-                    node_1_id = row[1]['id']
-                elif row[1].node_num == 2:
-                    node_2_id = row[1]['id']
-                elif row[1].node_num == 3:
-                    node_3_id = row[1]['id']
-                    node_3_type = row[1]['category']
-
-            # check to insure we have both node ids
-            if node_1_id != '' and node_2_id != '':
+        # for each annotation
+        for gene_id, gene_symbol, taxon_id, go_id, aspect in annotation_queue:
+            # create node type 1
+            """ A gene with identifier UniProtKB:O73942, and name "apeI", 
+                and description "Homing endonuclease I-ApeI". These nodes won't be 
+                found in node normalizer, so we'll need to construct them by hand. """
+            self.write_node(out_node_f, {'id': gene_id, 'name': gene_symbol, 'category': self.GENE_CATEGORY, 'equivalent_identifiers': gene_id}, output_mode)
+
+            # get the normalized taxon and GO term nodes (types 2 and 3)
+            taxon_node = self.normalized_nodes[taxon_id]
+            go_node = self.normalized_nodes[go_id]
+
+            # nodes that did not normalize cant have an edge
+            if taxon_node is not None:
+                # write out the taxon node
+                self.write_node(out_node_f, taxon_node, output_mode)
+
                 # create the KGX edge data for nodes 1 and 2
                 """ An edge from the gene to the organism_taxon with relation "in_taxon" """
-                edge_list.append({"predicate": "biolink:in_taxon", "subject": f"{node_1_id}", "relation": "RO:0002162", "object": f"{node_2_id}", "edge_label": "in_taxon"})
+                edge_list.append({"predicate": "biolink:in_taxon", "subject": f"{gene_id}", "relation": "RO:0002162", "object": f"{taxon_node['id']}", "edge_label": "in_taxon"})
             else:
-                self.logger.warning(f'Warning: Missing 1 or more node IDs. Node type 1: {node_1_id}, Node type 2: {node_2_id}')
-
-            # check to insure we have both node ids
-            if node_1_id != '' and node_3_id != '':
-                # write out an edge that connects nodes 1 and 3
-                """ An edge between the gene and the go term. If the go term is a molecular_activity, 
-                then the edge should be (go term)-[enabled_by]->(gene). If the go term is a biological 
-                process then it should be (gene)-[actively_involved_in]->(go term). If it is a cellular 
-                component then it should be (go term)-[has_part]->(gene) """
-
-                # init node 1 to node 3 edge details
-                predicate: str = ''
-                relation: str = ''
-                label: str = ''
-                src_node_id: str = ''
-                obj_node_id: str = ''
-                valid_type = True
-
-                # find the predicate and edge relationships
-                if node_3_type.find('molecular_activity') > -1:
-                    predicate = 'biolink:enabled_by'
-                    relation = 'RO:0002333'
-                    label = 'enabled_by'
-                    src_node_id = node_3_id
-                    obj_node_id = node_1_id
-                elif node_3_type.find('biological_process') > -1:
-                    predicate = 'biolink:actively_involved_in'
-                    relation = 'RO:0002331'
-                    label = 'actively_involved_in'
-                    src_node_id = node_1_id
-                    obj_node_id = node_3_id
-                elif node_3_type.find('cellular_component') > -1:
-                    predicate = 'biolink:has_part'
-                    relation = 'RO:0000051'
-                    label = 'has_part'
-                    src_node_id = node_3_id
-                    obj_node_id = node_1_id
-                else:
-                    valid_type = False
+                self.logger.warning(f'Warning: Missing 1 or more node IDs. Node type 1: {gene_id}, Node type 2: {taxon_id} did not normalize.')
+
+            if go_node is not None:
+                # write out the GO term node
+                self.write_node(out_node_f, go_node, output_mode)
+
+                # get the edge between the gene and the go term
+                edge = self.edge_builder.get_edge(gene_id, go_node, aspect)
 
                 # was this a good value
-                if not valid_type:
+                if edge is None:
                     self.logger.debug(f'Warning: Unrecognized node 3 type')
-                elif src_node_id == '' or obj_node_id == '':
-                    self.logger.warning(f'Warning: Missing 1 or more node IDs. Node type 1: {node_1_id}, Node type 3: {node_3_id}')
                 else:
-                    # create the KGX edge data for nodes 1 and 3
-                    edge_list.append({"predicate": predicate, "subject": src_node_id, "relation": relation, "object": obj_node_id, "edge_label": label})
-
-        self.logger.debug(f'{len(edge_list)} edges identified.')
+                    edge_list.append(edge)
 
-        # return the list to the caller
-        return edge_list
+        # normalize the edges
+        self.edge_norm_failures.extend(EdgeNormUtils(self.logger.level).normalize_edge_data(edge_list, self.cached_edge_norms))
 
-    def get_node_list(self, fp) -> list:
-        """ loads the nodes from the file handle passed
-
-        :param fp: open file pointer
-        :return: list of nodes for further processing
-        """
-
-        # create a csv reader for it
-        csv_reader: reader = csv.reader(fp, delimiter='\t')
-
-        # clear out the node list
-        node_list: list = []
+        # write out all the edges not already written
+        for item in edge_list:
+            # create the record ID
+            record_id: str = hashlib.md5((item["subject"] + item["relation"] + item["edge_label"] + item["object"]).encode("utf-8")).hexdigest()
 
-        # for the rest of the lines in the file
-        for line in csv_reader:
-            # skip over data comments
-            if line[0] == '!' or line[0][0] == '!':
+            # skip the edge if it was already written
+            if not self.written_edges.add(record_id):
                 continue
 
-            try:
-                # an example record looks like this
-                """ UniProtKB       O73942  apeI            GO:0004518      GO_REF:0000043  IEA     UniProtKB-KW:KW-0540    F       
-                    Homing endonuclease I-ApeI      apeI|APE_1929.1 protein 272557  20200229        UniProt """
-
-                # create a unique group identifier
-                grp: str = f'{line[DATACOLS.DB_Object_ID.value]}{line[DATACOLS.GO_ID.value]}{line[DATACOLS.Taxon_Interacting_taxon.value]}'
-
-                # create node type 1
-                """ A gene with identifier UniProtKB:O73942, and name "apeI", 
-                    and description "Homing endonuclease I-ApeI". These nodes won't be 
-                    found in node normalizer, so we'll need to construct them by hand. """
-                node_list.append({'grp': grp, 'node_num': 1, 'id': f'{line[DATACOLS.DB.value]}:{line[DATACOLS.DB_Object_ID.value]}', 'name': f'{line[DATACOLS.DB_Object_Symbol.value]}', 'category': 'gene|gene_or_gene_product|macromolecular_machine|genomic_entity|molecular_entity|biological_entity|named_thing',
-                                  'equivalent_identifiers': f'{line[DATACOLS.DB.value]}:{line[DATACOLS.DB_Object_ID.value]}'})
-
-                # create node type 2
-                """ An organism_taxon with identifier NCBITaxon:272557. This one should  
-                    node normalize fine, returning the correct names. """
-                # get the taxon id
-                taxon_id: str = line[DATACOLS.Taxon_Interacting_taxon.value]
-
-                # if the taxon if starts with taxon remove it
-                if taxon_id.startswith('taxon:'):
-                    taxon_id = taxon_id[len('taxon:'):]
-
-                # create the node
-                node_list.append({'grp': grp, 'node_num': 2, 'id': f'NCBITaxon:{taxon_id}', 'name': '', 'category': '', 'equivalent_identifiers': ''})
+            # depending on the output mode save edge contents
+            if output_mode == 'json':
+                edge: str = f'{{"id":"{record_id}", "predicate":"{item["predicate"]}", "subject":"{item["subject"]}", "relation":"{item["relation"]}", "object":"{item["object"]}", "edge_label":"{item["edge_label"]}", "source_database":"UniProtKB GOA Viral proteomes"}}'
+            else:
+                edge: str = f'{record_id}\t{item["predicate"]}\t{item["subject"]}\t{item["relation"]}\t{item["edge_label"]}\t{item["object"]}\tUniProtKB GOA Viral proteomes'
 
-                # create node type 3
-                """ A node for the GO term GO:0004518. It should normalize, telling us the type / name. """
-                node_list.append({'grp': grp, 'node_num': 3, 'id': f'{line[DATACOLS.GO_ID.value]}', 'name': '', 'category': '', 'equivalent_identifiers': ''})
-            except Exception as e:
-                self.logger.error(f'Error: Exception: {e}')
+            # write out the edge
+            self.write_record(out_edge_f, edge, len(self.written_edges), output_mode)
 
-        # return the list to the caller
-        return node_list
+        # empty out the queue
+        annotation_queue.clear()
 
-    def normalize_node_data(self, node_list: list) -> list:
-        """
-        This method calls the NodeNormalization web service to get the normalized identifier and name of the chemical substance node.
-        the data comes in as a grouped data frame and we will normalize the node_2 and node_3 groups.
-        
-        :param node_list: data frame with items to normalize
-        :return: the data frame passed in with updated node data
+    def write_node(self, out_node_f: TextIOBase, node: dict, output_mode: str):
         """
+        writes a node to the KGX node file if it has not been written already
 
-        # storage for cached node normalizations
-        cached_node_norms: dict = {}
-
-        # loop through the list and only save the NCBI taxa nodes
-        node_idx: int = 0
-
-        # save the node list count to avoid grabbing it over and over
-        node_count: int = len(node_list)
-
-        # init a list to identify taxa that has not been node normed
-        tmp_normalize: set = set()
-
-        # iterate through the data and get the keys to normalize
-        while node_idx < node_count:
-            # check to see if this one needs normalization data from the website
-            if node_list[node_idx]['node_num'] in [2, 3]:
-                if not node_list[node_idx]['id'] in cached_node_norms:
-                    tmp_normalize.add(node_list[node_idx]['id'])
-
-            node_idx += 1
-
-        # convert the set to a list so we can iterate through it
-        to_normalize: list = list(tmp_normalize)
-
-        # define the chuck size
-        chunk_size: int = 2500
-
-        # init the indexes
-        start_index: int = 0
+        :param out_node_f: the node file
+        :param node: the node to write
+        :param output_mode: the output mode (tsv or json)
+        :return:
+        """
+        # skip the node if it was already written
+        if not self.written_nodes.add(node['id']):
+            return
 
-        # get the last index of the list
-        last_index: int = len(to_normalize)
+        if output_mode == 'json':
+            # turn these into json
+            category = json.dumps(node["category"].split('|'))
+            identifiers = json.dumps(node["equivalent_identifiers"].split('|'))
 
-        self.logger.debug(f'{last_index} unique nodes will be normalized.')
+            # save the node
+            record: str = f'{{"id":"{node["id"]}", "name":"{node["name"]}", "category":{category}, "equivalent_identifiers":{identifiers}}}'
+        else:
+            record: str = f"{node['id']}\t{node['name']}\t{node['category']}\t{node['equivalent_identifiers']}"
 
-        # grab chunks of the data frame
-        while True:
-            if start_index < last_index:
-                # define the end index of the slice
-                end_index: int = start_index + chunk_size
+        # write out the node
+        self.write_record(out_node_f, record, len(self.written_nodes), output_mode)
 
-                # force the end index to be the last index to insure no overflow
-                if end_index >= last_index:
-                    end_index = last_index
+    @staticmethod
+    def write_record(out_f: TextIOBase, record: str, record_count: int, output_mode: str):
+        """
+        writes a node or edge record to a KGX file with the separator that goes before it
 
-                self.logger.debug(f'Working block indexes {start_index} to {end_index} of {last_index}.')
+        :param out_f: the node or edge file
+        :param record: the formatted node or edge
+        :param record_count: the number of records written to the file including this one
+        :param output_mode: the output mode (tsv or json)
+        :return:
+        """
+        # the first record has no separator
+        if record_count > 1:
+            if output_mode == 'json':
+                out_f.write(',\n')
+            else:
+                out_f.write('\n')
 
-                # collect a slice of records from the data frame
-                data_chunk: list = to_normalize[start_index: end_index]
+        # write out the record
+        out_f.write(record)
 
-                # get the data
-                resp: requests.models.Response = requests.get('https://nodenormalization-sri.renci.org/get_normalized_nodes?curie=' + '&curie='.join(data_chunk))
+    def get_file_annotations(self, file_path: str) -> list:
+        """
+        gets the distinct annotations in a GAF file
 
-                # did we get a good status code
-                if resp.status_code == 200:
-                    # convert to json
-                    rvs: dict = resp.json()
+        :param file_path: the path to the GAF file
+        :return: list of GAF record annotations in file order
+        """
+        # open up the file
+        with GAFReader.open(file_path) as fp:
+            # lines that only differ in columns we dont use make the same annotation
+            return list(dict.fromkeys(self.gaf_reader.read(fp)))
 
-                    # merge this list with what we have gotten so far
-                    merged = {**cached_node_norms, **rvs}
+    def normalize_curies(self, curies: set):
+        """
+        calls the NodeNormalization web service to get the normalized node for each taxon and GO term curie passed.
+        the results are saved in the normalized nodes lookup.
 
-                    # save the merged list
-                    cached_node_norms = merged
-                else:
-                    # the 404 error that is trapped here means that the entire list of nodes didnt get normalized.
-                    self.logger.debug(f'response code: {resp.status_code}')
+        :param curies: the set of curies to normalize
+        :return:
+        """
+        # anything to do
+        if len(curies) == 0:
+            return
 
-                    # since they all failed to normalize add to the list so we dont try them again
-                    for item in data_chunk:
-                        cached_node_norms.update({item: None})
+        self.logger.debug(f'{len(curies)} unique nodes will be normalized.')
 
-                # move on down the list
-                start_index += chunk_size
-            else:
-                break
-
-        # reset the node index
-        node_idx = 0
-
-        # for each row in the slice add the new id and name
-        # iterate through node groups and get only the taxa records.
-        while node_idx < node_count:
-            # is this something that has been normalized
-            if node_list[node_idx]['node_num'] in [2, 3]:
-                # save the target data element
-                rv = node_list[node_idx]
-
-                # did we find a normalized value
-                if cached_node_norms[rv['id']] is not None:
-                    # find the name and replace it with label
-                    if 'label' in cached_node_norms[rv['id']]['id']:
-                        node_list[node_idx]['name'] = cached_node_norms[rv['id']]['id']['label']
-
-                    if 'type' in cached_node_norms[rv['id']]:
-                        node_list[node_idx]['category'] = '|'.join(cached_node_norms[rv['id']]['type'])
-
-                    # get the equivalent identifiers
-                    if 'equivalent_identifiers' in cached_node_norms[rv['id']] and len(cached_node_norms[rv['id']]['equivalent_identifiers']) > 0:
-                        node_list[node_idx]['equivalent_identifiers'] = '|'.join(list((item['identifier']) for item in cached_node_norms[rv['id']]['equivalent_identifiers']))
-
-                    # find the id and replace it with the normalized value
-                    node_list[node_idx]['id'] = cached_node_norms[rv['id']]['id']['identifier']
-                else:
-                    self.node_norm_failures.append(rv['id'])
+        # create the nodes to normalize, keyed by the curie in the data
+        nodes: dict = {curie: {'id': curie, 'name': '', 'category': '', 'equivalent_identifiers': ''} for curie in curies}
 
-            # go to the next index
-            node_idx += 1
+        # normalize the nodes. this updates the nodes in place
+        node_list: list = list(nodes.values())
 
-        # remove all nodes that dont have a category as they cant have an edge if they dont
-        node_list[:] = [d for d in node_list if d['category'] != '']
+        self.node_norm_failures.extend(NodeNormUtils(self.logger.level).normalize_node_data(node_list, self.cached_node_norms, block_size=self.norm_block_size))
 
-        # return the updated list to the caller
-        return node_list
+        # save the nodes. the ones that dont have a category cant have an edge
+        for curie, node in nodes.items():
+            self.normalized_nodes[curie] = node if node['category'] != '' else None
 
 
 if __name__ == '__main__':
@@ -534,6 +414,7 @@ if __name__ == '__main__':
     # command line should be like: python loadVP.py -p /projects/stars/Data_services/UniProtKB_data
     ap.add_argument('-p', '--data_dir', required=True, help='The location of the UniProtKB data files')
     ap.add_argument('-m', '--out_mode', required=True, help='The output file mode (tsv or json')
+    ap.add_argument('-w', '--workers', required=False, type=int, default=1, help='The number of GAF file parsing processes')
 
     # parse the arguments
     args = vars(ap.parse_args())
@@ -547,4 +428,4 @@ if __name__ == '__main__':
     vp = VPLoader()
 
     # load the data files and create KGX output
-    vp.load(UniProtKB_data_dir, 'Viral_proteome_GOA', output_mode=out_mode)
+    vp.load(UniProtKB_data_dir, 'Viral_proteome_GOA', output_mode=out_mode, workers=args['workers'])
@@ -0,0 +1,185 @@
+import os
+import mmap
+import struct
+import logging
+
+from multiprocessing import Pool
+from Common.utils import LoggingUtil
+from pathlib import Path
+
+# the marker that precedes the common taxon id value in a UniRef entry element
+TAXON_MARKER: bytes = b'<property type="common taxon ID" value="'
+
+# the entry element start and end tags
+ENTRY_START: bytes = b'<entry '
+ENTRY_END: bytes = b'</entry>'
+
+# the index file header and record layout (entry start offset, entry length)
+INDEX_MAGIC: bytes = b'URTI\x00\x00\x00\x01'
+INDEX_RECORD: struct.Struct = struct.Struct('<QI')
+
+# the set of target taxa for the indexing worker processes
+_worker_taxa: frozenset = frozenset()
+
+
+def _init_worker(target_taxa: frozenset):
+    """
+    saves the target taxa in each indexing worker process
+
+    :param target_taxa: the set of target taxon ids as bytes
+    :return:
+    """
+    global _worker_taxa
+
+    _worker_taxa = target_taxa
+
+
+def _index_chunk(uniref_infile_path: str, chunk_start: int, chunk_end: int) -> list:
+    """
+    finds the target taxon entry elements whose common taxon ID marker starts in the byte range passed
+
+    :param uniref_infile_path: the path to the uniref XML file
+    :param chunk_start: the first byte of the range
+    :param chunk_end: the byte just past the end of the range
+    :return: a list of (entry start offset, entry length) tuples in file order
+    """
+    # init the return
+    ret_val: list = []
+
+    with open(uniref_infile_path, 'rb') as fp, mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # a marker is owned by this chunk if it starts before the end of the range
+        search_end: int = min(chunk_end + len(TAXON_MARKER) - 1, len(mm))
+
+        # init the search position
+        pos: int = chunk_start
+
+        while True:
+            # find the next common taxon ID property
+            pos = mm.find(TAXON_MARKER, pos, search_end)
+
+            # no more in this chunk
+            if pos == -1:
+                break
+
+            # get the taxon id value
+            value_start: int = pos + len(TAXON_MARKER)
+            value_end: int = mm.find(b'"', value_start)
+
+            # is this a taxon we are looking for
+            if mm[value_start:value_end] in _worker_taxa:
+                # find the boundaries of the entry element that contains it
+                entry_start: int = mm.rfind(ENTRY_START, 0, pos)
+                entry_end: int = mm.find(ENTRY_END, value_end)
+
+                # save the location if the entry is well formed
+                if entry_start != -1 and entry_end != -1:
+                    ret_val.append((entry_start, entry_end + len(ENTRY_END) - entry_start))
+
+            # move past this marker
+            pos = value_end
+
+    # return to the caller
+    return ret_val
+
+
+def _star_index_chunk(args: tuple) -> list:
+    """
+    unpacks the chunk arguments for the pool imap call
+
+    :param args: the uniref file path and chunk range
+    :return: a list of (entry start offset, entry length) tuples
+    """
+    return _index_chunk(*args)
+
+
+##############
+# Class: UniRef taxon index
+#
+# By: Phil Owen
+# Date: 10/19/2020
+# Desc: Class that creates and reads the binary index of target taxon entry elements in a UniRef XML file.
+##############
+class UniRefTaxonIndex:
+    def __init__(self, log_level=logging.INFO):
+        """
+        constructor
+        :param log_level - overrides default log level
+        """
+        # create a logger
+        self.logger = LoggingUtil.init_logging("Data_services.ViralProteome.UniRefTaxonIndex", level=log_level, line_format='medium', log_file_path=os.path.join(Path(__file__).parents[2], 'logs'))
+
+    def create_index(self, uniref_infile_path: str, index_file_path: str, target_taxa: set, workers: int = None, chunk_size: int = 256 * 1024 * 1024) -> int:
+        """
+        scans the UniRef XML file for entries with a common taxon ID in the target taxa and writes
+        the start offset and length of each of those entry elements to a binary index file.
+
+        :param uniref_infile_path: the path to the uniref XML file
+        :param index_file_path: the path to the index file to create
+        :param target_taxa: the set of target taxon ids
+        :param workers: the number of worker processes, defaults to the cpu count
+        :param chunk_size: the number of bytes scanned by a worker at a time
+        :return: the number of entries indexed
+        """
+        # make sure the input is there
+        if not os.path.exists(uniref_infile_path):
+            raise FileNotFoundError(f'UniRef file {uniref_infile_path} not found.')
+
+        # get the size of the file to create the chunk ranges
+        file_size: int = os.path.getsize(uniref_infile_path)
+
+        # create the chunk ranges
+        chunks: list = [(uniref_infile_path, start, min(start + chunk_size, file_size)) for start in range(0, file_size, chunk_size)]
+
+        self.logger.info(f'Indexing {uniref_infile_path}. {file_size} bytes in {len(chunks)} chunk(s).')
+
+        # init the entry counter
+        entry_count: int = 0
+
+        # write to a temp file so a failed run does not leave a partial index
+        temp_file_path: str = index_file_path + '.part'
+
+        with open(temp_file_path, 'wb') as out_fp, Pool(workers, initializer=_init_worker, initargs=(frozenset(t.encode('utf-8') for t in target_taxa),)) as pool:
+            # write the file header
+            out_fp.write(INDEX_MAGIC)
+
+            # the chunk results come back in file order
+            for chunk_counter, entries in enumerate(pool.imap(_star_index_chunk, chunks), start=1):
+                # write out the entry locations
+                out_fp.write(b''.join(INDEX_RECORD.pack(offset, length) for offset, length in entries))
+
+                # keep track of the count
+                entry_count += len(entries)
+
+                self.logger.debug(f'Chunk {chunk_counter} of {len(chunks)} indexed, {entry_count} entries found so far.')
+
+        # put the index in place
+        os.replace(temp_file_path, index_file_path)
+
+        self.logger.info(f'Indexing {uniref_infile_path} complete. {entry_count} entries indexed.')
+
+        # return to the caller
+        return entry_count
+
+    @staticmethod
+    def read_index(index_file_path: str) -> iter:
+        """
+        reads the index file and yields the location of each indexed entry element
+
+        :param index_file_path: the path to the index file
+        :return: iterator of (entry start offset, entry length) tuples
+        """
+        with open(index_file_path, 'rb') as fp:
+            # check the file header
+            if fp.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                raise ValueError(f'{index_file_path} is not a UniRef taxon index file.')
+
+            # read the records in blocks
+            while True:
+                buffer: bytes = fp.read(INDEX_RECORD.size * 65536)
+
+                # did we run out of data
+                if not buffer:
+                    break
+
+                yield from INDEX_RECORD.iter_unpack(buffer)
+
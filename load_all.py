@@ -96,7 +96,7 @@ if __name__ == '__main__':
         logger.info('Loading UniRef.')
 
         # load the data files and create KGX output
-        uni.load(UniRef_data_dir, UniRef_files.split(','), 'taxon_file_indexes.txt', out_mode)
+        uni.load(UniRef_data_dir, UniRef_files.split(','), 'taxon_file_indexes.bin', out_mode)
 
     # assign the intact directory
     IntAct_data_dir = args['intact_dir']
@@ -1,7 +1,9 @@
 import os.path
 import pytest
+import pandas as pd
 
 from ViralProteome.src.loadUniRef import UniRefSimLoader
+from ViralProteome.src.uniref_taxon_index import UniRefTaxonIndex
 from ViralProteome.src.loadVP import VPLoader
 from IntAct.src.loadIA import IALoader
 from GOA.src.loadGOA import GOALoader
@@ -50,6 +52,36 @@ def test_vp_load():
     os.remove(os.path.join(test_dir, 'Viral_proteome_prov_node_file.tsv'))
 
 
+def test_vp_load_parallel():
+    # set the test directory
+    test_dir = os.path.dirname(os.path.abspath(__file__)) + '/resources'
+
+    # storage for the output of each run
+    file_lines: dict = {}
+
+    # load the data files serially and then over a pool of GAF file parsers
+    for workers in (1, 2):
+        # get a reference to the viral proteome data processor
+        vp = VPLoader()
+
+        # load the data file and create KGX output
+        vp.load(test_dir, 'Viral_proteome_loadtest', output_mode='tsv', test_mode=True, workers=workers)
+
+        # save the output and remove the data files
+        for file_name in ['Viral_proteome_loadtest_edges.tsv', 'Viral_proteome_loadtest_nodes.tsv']:
+            with open(os.path.join(test_dir, file_name), 'r') as fl:
+                file_lines[(workers, file_name)] = fl.readlines()
+
+            os.remove(os.path.join(test_dir, file_name))
+
+        os.remove(os.path.join(test_dir, 'Viral_proteome_prov_node_file.tsv'))
+
+    # the parallel run must create the same files
+    assert(len(file_lines[(1, 'Viral_proteome_loadtest_edges.tsv')]) == 149 and len(file_lines[(1, 'Viral_proteome_loadtest_nodes.tsv')]) == 86)
+    assert(file_lines[(2, 'Viral_proteome_loadtest_edges.tsv')] == file_lines[(1, 'Viral_proteome_loadtest_edges.tsv')])
+    assert(file_lines[(2, 'Viral_proteome_loadtest_nodes.tsv')] == file_lines[(1, 'Viral_proteome_loadtest_nodes.tsv')])
+
+
 def test_uniref_load():
     # get a reference to the uniref similarity data processor
     uni = UniRefSimLoader()
@@ -58,7 +90,7 @@ def test_uniref_load():
     test_dir = os.path.dirname(os.path.abspath(__file__)) + '/resources'
 
     # load the data file and create KGX output
-    uni.load(test_dir, ['uniref'], 'taxon_file_indexes.txt', output_mode='tsv', test_mode=True)
+    uni.load(test_dir, ['uniref'], 'taxon_file_indexes.bin', output_mode='tsv', test_mode=True)
 
     # check the results
     assert(os.path.isfile(os.path.join(test_dir, 'uniref_Virus_edges.tsv')))
@@ -83,6 +115,92 @@ def test_uniref_load():
     os.remove(os.path.join(test_dir, 'uniref_Virus_edges.tsv'))
 
 
+def test_uniref_load_parallel():
+    # set the test directory
+    test_dir = os.path.dirname(os.path.abspath(__file__)) + '/resources'
+
+    # storage for the output of each run
+    file_lines: dict = {}
+
+    # load the data files serially and then over a pool of entry parsers
+    for workers in (1, 2):
+        # get a reference to the uniref similarity data processor
+        uni = UniRefSimLoader()
+
+        # load the data file and create KGX output
+        uni.load(test_dir, ['uniref'], 'taxon_file_indexes.bin', output_mode='tsv', test_mode=True, workers=workers)
+
+        # save the output and remove the data files
+        for file_name in ['uniref_Virus_edges.tsv', 'uniref_Virus_nodes.tsv']:
+            with open(os.path.join(test_dir, file_name), 'r') as fl:
+                file_lines[(workers, file_name)] = fl.readlines()
+
+            os.remove(os.path.join(test_dir, file_name))
+
+    # the parallel run must create the same files
+    assert(len(file_lines[(1, 'uniref_Virus_edges.tsv')]) == 7 and len(file_lines[(1, 'uniref_Virus_nodes.tsv')]) == 6)
+    assert(file_lines[(2, 'uniref_Virus_edges.tsv')] == file_lines[(1, 'uniref_Virus_edges.tsv')])
+    assert(file_lines[(2, 'uniref_Virus_nodes.tsv')] == file_lines[(1, 'uniref_Virus_nodes.tsv')])
+
+
+def test_uniref_taxon_index():
+    # get a reference to the uniref taxon indexer
+    indexer = UniRefTaxonIndex()
+
+    # set the test directory
+    test_dir = os.path.dirname(os.path.abspath(__file__)) + '/resources'
+
+    # index the test file in small chunks to exercise the chunk boundaries
+    entry_count: int = indexer.create_index(os.path.join(test_dir, 'uniref.test.xml'), os.path.join(test_dir, 'uniref_test_index.bin'), {'10493'}, workers=2, chunk_size=64)
+
+    # check the count
+    assert(entry_count == 1)
+
+    # get the index records
+    entries: list = list(indexer.read_index(os.path.join(test_dir, 'uniref_test_index.bin')))
+
+    # open the data file and get the indexed entry
+    with open(os.path.join(test_dir, 'uniref.test.xml'), 'rb') as fp:
+        fp.seek(entries[0][0])
+        entry: bytes = fp.read(entries[0][1])
+
+    # check the entry boundaries
+    assert(entry.startswith(b'<entry id="UniRef100_Q6GZX4"') and entry.endswith(b'</entry>'))
+
+    # remove the index file
+    os.remove(os.path.join(test_dir, 'uniref_test_index.bin'))
+
+
+def test_uniref_entry_scan():
+    # set the test directory
+    test_dir = os.path.dirname(os.path.abspath(__file__)) + '/resources'
+
+    # get the location of the indexed entry in the sample file
+    entry_offset, entry_length = next(UniRefTaxonIndex.read_index(os.path.join(test_dir, 'uniref_taxon_file_indexes.bin')))
+
+    # get the indexed entry from the sample file
+    with open(os.path.join(test_dir, 'uniref.test.xml'), 'rb') as fp:
+        fp.seek(entry_offset)
+        entry: bytes = fp.read(entry_length)
+
+    # the taxa of the entry members
+    target_taxa: set = {'654924', '10493'}
+
+    # init the node lists for each parser
+    tree_nodes: list = []
+    scan_nodes: list = []
+
+    # parse the entry with the element tree parser and the entry scanner
+    UniRefSimLoader.capture_entry_data(entry, tree_nodes, target_taxa)
+    UniRefSimLoader.scan_entry_data(entry, scan_nodes, target_taxa)
+
+    # the entry, representative member and member node pairs
+    assert(len(scan_nodes) == 6)
+
+    # the scanner must create the same nodes
+    assert(scan_nodes == tree_nodes)
+
+
 def test_intact_load():
     # get a reference to the intact data processor
     ia = IALoader()
@@ -185,7 +303,95 @@ def test_ubergraph_load():
     # remove the data files
     os.remove(os.path.join(test_dir, 'ubergraph_test_edges.tsv'))
     os.remove(os.path.join(test_dir, 'ubergraph_test_nodes.tsv'))
-    os.remove(os.path.join(test_dir, 'ubergraph_test.ttl.1'))
+
+
+def test_ubergraph_load_parallel():
+    # set the test directory
+    test_dir = os.path.dirname(os.path.abspath(__file__)) + '/resources'
+
+    # storage for the output of each run
+    file_lines: dict = {}
+
+    # load the data file serially and then in chunks small enough to be spread over the workers
+    for workers, chunk_size in ((1, UGLoader.chunk_size), (2, 100)):
+        # get a reference to the ubergraph data processor
+        ug = UGLoader()
+        ug.chunk_size = chunk_size
+
+        # load the data files and create KGX output files
+        ug.load(test_dir, 'ubergraph_test.ttl', output_mode='tsv', test_mode=True, workers=workers)
+
+        # save the output and remove the data files
+        for file_name in ['ubergraph_test_edges.tsv', 'ubergraph_test_nodes.tsv']:
+            with open(os.path.join(test_dir, file_name), 'r') as fl:
+                file_lines[(workers, file_name)] = fl.readlines()
+
+            os.remove(os.path.join(test_dir, file_name))
+
+    # the parallel run must create the same files
+    assert(len(file_lines[(1, 'ubergraph_test_edges.tsv')]) == 3 and len(file_lines[(1, 'ubergraph_test_nodes.tsv')]) == 5)
+    assert(file_lines[(2, 'ubergraph_test_edges.tsv')] == file_lines[(1, 'ubergraph_test_edges.tsv')])
+    assert(file_lines[(2, 'ubergraph_test_nodes.tsv')] == file_lines[(1, 'ubergraph_test_nodes.tsv')])
+
+
+def test_ubergraph_file_chunks():
+    # set the test directory
+    test_dir = os.path.dirname(os.path.abspath(__file__)) + '/resources'
+
+    file_path: str = os.path.join(test_dir, 'ubergraph_test.ttl')
+
+    # cut the file into chunks smaller than a line
+    chunks: list = UGLoader.get_file_chunks(file_path, 100)
+
+    # the chunks must cover the file without gaps
+    assert(chunks[0][0] == 0 and chunks[-1][1] == os.path.getsize(file_path))
+    assert(all(chunks[idx][1] == chunks[idx + 1][0] for idx in range(len(chunks) - 1)))
+
+    # every line must be in exactly one chunk
+    with open(file_path, 'r') as fp:
+        assert([line for start, end in chunks for line in UGLoader.read_chunk_lines(file_path, start, end)] == fp.readlines())
+
+
+def test_ubergraph_triple_reader():
+    from rdflib import Graph
+    from Common.triple_reader import TripleReader, CurieConverter
+
+    # set the test directory
+    test_dir = os.path.dirname(os.path.abspath(__file__)) + '/resources'
+
+    # get the sample triples
+    with open(os.path.join(test_dir, 'ubergraph_test.ttl'), 'r') as fp:
+        lines: list = fp.readlines()
+
+    # the rdflib graph with two qname lookups per term
+    g: Graph = Graph().parse(data=''.join(lines), format='turtle')
+
+    graph_triples: list = []
+
+    for t in g.triples((None, None, None)):
+        triple: list = []
+
+        for n in t:
+            val: str = g.compute_qname(n)[2]
+
+            if not val.islower():
+                val = g.compute_qname(n)[2].replace('_', ':')
+
+            triple.append(val)
+
+        graph_triples.append(tuple(triple))
+
+    # the line parser without the cached conversions
+    tr = TripleReader()
+    tr.get_curie = CurieConverter().convert
+
+    uncached_triples: list = list(tr.read(iter(lines)))
+
+    # the line parser with the shared cached conversions
+    cached_triples: list = list(TripleReader().read(iter(lines)))
+
+    # all the ways must get the same triples
+    assert(cached_triples == uncached_triples and set(cached_triples) == set(graph_triples))
 
 
 def test_foodb_load():
@@ -214,10 +420,33 @@ def test_foodb_load():
     # check the line count
     assert(len(file_lines) == 6)
 
-    # remove the data files
+    # remove the data files and the csv caches
     os.remove(os.path.join(test_dir, 'foodb_test_edges.tsv'))
     os.remove(os.path.join(test_dir, 'foodb_test_nodes.tsv'))
 
+    for file_name in os.listdir(test_dir):
+        if file_name.endswith('.feather') and '.csv.' in file_name:
+            os.remove(os.path.join(test_dir, file_name))
+
+
+def test_foodb_equivalent_ids():
+    # get a reference to the FooDB data processor
+    fdb = FDBLoader()
+
+    # create compounds that each have a different highest priority identifier
+    columns: list = [column for column, prefix in fdb.EQUIVALENT_ID_COLUMNS]
+    compounds: list = [dict.fromkeys(columns, '') for _ in range(4)]
+
+    compounds[0].update({'moldb_inchikey': 'InChIKey=ABCDEFGHIJKLMN-OPQRSTUVWX-Y', 'chembl_id': 'CHEMBL1'})
+    compounds[1].update({'kegg_compound_id': 'C00001', 'hmdb_id': 'HMDB0000001'})
+    compounds[2].update({'pubchem_compound_id': '962'})
+
+    # get the identifiers
+    equivalent_ids: list = fdb.get_equivalent_ids(pd.DataFrame(compounds, columns=columns)).tolist()
+
+    # check the results
+    assert(equivalent_ids == ['INCHIKEY:ABCDEFGHIJKLMN-OPQRSTUVWX-Y', 'KEGG:C00001', 'PUBCHEM.COMPOUND:962', ''])
+
 
 @pytest.mark.skip(reason="Internal test only. This test requires a graph DB for result verification")
 def test_swiss_prot_against_quickgo():